@@ -0,0 +1,99 @@
+# bench_database.py
+"""Micro-benchmark: connect-per-call SQLite access vs the pooled connection layer.
+
+Run from the repository root:
+    python -m benchmarks.bench_database [--ops 2000] [--threads 4]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Point the database module at a scratch file before it is imported
+_tmpdir = tempfile.mkdtemp(prefix="transcend_bench_")
+os.environ["TRANSCENDAI_DB_PATH"] = os.path.join(_tmpdir, "bench.db")
+
+from core import database  # noqa: E402
+
+# The legacy path gets its own file in the default rollback-journal mode
+LEGACY_DB_PATH = os.path.join(_tmpdir, "legacy.db")
+
+def init_legacy_db():
+    conn = sqlite3.connect(LEGACY_DB_PATH)
+    schema = database.get_connection().execute(
+        "SELECT sql FROM sqlite_master WHERE name = 'translations'").fetchone()[0]
+    conn.execute(schema)
+    conn.commit()
+    conn.close()
+
+def legacy_save(project_id, i):
+    """The previous save_translation: open, insert, commit, close"""
+    conn = sqlite3.connect(LEGACY_DB_PATH, timeout=30)
+    c = conn.cursor()
+    c.execute('''INSERT INTO translations
+              (project_id, source_text, source_lang, target_lang, translation,
+               metadata, framework, mode, intensity, version, parent_id)
+              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+              (project_id, f"text {i}", "English", "Tamil", f"translation {i}",
+               "{}", "LangGraph", "Basic Mode", 3, i, None))
+    conn.commit()
+    conn.close()
+
+def legacy_get(translation_id):
+    conn = sqlite3.connect(LEGACY_DB_PATH, timeout=30)
+    c = conn.cursor()
+    c.execute("SELECT * FROM translations WHERE id = ?", (translation_id,))
+    row = c.fetchone()
+    conn.close()
+    return row
+
+def pooled_save(project_id, i):
+    database.save_translation(project_id, f"text {i}", "English", "Tamil", f"translation {i}",
+                              {}, "LangGraph", "Basic Mode", 3, i)
+
+def pooled_get(translation_id):
+    return database.get_translation(translation_id)
+
+def run(op, ops, threads):
+    """Run ops calls of op spread over threads; return ops/sec"""
+    per_thread = ops // threads
+
+    def worker(offset):
+        for i in range(offset, offset + per_thread):
+            op(i)
+
+    workers = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    init_legacy_db()
+    project_id = database.create_project("bench")
+    pooled_save(project_id, 0)
+    legacy_save(project_id, 0)
+    row_id = 1
+
+    results = {
+        "legacy_save_ops_per_sec": run(lambda i: legacy_save(project_id, i), args.ops, args.threads),
+        "pooled_save_ops_per_sec": run(lambda i: pooled_save(project_id, i), args.ops, args.threads),
+        "legacy_get_ops_per_sec": run(lambda i: legacy_get(row_id), args.ops, args.threads),
+        "pooled_get_ops_per_sec": run(lambda i: pooled_get(row_id), args.ops, args.threads),
+    }
+    json.dump({k: round(v, 1) for k, v in results.items()}, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
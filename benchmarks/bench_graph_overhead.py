@@ -0,0 +1,84 @@
+# bench_graph_overhead.py
+"""Per-request pipeline overhead with and without compiled-graph caching.
+
+Uses the offline fake LLM, so the numbers are pure Python/LangGraph cost.
+Run from the repository root:
+    python -m benchmarks.bench_graph_overhead [--requests 50]
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+os.environ["TRANSCEND_FAKE_LLM"] = "1"
+# Cached responses would skip the very LLM calls whose overhead is measured
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("TRANSCENDAI_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="transcend_bench_"), "bench.db"))
+logging.disable(logging.CRITICAL)
+
+from core import state_graph  # noqa: E402
+from services.expert_translation import ExpertTranslationService, EXPERT_AGENTS  # noqa: E402
+
+METADATA = {"domain": "General", "tone": "Neutral", "region": "Global",
+            "audience": "Adults", "purpose": "General"}
+TEXT = "Please send the signed contract back by Friday."
+
+def per_request_ms(fn, requests):
+    # The pipelines print debug output; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()  # warm-up
+        start = time.perf_counter()
+        for _ in range(requests):
+            fn()
+        elapsed = time.perf_counter() - start
+    return round(elapsed / requests * 1000, 3)
+
+def state_graph_uncached():
+    graph = state_graph.build_graph(4)
+    graph.invoke({"query": TEXT, "metadata": METADATA, "source_lang": "English",
+                  "target_lang": "Tamil", "context": {}, "translation": None,
+                  "adapted": None, "validation": None})
+
+def state_graph_cached():
+    state_graph.run_state_graph(TEXT, METADATA, "English", "Tamil", 4)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    service = ExpertTranslationService()
+    agents = ("coherence_checker", "terminology_specialist")
+
+    def expert_uncached():
+        service.build_expert_graph(agents).invoke({
+            "query": TEXT, "source_lang": "English", "target_lang": "Tamil",
+            "metadata": METADATA, "feedback": None, "context": {}, "translation": None})
+
+    def expert_cached():
+        service.get_expert_graph(agents).invoke({
+            "query": TEXT, "source_lang": "English", "target_lang": "Tamil",
+            "metadata": METADATA, "feedback": None, "context": {}, "translation": None})
+
+    results = {
+        "graph_build_ms": {
+            "state_graph": per_request_ms(lambda: state_graph.build_graph(4), args.requests),
+            "expert": per_request_ms(lambda: service.build_expert_graph(EXPERT_AGENTS), args.requests),
+        },
+        "per_request_ms": {
+            "state_graph_rebuild": per_request_ms(state_graph_uncached, args.requests),
+            "state_graph_cached": per_request_ms(state_graph_cached, args.requests),
+            "expert_rebuild": per_request_ms(expert_uncached, args.requests),
+            "expert_cached": per_request_ms(expert_cached, args.requests),
+        },
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
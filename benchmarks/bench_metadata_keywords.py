@@ -0,0 +1,74 @@
+# bench_metadata_keywords.py
+"""Basic metadata extraction: legacy substring scans against the compiled keyword matcher.
+
+Run from the repository root:
+    python -m benchmarks.bench_metadata_keywords [--mb 2] [--batch 1000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# metadata_service initialises the database on import; keep it off the committed one
+os.environ.setdefault("TRANSCENDAI_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="transcend_bench_"), "bench.db"))
+
+from services.metadata_service import (METADATA_KEYWORDS, DEFAULT_METADATA,  # noqa: E402
+                                       extract_metadata_basic, extract_metadata_basic_batch)
+
+PARAGRAPH = ("The committee reviewed the quarterly report on regional logistics and supply "
+             "planning. Several teams presented updates about warehouse capacity, transport "
+             "schedules and staffing for the coming months. ")
+TAIL = "Please contact the university research office with any questions. "
+
+def legacy_extract_metadata_basic(text):
+    """The removed implementation: a lowercase copy and substring scan per keyword"""
+    metadata = dict(DEFAULT_METADATA)
+    for field, labels in METADATA_KEYWORDS.items():
+        for label, keywords in labels.items():
+            if any(kw in text.lower() for kw in keywords):
+                metadata[field] = label
+                break
+    word_count = len(text.split())
+    if word_count < 20:
+        metadata["complexity"] = "Simple"
+    elif word_count > 100:
+        metadata["complexity"] = "Advanced"
+    return metadata
+
+def best_ms(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1000, 2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=2, help="Size of the large document in megabytes")
+    parser.add_argument("--batch", type=int, default=1000, help="Number of short documents in batch mode")
+    args = parser.parse_args(argv)
+
+    # Most keywords never occur, so the legacy scans read the whole document for each one
+    document = PARAGRAPH * int(args.mb * 1024 * 1024 / len(PARAGRAPH)) + TAIL
+    documents = [PARAGRAPH * (1 + i % 3) + TAIL for i in range(args.batch)]
+
+    results = {
+        "large_document_ms": {
+            "legacy": best_ms(lambda: legacy_extract_metadata_basic(document), repeat=1),
+            "compiled": best_ms(lambda: extract_metadata_basic(document)),
+        },
+        "batch_ms": {
+            "legacy": best_ms(lambda: [legacy_extract_metadata_basic(d) for d in documents]),
+            "compiled": best_ms(lambda: extract_metadata_basic_batch(documents)),
+        },
+        "same_result": extract_metadata_basic(document) == legacy_extract_metadata_basic(document),
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# bench_pipelines.py
+"""Offline latency benchmark of every translation path against the fake LLM.
+
+Each path runs twice on the deterministic fake clients: with no LLM
+latency, where the time per request is pure Python overhead, and with the
+configured latency distribution, where it is the wall time a user waits.
+LLM calls are counted by core.instrumentation. Results are JSON; pass an
+earlier result file to --compare to report changes between commits.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipelines [--requests 20] [--latency 0.05]
+        [--distribution lognormal --jitter 0.5] [--output bench.json] [--compare baseline.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+
+os.environ["TRANSCEND_FAKE_LLM"] = "1"
+# Cached responses would skip the very LLM calls being measured
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("TRANSCENDAI_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="transcend_bench_"), "bench.db"))
+logging.disable(logging.CRITICAL)
+
+from core.fake_llm import LatencyModel  # noqa: E402
+from core.instrumentation import trace_request  # noqa: E402
+from core.llm_registry import clear_registry  # noqa: E402
+from core.state_graph import run_state_graph  # noqa: E402
+from core.crewai_orchestrator import run_crewai_translation  # noqa: E402
+from services.translation_service import basic_translate, advanced_translate  # noqa: E402
+from services.expert_translation import ExpertTranslationService  # noqa: E402
+from utils.helpers import percentile  # noqa: E402
+
+METADATA = {"domain": "General", "tone": "Neutral", "region": "Global",
+            "audience": "Adults", "purpose": "General"}
+TEXT = "Please send the signed contract back by Friday."
+
+def configure_fake_llm(latency, distribution="fixed", jitter=0.0, seed=0):
+    """Point new fake clients at a latency distribution and drop the existing ones"""
+    os.environ["TRANSCEND_FAKE_LLM_LATENCY"] = str(latency)
+    os.environ["TRANSCEND_FAKE_LLM_LATENCY_DIST"] = distribution
+    os.environ["TRANSCEND_FAKE_LLM_JITTER"] = str(jitter)
+    os.environ["TRANSCEND_FAKE_LLM_SEED"] = str(seed)
+    clear_registry()
+
+def build_paths(intensity):
+    """Benchmarked callables by name; built after configure_fake_llm so they get fresh clients"""
+    expert = ExpertTranslationService()
+    return {
+        "basic_translate": partial(basic_translate, TEXT, "English", "Tamil"),
+        "advanced_translate": partial(advanced_translate, TEXT, "English", "Tamil", METADATA),
+        **{f"state_graph_i{i}": partial(run_state_graph, TEXT, METADATA, "English", "Tamil", i)
+           for i in range(1, 5)},
+        "crewai": partial(run_crewai_translation, TEXT, "English", "Tamil", METADATA, intensity),
+        # Translation memory would answer every request after the first
+        "expert": partial(expert.translate_text, TEXT, "English", "Tamil", METADATA,
+                          "expert", "LangGraph", intensity, use_memory=False),
+    }
+
+def measure(fn, requests):
+    """Per-request wall times in ms and LLM calls per node (summed over the requests)"""
+    times, calls, nodes = [], [], {}
+    # The pipelines print debug output; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()  # warm-up
+        for _ in range(requests):
+            with trace_request("benchmark") as trace:
+                start = time.perf_counter()
+                fn()
+                times.append((time.perf_counter() - start) * 1000)
+            summary = trace.summary()
+            calls.append(summary["calls"])
+            for node, stats in summary["nodes"].items():
+                nodes[node] = nodes.get(node, 0) + stats["calls"]
+    return times, calls, nodes
+
+def distribution(times):
+    return {"mean": round(sum(times) / len(times), 3),
+            "p50": round(percentile(times, 50), 3),
+            "p95": round(percentile(times, 95), 3)}
+
+def run(args):
+    configure_fake_llm(0)
+    overhead = {name: measure(fn, args.requests) for name, fn in build_paths(args.intensity).items()}
+    if args.latency > 0:
+        configure_fake_llm(args.latency, args.distribution, args.jitter, args.seed)
+        latency = {name: measure(fn, args.requests)[0] for name, fn in build_paths(args.intensity).items()}
+    else:
+        latency = {name: times for name, (times, _, _) in overhead.items()}
+
+    paths = {}
+    for name, (times, calls, nodes) in overhead.items():
+        paths[name] = {
+            "llm_calls": round(sum(calls) / len(calls), 2),
+            "llm_calls_by_node": {node: round(count / len(calls), 2) for node, count in nodes.items()},
+            "overhead_ms": distribution(times),
+            "wall_ms": distribution(latency[name]),
+        }
+    return paths
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold):
+    """Relative p50 change per path and metric against a baseline result, plus regressions"""
+    paths = results["paths"]
+    changes, regressions = {}, []
+    for name, current in paths.items():
+        previous = baseline.get("paths", {}).get(name)
+        if previous is None:
+            continue
+        changes[name] = {"llm_calls": round(current["llm_calls"] - previous["llm_calls"], 2)}
+        for metric in ("overhead_ms", "wall_ms"):
+            before, after = previous[metric]["p50"], current[metric]["p50"]
+            change = round((after - before) / before * 100, 1) if before else 0.0
+            changes[name][f"{metric}_p50_change_pct"] = change
+            if change > threshold:
+                regressions.append(f"{name} {metric} p50 +{change}%")
+        if changes[name]["llm_calls"] > 0:
+            regressions.append(f"{name} makes {changes[name]['llm_calls']} more LLM calls")
+    # Wall times are only comparable under the same latency distribution and intensity
+    def settings(config):
+        return {key: value for key, value in (config or {}).items() if key != "requests"}
+    return {"baseline_commit": baseline.get("commit"),
+            "same_config": settings(baseline.get("config")) == settings(results["config"]),
+            "changes": changes, "regressions": regressions}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20, help="Measured requests per path")
+    parser.add_argument("--intensity", type=int, default=3, help="Intensity of the CrewAI and expert paths")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean fake LLM latency in seconds")
+    parser.add_argument("--distribution", default="lognormal", choices=LatencyModel.DISTRIBUTIONS)
+    parser.add_argument("--jitter", type=float, default=0.5, help="Spread of the latency distribution")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="p50 slowdown in percent that counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {key: getattr(args, key) for key in
+                   ("requests", "intensity", "latency", "distribution", "jitter", "seed")},
+        "paths": run(args),
+    }
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            results["comparison"] = compare(results, json.load(f), args.threshold)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    json.dump(results, sys.stdout, indent=2)
+    print()
+    if results.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# bench_script_profile.py
+"""Script detection throughput: legacy per-block scans against the single-pass profile.
+
+Run from the repository root:
+    python -m benchmarks.bench_script_profile [--mb 4] [--batch 2000]
+"""
+import argparse
+import json
+import sys
+import time
+
+from utils import script_profile
+
+SAMPLES = {
+    "english": "Please send the signed contract back by Friday, 12 June. ",
+    "tamil": "ஒப்பந்தத்தை வெள்ளிக்கிழமைக்குள் கையொப்பமிட்டு அனுப்பவும். ",
+    "mixed": "API ஒப்பந்தம் Friday அன்று அனுப்பப்படும், 2024. ",
+}
+
+def legacy_is_language_match(text, target_lang):
+    """The removed state_graph check, kept here as the baseline"""
+    target_lang = target_lang.lower()
+    if "tamil" in target_lang:
+        return any('\u0B80' <= char <= '\u0BFF' for char in text)
+    return not any(ord(char) < 128 for char in text if char.isalpha())
+
+def legacy_detect_language(text):
+    """The removed helpers.detect_language scans (with its French check repaired)"""
+    if any('\u0900' <= char <= '\u097F' for char in text):
+        return "Hindi"
+    if any('\u0B80' <= char <= '\u0BFF' for char in text):
+        return "Tamil"
+    if any('\u0400' <= char <= '\u04FF' for char in text):
+        return "Russian"
+    if 'à' in text or 'é' in text or 'ç' in text:
+        return "French"
+    return "English"
+
+def best_seconds(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=4, help="Size of each large input in megabytes")
+    parser.add_argument("--batch", type=int, default=2000, help="Number of short texts in batch mode")
+    args = parser.parse_args(argv)
+
+    results = {"numpy": script_profile.np is not None, "large_input_mb_per_s": {}, "batch_texts_per_s": {}}
+    for name, sample in SAMPLES.items():
+        text = sample * int(args.mb * 1024 * 1024 / len(sample.encode("utf-8")))
+        mb = len(text.encode("utf-8")) / (1024 * 1024)
+        # English text never contains Tamil, so the legacy checks scan all of it
+        results["large_input_mb_per_s"][name] = {
+            "legacy_detect_language": round(mb / best_seconds(lambda: legacy_detect_language(text)), 1),
+            "legacy_is_language_match": round(mb / best_seconds(lambda: legacy_is_language_match(text, "Tamil")), 1),
+            "script_profile": round(mb / best_seconds(lambda: script_profile.script_profile(text)), 1),
+            "script_profiles": round(mb / best_seconds(lambda: script_profile.script_profiles([text])), 1),
+        }
+
+    texts = [sample * (1 + i % 5) for i, sample in
+             zip(range(args.batch), list(SAMPLES.values()) * args.batch)]
+    results["batch_texts_per_s"] = {
+        "script_profile_loop": round(args.batch / best_seconds(
+            lambda: [script_profile.script_profile(text) for text in texts])),
+        "script_profiles": round(args.batch / best_seconds(lambda: script_profile.script_profiles(texts))),
+    }
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+if __name__ == "__main__":
+    main()
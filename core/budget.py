@@ -0,0 +1,114 @@
+# budget.py
+"""Per-request latency and cost budget.
+
+A RequestBudget travels with a request through the pipeline (in the graph
+state, or held by the CrewAI agent). Nodes charge every LLM call to it
+and check it before optional stages; stages skipped for lack of budget
+are recorded and reported in the result context.
+"""
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from core.segmentation import SEGMENT_WORKERS
+
+# Defaults per request; calls and tokens scale with the number of segments and
+# the time limit with the rounds of SEGMENT_WORKERS segments translated at once
+BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", "90"))
+BUDGET_CALLS = int(os.getenv("REQUEST_BUDGET_CALLS", "12"))
+BUDGET_TOKENS = int(os.getenv("REQUEST_BUDGET_TOKENS", "24000"))
+# Optional stages are skipped once any dimension falls below this share
+BUDGET_LOW_FRACTION = float(os.getenv("REQUEST_BUDGET_LOW_FRACTION", "0.25"))
+# Validate -> translate restarts allowed per request (per segment when segmented)
+MAX_VALIDATE_RETRIES = int(os.getenv("MAX_VALIDATE_RETRIES", "2"))
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return len(text or "") // 4 + 1
+
+class RequestBudget:
+    """Deadline, LLM call and token allowance of one request; shared by its segments"""
+    def __init__(self, seconds: Optional[float] = BUDGET_SECONDS, max_calls: Optional[int] = BUDGET_CALLS,
+                 max_tokens: Optional[int] = BUDGET_TOKENS, low_fraction: float = BUDGET_LOW_FRACTION):
+        self.started_at = time.monotonic()
+        self.seconds = seconds
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.low_fraction = low_fraction
+        self.calls = 0
+        self.tokens = 0
+        self.skipped: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_request(cls, segments: int = 1) -> "RequestBudget":
+        """Budget from the environment defaults, scaled for a segmented document"""
+        rounds = math.ceil(segments / max(SEGMENT_WORKERS, 1))
+        return cls(BUDGET_SECONDS * rounds, BUDGET_CALLS * segments, BUDGET_TOKENS * segments)
+
+    def charge(self, prompt: str, response: str = ""):
+        """Record one LLM call"""
+        with self._lock:
+            self.calls += 1
+            self.tokens += estimate_tokens(prompt) + estimate_tokens(response)
+
+    def _remaining_fractions(self) -> list:
+        fractions = []
+        if self.seconds:
+            fractions.append(1 - (time.monotonic() - self.started_at) / self.seconds)
+        if self.max_calls:
+            fractions.append(1 - self.calls / self.max_calls)
+        if self.max_tokens:
+            fractions.append(1 - self.tokens / self.max_tokens)
+        return fractions
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            return any(fraction <= 0 for fraction in self._remaining_fractions())
+
+    def low(self) -> bool:
+        """Whether optional stages should be skipped"""
+        with self._lock:
+            return any(fraction < self.low_fraction for fraction in self._remaining_fractions())
+
+    def skip(self, stage: str, reason: str = "budget"):
+        """Record a stage that did not run"""
+        with self._lock:
+            self.skipped.append({"stage": stage, "reason": reason})
+
+    def allows(self, stage: str) -> bool:
+        """Check an optional stage against the budget, recording it as skipped if it may not run"""
+        if self.low():
+            self.skip(stage)
+            return False
+        return True
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                "elapsed_s": round(time.monotonic() - self.started_at, 2),
+                "calls": self.calls,
+                "max_calls": self.max_calls,
+                "tokens": self.tokens,
+                "max_tokens": self.max_tokens,
+                "skipped": list(self.skipped)
+            }
+
+class UnlimitedBudget(RequestBudget):
+    """Stand-in for callers that run a pipeline without a budget"""
+    def __init__(self):
+        super().__init__(None, None, None)
+
+    def charge(self, prompt: str, response: str = ""):
+        pass
+
+    def skip(self, stage: str, reason: str = "budget"):
+        pass
+
+NO_BUDGET = UnlimitedBudget()
+
+def budget_of(state: Dict) -> RequestBudget:
+    """The request budget carried in a graph state"""
+    return state.get("budget") or NO_BUDGET
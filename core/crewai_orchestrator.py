@@ -1,10 +1,14 @@
-import google.generativeai as genai
 from dotenv import load_dotenv
 import os
 import json
 import time
 import logging
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
+from core.llm_registry import get_generative_model, stream_generate
+from core.llm_cache import call_site
+from core.segmentation import segment_text, translate_segments, join_segments, neighbor_prompt
+from core.budget import RequestBudget, NO_BUDGET
+from core.instrumentation import instrumented, trace_request
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,25 +18,34 @@ load_dotenv()
 
 class TranslationAgent:
     """Proper multi-agent implementation with accurate outputs"""
-    def __init__(self):
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-
-    def _get_response(self, prompt: str) -> str:
-        """Get clean response from Gemini"""
+    def __init__(self, budget: Optional[RequestBudget] = None):
+        self.model = get_generative_model('gemini-1.5-flash')
+        # Every model call is charged to the request budget
+        self.budget = budget or NO_BUDGET
+
+    def _get_response(self, prompt: str, on_partial: Optional[Callable[[str], None]] = None) -> str:
+        """Get clean response from Gemini, streaming it to on_partial if given"""
+        generation_config = {
+            "temperature": 0.3,
+            "max_output_tokens": 2048
+        }
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": 0.3,
-                    "max_output_tokens": 2048
-                }
-            )
-            return response.text.strip()
+            if on_partial is not None:
+                text = stream_generate(self.model, prompt, on_partial, generation_config)
+            else:
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=generation_config
+                )
+                text = response.text.strip()
+            self.budget.charge(prompt, text)
+            return text
         except Exception as e:
             logger.error(f"API call failed: {str(e)}")
             raise
 
+    @instrumented("enrich")
+    @call_site("enrich")
     def enrich_context(self, text: str, source_lang: str, target_lang: str, metadata: Dict) -> Dict:
         """Context enrichment agent with proper output"""
         prompt = f"""As a Context Specialist, analyze this translation context:
@@ -69,12 +82,16 @@ Return ONLY a JSON object with these keys:
                 "fallback": "Using basic context"
             }
 
-    def translate(self, text: str, context: Dict, metadata: Dict) -> str:
+    @instrumented("translate")
+    @call_site("translate")
+    def translate(self, text: str, context: Dict, metadata: Dict,
+                  neighbors: Optional[Dict] = None,
+                  on_partial: Optional[Callable[[str], None]] = None) -> str:
         """Translation agent with context awareness"""
         prompt = f"""As a Senior Translator, translate this text to {context.get('target_lang', '')}:
 
 Source Text: {text}
-
+{neighbor_prompt(neighbors)}
 Context Analysis:
 {json.dumps(context, indent=2)}
 
@@ -86,11 +103,13 @@ Requirements:
 Return ONLY the translated text with NO additional commentary."""
 
         try:
-            return self._get_response(prompt)
+            return self._get_response(prompt, on_partial)
         except Exception as e:
             logger.error(f"Translation failed: {str(e)}")
             raise
 
+    @instrumented("review")
+    @call_site("review")
     def review_quality(self, source: str, translation: str, context: Dict) -> str:
         """Quality review agent with proper validation"""
         prompt = f"""As a Quality Reviewer, validate this translation:
@@ -117,6 +136,8 @@ Return ONLY the final text with NO commentary."""
             logger.error(f"Quality review failed: {str(e)}")
             return translation  # Return original if review fails
 
+    @instrumented("adapt")
+    @call_site("adapt")
     def adapt_culturally(self, text: str, context: Dict, metadata: Dict) -> str:
         """Cultural adaptation agent"""
         prompt = f"""As a Cultural Expert, adapt this text for {metadata.get('region', 'Global')}:
@@ -140,57 +161,87 @@ Return ONLY the adapted text with NO commentary."""
             logger.error(f"Cultural adaptation failed: {str(e)}")
             return text  # Return original if adaptation fails
 
+def translate_segment(agent: TranslationAgent, text: str, neighbors: Dict, context: Dict,
+                      metadata: Dict, intensity: int,
+                      on_partial: Optional[Callable[[str], None]] = None) -> Dict:
+    """Translate, review and adapt one segment against the shared context"""
+    # 2. Initial Translation (streamed when on_partial is given)
+    translation = agent.translate(text, context, metadata, neighbors, on_partial)
+    outcome = {"translation": translation}
+
+    # 3. Quality Review (intensity >= 2), unless the budget is running low
+    if intensity >= 2 and agent.budget.allows("review"):
+        reviewed = agent.review_quality(text, translation, context)
+        if reviewed != translation:
+            outcome["translation"] = reviewed
+            outcome["reviewed"] = True
+
+    # 4. Cultural Adaptation (intensity >= 3), unless the budget is running low
+    if intensity >= 3 and agent.budget.allows("adapt"):
+        adapted = agent.adapt_culturally(outcome["translation"], context, metadata)
+        if adapted != outcome["translation"]:
+            outcome["translation"] = adapted
+            outcome["adapted"] = True
+
+    return outcome
+
 def run_crewai_translation(text: str, source_lang: str, target_lang: str, 
-                          metadata: Dict, intensity: int = 3, feedback: Optional[str] = None) -> Dict:
-    """Complete multi-agent workflow with proper outputs"""
-    agent = TranslationAgent()
-    result = {
-        "translation": "",
-        "context": {},
-        "metadata": metadata,
-        "warnings": []
-    }
+                          metadata: Dict, intensity: int = 3, feedback: Optional[str] = None,
+                          on_partial: Optional[Callable[[str], None]] = None,
+                          budget: Optional[RequestBudget] = None) -> Dict:
+    """Complete multi-agent workflow with proper outputs; budget is shared with a calling pipeline"""
+    with trace_request("crewai") as trace:
+        segments = segment_text(text, source_lang)
+        agent = TranslationAgent(budget or RequestBudget.for_request(len(segments)))
+        result = {
+            "translation": "",
+            "context": {},
+            "metadata": metadata,
+            "warnings": []
+        }
 
-    try:
-        # 1. Context Enrichment
-        context = agent.enrich_context(text, source_lang, target_lang, metadata)
-        if "error" in context:
-            raise ValueError(context["error"])
-        result["context"] = context
-        result["context"]["source_lang"] = source_lang
-        result["context"]["target_lang"] = target_lang
-
-        # 2. Initial Translation
-        translation = agent.translate(text, context, metadata)
-        result["translation"] = translation
-
-        # 3. Quality Review (intensity >= 2)
-        if intensity >= 2:
-            reviewed = agent.review_quality(text, translation, context)
-            if reviewed != translation:
-                result["translation"] = reviewed
+        try:
+            # 1. Context Enrichment
+            context = agent.enrich_context(text, source_lang, target_lang, metadata)
+            if "error" in context:
+                raise ValueError(context["error"])
+            result["context"] = context
+            result["context"]["source_lang"] = source_lang
+            result["context"]["target_lang"] = target_lang
+
+            # 2-4. Translation, review and adaptation, per segment for long documents
+            outcomes = translate_segments(
+                segments,
+                lambda segment, neighbors, **stream: translate_segment(
+                    agent, segment, neighbors, context, metadata, intensity, **stream),
+                on_partial=on_partial
+            )
+            result["translation"] = join_segments(segments, [outcome["translation"] for outcome in outcomes])
+            if any(outcome.get("reviewed") for outcome in outcomes):
                 result["context"]["reviewed"] = True
-
-        # 4. Cultural Adaptation (intensity >= 3)
-        if intensity >= 3:
-            adapted = agent.adapt_culturally(result["translation"], context, metadata)
-            if adapted != result["translation"]:
-                result["translation"] = adapted
+            if any(outcome.get("adapted") for outcome in outcomes):
                 result["context"]["adapted"] = True
+            if len(segments) > 1:
+                result["context"]["segments"] = len(segments)
+            result["context"]["budget"] = agent.budget.summary()
+            result["context"]["instrumentation"] = trace.summary()
 
-        return result
-
-    except Exception as e:
-        logger.error(f"Multi-agent workflow failed: {str(e)}")
-        # Fallback to advanced translation
-        return advanced_translation(text, source_lang, target_lang, metadata)
+            return result
 
+        except Exception as e:
+            logger.error(f"Multi-agent workflow failed: {str(e)}")
+            # Fallback to advanced translation
+            fallback = advanced_translation(text, source_lang, target_lang, metadata)
+            fallback["context"]["instrumentation"] = trace.summary()
+            return fallback
+
+@instrumented("advanced_translation")
+@call_site("advanced_translation")
 def advanced_translation(text: str, source_lang: str, target_lang: str, 
                         metadata: Dict) -> Dict:
     """Metadata-aware fallback translation"""
     try:
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = get_generative_model('gemini-1.5-flash')
         
         prompt = f"""Translate this from {source_lang} to {target_lang}:
 
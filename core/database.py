@@ -1,125 +1,491 @@
 import sqlite3
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 import json
 
-DB_PATH = "transcendai.db"
+DB_PATH = os.getenv("TRANSCENDAI_DB_PATH", "transcendai.db")
+
+# Connection tuning, applied once per connection
+BUSY_TIMEOUT_MS = int(os.getenv("TRANSCENDAI_DB_BUSY_TIMEOUT_MS", "5000"))
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+)
+
+_local = threading.local()
+
+def get_connection():
+    """Long-lived connection owned by the calling thread"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        # Autocommit mode; transactions are opened explicitly by transaction()
+        conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+        _local.path = DB_PATH
+        _local.depth = 0
+    return conn
+
+def close_connection():
+    """Close the calling thread's connection, if any"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+@contextmanager
+def transaction(immediate=False):
+    """Yield a cursor inside a transaction; nested calls join the outer one.
+
+    immediate=True takes the write lock up front (BEGIN IMMEDIATE), which
+    avoids lock-upgrade deadlocks for read-then-write sequences.
+    """
+    conn = get_connection()
+    if _local.depth:
+        _local.depth += 1
+        try:
+            yield conn.cursor()
+        finally:
+            _local.depth -= 1
+        return
+
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    _local.depth = 1
+    try:
+        yield conn.cursor()
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        _local.depth = 0
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Create projects table if it doesn't exist
-    c.execute('''CREATE TABLE IF NOT EXISTS projects (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        project_type TEXT,
-        metadata_profile TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    
-    # Create translations table with all columns
-    c.execute('''CREATE TABLE IF NOT EXISTS translations (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        project_id INTEGER,
-        source_text TEXT NOT NULL,
-        source_lang TEXT,
-        target_lang TEXT,
-        translation TEXT NOT NULL,
-        metadata TEXT,
-        framework TEXT,
-        mode TEXT,
-        intensity INTEGER,
-        version INTEGER,
-        parent_id INTEGER,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (project_id) REFERENCES projects(id)
-    )''')
-    
-    conn.commit()
-    conn.close()
+    with transaction() as c:
+        # Create projects table if it doesn't exist
+        c.execute('''CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            project_type TEXT,
+            metadata_profile TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''')
+
+        # Create translations table with all columns
+        c.execute('''CREATE TABLE IF NOT EXISTS translations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER,
+            source_text TEXT NOT NULL,
+            source_lang TEXT,
+            target_lang TEXT,
+            translation TEXT NOT NULL,
+            metadata TEXT,
+            framework TEXT,
+            mode TEXT,
+            intensity INTEGER,
+            version INTEGER,
+            parent_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (project_id) REFERENCES projects(id)
+        )''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_translations_project_created
+                     ON translations (project_id, created_at)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_translations_project_version
+                     ON translations (project_id, version)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_translations_project_id
+                     ON translations (project_id, id)''')
+
+        # Persistent translation memory, keyed on a hash of the normalized request
+        c.execute('''CREATE TABLE IF NOT EXISTS translation_memory (
+            key TEXT PRIMARY KEY,
+            source_text TEXT NOT NULL,
+            source_lang TEXT,
+            target_lang TEXT,
+            mode TEXT,
+            translation TEXT NOT NULL,
+            hits INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            context_key TEXT
+        )''')
+        # Hash of (mode, metadata, feedback); fuzzy matches stay within one context
+        tm_columns = {row[1] for row in c.execute("PRAGMA table_info(translation_memory)")}
+        if "context_key" not in tm_columns:
+            c.execute("ALTER TABLE translation_memory ADD COLUMN context_key TEXT")
+
+        # Wikipedia term resolutions; a NULL translation caches "not found"
+        c.execute('''CREATE TABLE IF NOT EXISTS term_cache (
+            term TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            translation TEXT,
+            expires_at REAL NOT NULL,
+            hits INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (term, target_lang)
+        )''')
+
+        # Extracted metadata, keyed on a hash of (normalized text, mode, model)
+        c.execute('''CREATE TABLE IF NOT EXISTS metadata_cache (
+            key TEXT PRIMARY KEY,
+            mode TEXT,
+            model TEXT,
+            metadata TEXT NOT NULL,
+            hits INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_used_at REAL NOT NULL
+        )''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_metadata_cache_last_used
+                     ON metadata_cache (last_used_at)''')
+
+        # Trace spans of the request that produced a translation (core.instrumentation);
+        # span_id and parent_span_id number the spans within that request
+        c.execute('''CREATE TABLE IF NOT EXISTS translation_spans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            translation_id INTEGER NOT NULL,
+            span_id INTEGER NOT NULL,
+            parent_span_id INTEGER,
+            pipeline TEXT,
+            node TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            ended_at REAL,
+            duration_ms REAL,
+            model TEXT,
+            llm_calls INTEGER DEFAULT 0,
+            cache_hits INTEGER DEFAULT 0,
+            retries INTEGER DEFAULT 0,
+            prompt_chars INTEGER DEFAULT 0,
+            prompt_tokens INTEGER DEFAULT 0,
+            response_tokens INTEGER DEFAULT 0,
+            outcome TEXT,
+            FOREIGN KEY (translation_id) REFERENCES translations(id)
+        )''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_translation_spans_translation
+                     ON translation_spans (translation_id, span_id)''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_translation_spans_started
+                     ON translation_spans (started_at)''')
 
 def create_project(name, project_type="Document", metadata_profile="{}"):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("INSERT INTO projects (name, project_type, metadata_profile) VALUES (?, ?, ?)",
-              (name, project_type, metadata_profile))
-    project_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return project_id
+    with transaction() as c:
+        c.execute("INSERT INTO projects (name, project_type, metadata_profile) VALUES (?, ?, ?)",
+                  (name, project_type, metadata_profile))
+        return c.lastrowid
 
 def delete_project(project_id):
     """Delete project and all its translations"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM translations WHERE project_id = ?", (project_id,))
-    c.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as c:
+        c.execute('''DELETE FROM translation_spans WHERE translation_id IN (
+                      SELECT id FROM translations WHERE project_id = ?)''', (project_id,))
+        c.execute("DELETE FROM translations WHERE project_id = ?", (project_id,))
+        c.execute("DELETE FROM projects WHERE id = ?", (project_id,))
 
 def get_project(project_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
-    project = c.fetchone()
-    conn.close()
-    return project
+    c = get_connection().execute("SELECT * FROM projects WHERE id = ?", (project_id,))
+    return c.fetchone()
 
 def list_projects():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id, name, project_type, created_at FROM projects ORDER BY created_at DESC")
-    projects = c.fetchall()
-    conn.close()
-    return projects
-
-def save_translation(project_id, source_text, source_lang, target_lang, 
-                    translation, metadata, framework, mode, intensity, version, parent_id=None):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    c = get_connection().execute(
+        "SELECT id, name, project_type, created_at FROM projects ORDER BY created_at DESC")
+    return c.fetchall()
+
+def next_version(project_id, cursor=None):
+    """Next version number for a project, from the (project_id, version) index"""
+    c = cursor or get_connection().cursor()
+    c.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM translations WHERE project_id = ?",
+              (project_id,))
+    return c.fetchone()[0]
+
+def save_translation(project_id, source_text, source_lang, target_lang,
+                    translation, metadata, framework, mode, intensity, version=None, parent_id=None):
+    """Insert a translation; version=None assigns the next version atomically"""
     metadata_str = json.dumps(metadata) if isinstance(metadata, dict) else metadata
-    c.execute('''INSERT INTO translations 
-              (project_id, source_text, source_lang, target_lang, translation, 
-               metadata, framework, mode, intensity, version, parent_id) 
-              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-              (project_id, source_text, source_lang, target_lang, translation, 
-               metadata_str, framework, mode, intensity, version, parent_id))
-    translation_id = c.lastrowid
-    conn.commit()
-    conn.close()
-    return translation_id
+    # IMMEDIATE holds the write lock across the MAX(version) read and the insert
+    with transaction(immediate=True) as c:
+        if version is None:
+            version = next_version(project_id, c)
+        c.execute('''INSERT INTO translations
+                  (project_id, source_text, source_lang, target_lang, translation,
+                   metadata, framework, mode, intensity, version, parent_id)
+                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                  (project_id, source_text, source_lang, target_lang, translation,
+                   metadata_str, framework, mode, intensity, version, parent_id))
+        return c.lastrowid
+
+def save_translations_bulk(rows):
+    """Insert many translations in one transaction and return their ids in order.
+
+    Each row is a dict of save_translation's arguments. Rows without a
+    version are numbered per project after the current maximum, and a row
+    may set parent_index to point at an earlier row of the same batch.
+    """
+    if not rows:
+        return []
+    for i, row in enumerate(rows):
+        if row.get("parent_index") is not None and not 0 <= row["parent_index"] < i:
+            raise ValueError(f"Row {i} has parent_index outside the preceding rows")
+
+    with transaction(immediate=True) as c:
+        # The IMMEDIATE lock keeps other writers out until commit, so the rows
+        # inserted below are exactly those with an id above the current maximum
+        c.execute("SELECT COALESCE(MAX(id), 0) FROM translations")
+        last_id = c.fetchone()[0]
+
+        next_versions = {}
+        params = []
+        for row in rows:
+            project_id = row["project_id"]
+            version = row.get("version")
+            if version is None:
+                if project_id not in next_versions:
+                    next_versions[project_id] = next_version(project_id, c)
+                version = next_versions[project_id]
+                next_versions[project_id] += 1
+            metadata = row.get("metadata")
+            params.append((
+                project_id, row["source_text"], row.get("source_lang"),
+                row.get("target_lang"), row["translation"],
+                json.dumps(metadata) if isinstance(metadata, dict) else metadata,
+                row.get("framework"), row.get("mode"), row.get("intensity"),
+                version, row.get("parent_id")
+            ))
+
+        c.executemany('''INSERT INTO translations
+                      (project_id, source_text, source_lang, target_lang, translation,
+                       metadata, framework, mode, intensity, version, parent_id)
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', params)
+        # Ids are assigned in insert order, so they line up with the rows
+        c.execute("SELECT id FROM translations WHERE id > ? ORDER BY id", (last_id,))
+        ids = [row[0] for row in c.fetchall()]
+
+        # Links within the batch can only be set once the ids are known
+        links = [(ids[row["parent_index"]], ids[i]) for i, row in enumerate(rows)
+                 if row.get("parent_index") is not None]
+        if links:
+            c.executemany("UPDATE translations SET parent_id = ? WHERE id = ?", links)
+    return ids
 
 def get_translation_history(project_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""
-        SELECT id, source_text, source_lang, target_lang, translation, 
-               metadata, framework, mode, intensity, version, 
+    c = get_connection().execute("""
+        SELECT id, source_text, source_lang, target_lang, translation,
+               metadata, framework, mode, intensity, version,
                datetime(created_at, 'localtime') as formatted_date
-        FROM translations 
-        WHERE project_id = ? 
+        FROM translations
+        WHERE project_id = ?
         ORDER BY created_at DESC
     """, (project_id,))
-    history = c.fetchall()
-    conn.close()
-    return history
+    return c.fetchall()
+
+# Columns selectable by get_translation_history_page; large text is opt-in
+HISTORY_COLUMNS = {
+    "id": "id",
+    "source_preview": "substr(source_text, 1, 120)",
+    "source_text": "source_text",
+    "source_lang": "source_lang",
+    "target_lang": "target_lang",
+    "translation": "translation",
+    "metadata": "metadata",
+    "framework": "framework",
+    "mode": "mode",
+    "intensity": "intensity",
+    "version": "version",
+    "date": "datetime(created_at, 'localtime')",
+}
+HISTORY_LIST_COLUMNS = ("id", "source_preview", "source_lang", "target_lang",
+                        "framework", "mode", "intensity", "version", "date")
+
+def get_translation_history_page(project_id, before_id=None, limit=20, columns=HISTORY_LIST_COLUMNS):
+    """Newest-first page of history rows with id < before_id.
+
+    Returns (rows, next_before_id); rows are dicts keyed by column name and
+    next_before_id is None on the last page.
+    """
+    unknown = set(columns) - set(HISTORY_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown history columns: {sorted(unknown)}")
+    if "id" not in columns:
+        columns = ("id",) + tuple(columns)
+
+    select = ", ".join(f"{HISTORY_COLUMNS[col]} AS {col}" for col in columns)
+    params = [project_id]
+    where = "project_id = ?"
+    if before_id is not None:
+        where += " AND id < ?"
+        params.append(before_id)
+    params.append(limit + 1)
+
+    c = get_connection().execute(
+        f"SELECT {select} FROM translations WHERE {where} ORDER BY id DESC LIMIT ?", params)
+    rows = [dict(zip(columns, row)) for row in c.fetchall()]
+    next_before_id = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_before_id
+
+def get_translation_texts(translation_id):
+    """(source_text, translation) for one history entry"""
+    c = get_connection().execute(
+        "SELECT source_text, translation FROM translations WHERE id = ?", (translation_id,))
+    return c.fetchone()
 
 def delete_translation(translation_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM translations WHERE id = ?", (translation_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as c:
+        c.execute("DELETE FROM translation_spans WHERE translation_id = ?", (translation_id,))
+        c.execute("DELETE FROM translations WHERE id = ?", (translation_id,))
 
 def get_translation(translation_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM translations WHERE id = ?", (translation_id,))
-    translation = c.fetchone()
-    conn.close()
-    return translation
+    c = get_connection().execute("SELECT * FROM translations WHERE id = ?", (translation_id,))
+    return c.fetchone()
+
+def get_tm_entry(key):
+    conn = get_connection()
+    row = conn.execute("SELECT translation FROM translation_memory WHERE key = ?", (key,)).fetchone()
+    if row:
+        conn.execute("""UPDATE translation_memory
+                        SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+                        WHERE key = ?""", (key,))
+    return row[0] if row else None
+
+def save_tm_entry(key, source_text, source_lang, target_lang, mode, translation, context_key=None):
+    with transaction() as c:
+        c.execute('''INSERT INTO translation_memory
+                  (key, source_text, source_lang, target_lang, mode, translation, context_key)
+                  VALUES (?, ?, ?, ?, ?, ?, ?)
+                  ON CONFLICT(key) DO UPDATE SET
+                      translation = excluded.translation,
+                      context_key = excluded.context_key,
+                      last_used_at = CURRENT_TIMESTAMP''',
+                  (key, source_text, source_lang, target_lang, mode, translation, context_key))
+
+def iter_tm_entries():
+    """Yield stored translation memory segments for index building"""
+    c = get_connection().execute("""SELECT key, source_text, source_lang, target_lang, translation, context_key
+                                    FROM translation_memory ORDER BY last_used_at""")
+    try:
+        for row in c:
+            yield row
+    finally:
+        c.close()
+
+def get_term_cache_entry(term, target_lang):
+    """(translation, expires_at) for a cached term, or None"""
+    conn = get_connection()
+    row = conn.execute("SELECT translation, expires_at FROM term_cache WHERE term = ? AND target_lang = ?",
+                       (term, target_lang)).fetchone()
+    if row:
+        conn.execute("UPDATE term_cache SET hits = hits + 1 WHERE term = ? AND target_lang = ?",
+                     (term, target_lang))
+    return row
+
+def save_term_cache_entry(term, target_lang, translation, expires_at):
+    with transaction() as c:
+        c.execute('''INSERT INTO term_cache (term, target_lang, translation, expires_at)
+                  VALUES (?, ?, ?, ?)
+                  ON CONFLICT(term, target_lang) DO UPDATE SET
+                      translation = excluded.translation,
+                      expires_at = excluded.expires_at''',
+                  (term, target_lang, translation, expires_at))
+
+def purge_term_cache(now):
+    """Delete expired term cache rows and return how many were removed"""
+    with transaction() as c:
+        c.execute("DELETE FROM term_cache WHERE expires_at <= ?", (now,))
+        return c.rowcount
+
+def get_metadata_cache_entry(key):
+    """Cached metadata JSON for key, or None"""
+    conn = get_connection()
+    row = conn.execute("SELECT metadata FROM metadata_cache WHERE key = ?", (key,)).fetchone()
+    if row:
+        conn.execute("UPDATE metadata_cache SET hits = hits + 1, last_used_at = ? WHERE key = ?",
+                     (time.time(), key))
+    return row[0] if row else None
+
+def save_metadata_cache_entry(key, mode, model, metadata, max_entries):
+    """Store extracted metadata, evicting the least recently used rows beyond max_entries"""
+    with transaction() as c:
+        c.execute('''INSERT INTO metadata_cache (key, mode, model, metadata, last_used_at)
+                  VALUES (?, ?, ?, ?, ?)
+                  ON CONFLICT(key) DO UPDATE SET
+                      metadata = excluded.metadata,
+                      last_used_at = excluded.last_used_at''',
+                  (key, mode, model, metadata, time.time()))
+        c.execute('''DELETE FROM metadata_cache WHERE key IN (
+                      SELECT key FROM metadata_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)''',
+                  (max_entries,))
+        return c.rowcount
+
+def count_metadata_cache_entries():
+    return get_connection().execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0]
+
+def save_translation_spans(translation_id, spans):
+    """Store the trace spans (RequestTrace.span_dicts()) of a translation in one insert"""
+    with transaction() as c:
+        c.executemany('''INSERT INTO translation_spans
+                      (translation_id, span_id, parent_span_id, pipeline, node, started_at, ended_at,
+                       duration_ms, model, llm_calls, cache_hits, retries, prompt_chars,
+                       prompt_tokens, response_tokens, outcome)
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                      [(translation_id, span["id"], span["parent_id"], span.get("pipeline"), span["name"],
+                        span["started_at"], span["ended_at"], span["duration_ms"], span["model"],
+                        span["calls"], span["cache_hits"], span["retries"], span["prompt_chars"],
+                        span["prompt_tokens"], span["response_tokens"], span["outcome"])
+                       for span in spans])
+
+def get_translation_spans(translation_id):
+    """Span tree of one translation as dicts in start order; parent_span_id links children to parents"""
+    c = get_connection().execute('''
+        SELECT span_id, parent_span_id, pipeline, node, started_at, ended_at, duration_ms, model,
+               llm_calls, cache_hits, retries, prompt_chars, prompt_tokens, response_tokens, outcome
+        FROM translation_spans WHERE translation_id = ? ORDER BY span_id''', (translation_id,))
+    columns = [column[0] for column in c.description]
+    return [dict(zip(columns, row)) for row in c.fetchall()]
+
+def get_slowest_nodes(days=7, mode=None, intensity=None, limit=10):
+    """Nodes with the highest mean duration per translation mode and intensity over the last days"""
+    where = ["s.started_at >= ?", "s.parent_span_id IS NOT NULL"]
+    params = [time.time() - days * 86400]
+    if mode is not None:
+        where.append("t.mode = ?")
+        params.append(mode)
+    if intensity is not None:
+        where.append("t.intensity = ?")
+        params.append(intensity)
+    params.append(limit)
+    c = get_connection().execute(f'''
+        SELECT t.mode, t.intensity, s.node, COUNT(*) AS runs,
+               ROUND(AVG(s.duration_ms), 2) AS avg_ms, ROUND(MAX(s.duration_ms), 2) AS max_ms,
+               SUM(s.llm_calls) AS llm_calls, SUM(s.retries) AS retries
+        FROM translation_spans s JOIN translations t ON t.id = s.translation_id
+        WHERE {" AND ".join(where)}
+        GROUP BY t.mode, t.intensity, s.node
+        ORDER BY avg_ms DESC
+        LIMIT ?''', params)
+    columns = [column[0] for column in c.description]
+    return [dict(zip(columns, row)) for row in c.fetchall()]
+
+def get_projects_by_retries(days=7, limit=10):
+    """Projects whose translations needed the most correction retries over the last days"""
+    c = get_connection().execute('''
+        SELECT p.id AS project_id, p.name, COUNT(DISTINCT t.id) AS translations,
+               SUM(s.retries) AS retries
+        FROM translation_spans s
+        JOIN translations t ON t.id = s.translation_id
+        JOIN projects p ON p.id = t.project_id
+        WHERE s.started_at >= ?
+        GROUP BY p.id
+        HAVING SUM(s.retries) > 0
+        ORDER BY retries DESC
+        LIMIT ?''', (time.time() - days * 86400, limit))
+    columns = [column[0] for column in c.description]
+    return [dict(zip(columns, row)) for row in c.fetchall()]
 
 # Initialize database on import
-init_db()
\ No newline at end of file
+init_db()
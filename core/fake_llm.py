@@ -0,0 +1,166 @@
+"""Deterministic offline stand-ins for the Gemini clients.
+
+Enabled process-wide with TRANSCEND_FAKE_LLM=1 (see core.llm_registry);
+used by benchmarks and offline runs. Responses are canned by prompt shape
+so every pipeline can run end to end without network access.
+TRANSCEND_FAKE_LLM_RESPONSES names a JSON file of {"prompt substring":
+"response"} overrides, and each call waits for a latency drawn from a
+seeded LatencyModel.
+"""
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+# Sample output per target language, in the right script so the
+# language validators accept it
+SAMPLE_TEXT = {
+    "tamil": "இது ஒரு மொழிபெயர்ப்பு",
+    "hindi": "यह एक अनुवाद है",
+    "russian": "Это перевод",
+    "french": "Voilà une traduction précise",
+    "english": "This is the translation and the result",
+}
+
+def load_response_overrides(path: Optional[str]) -> Dict[str, str]:
+    """Lowercased {prompt substring: response} rules from a JSON file ({} when path is empty)"""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {substring.lower(): response for substring, response in json.load(f).items()}
+
+# Checked in order before the built-in rules; the first substring found wins
+RESPONSE_OVERRIDES = load_response_overrides(os.getenv("TRANSCEND_FAKE_LLM_RESPONSES", ""))
+
+def canned_response(prompt: str) -> str:
+    """Plausible response for a prompt, chosen by its instructions"""
+    lowered = prompt.lower()
+    for substring, response in RESPONSE_OVERRIDES.items():
+        if substring in lowered:
+            return response
+    if 'respond only with "good"' in lowered:
+        return "GOOD"
+    if 'respond with only "yes" or "no"' in lowered:
+        return "YES"
+    if "json array" in lowered:
+        return "[]"
+    if "json" in lowered:
+        return "{}"
+
+    target = re.search(r"(?:target(?: language)?:|to proper|translate this text to|"
+                       r"in|to)\s*\**\s*(tamil|hindi|russian|french|english)", lowered)
+    if target:
+        return SAMPLE_TEXT[target.group(1)]
+    for language, sample in SAMPLE_TEXT.items():
+        if language in lowered:
+            return sample
+    return SAMPLE_TEXT["english"]
+
+class LatencyModel:
+    """Per-call delay in seconds, fixed or drawn from a seeded distribution.
+
+    jitter is the half-width for "uniform", the standard deviation for
+    "normal" and the shape (sigma) for "lognormal", whose median is mean;
+    "exponential" only uses mean.
+    """
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    def __init__(self, mean: float = 0.0, distribution: str = "fixed", jitter: float = 0.0, seed: int = 0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.mean = mean
+        self.distribution = distribution
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LatencyModel":
+        return cls(float(os.getenv("TRANSCEND_FAKE_LLM_LATENCY", "0")),
+                   os.getenv("TRANSCEND_FAKE_LLM_LATENCY_DIST", "fixed"),
+                   float(os.getenv("TRANSCEND_FAKE_LLM_JITTER", "0")),
+                   int(os.getenv("TRANSCEND_FAKE_LLM_SEED", "0")))
+
+    def sample(self) -> float:
+        if self.mean <= 0 or self.distribution == "fixed":
+            return max(self.mean, 0.0)
+        with self._lock:
+            if self.distribution == "uniform":
+                delay = self._random.uniform(self.mean - self.jitter, self.mean + self.jitter)
+            elif self.distribution == "normal":
+                delay = self._random.gauss(self.mean, self.jitter)
+            elif self.distribution == "lognormal":
+                delay = self._random.lognormvariate(math.log(self.mean), self.jitter)
+            else:
+                delay = self._random.expovariate(1 / self.mean)
+        return max(delay, 0.0)
+
+def _latency_model(latency) -> LatencyModel:
+    return latency if isinstance(latency, LatencyModel) else LatencyModel(latency)
+
+def stream_chunks(text: str, latency: float, token_latency: float):
+    """Yield text word by word: the first chunk after latency, the rest token_latency apart"""
+    if latency:
+        time.sleep(latency)
+    for i, token in enumerate(re.findall(r"\S+\s*", text)):
+        if i and token_latency:
+            time.sleep(token_latency)
+        yield token
+
+class FakeMessage:
+    """Mimics the LangChain AIMessage fields the pipelines read"""
+    def __init__(self, content: str):
+        self.content = content
+
+class FakeResponse:
+    """Mimics the google.generativeai response fields the pipelines read"""
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeChatModel:
+    """Offline replacement for ChatGoogleGenerativeAI; latency is seconds or a LatencyModel"""
+    def __init__(self, model: str = "fake", latency=0.0, token_latency: float = 0.0, **kwargs):
+        self.model = model
+        self.latency = _latency_model(latency)
+        self.token_latency = token_latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt, **kwargs) -> FakeMessage:
+        with self._lock:
+            self.calls += 1
+        delay = self.latency.sample()
+        if delay:
+            time.sleep(delay)
+        return FakeMessage(canned_response(str(prompt)))
+
+    def stream(self, prompt, **kwargs):
+        """Yield FakeMessage chunks like ChatGoogleGenerativeAI.stream"""
+        with self._lock:
+            self.calls += 1
+        for token in stream_chunks(canned_response(str(prompt)), self.latency.sample(), self.token_latency):
+            yield FakeMessage(token)
+
+class FakeGenerativeModel:
+    """Offline replacement for genai.GenerativeModel; latency is seconds or a LatencyModel"""
+    def __init__(self, model_name: str = "fake", latency=0.0, token_latency: float = 0.0, **kwargs):
+        self.model_name = model_name
+        self.latency = _latency_model(latency)
+        self.token_latency = token_latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if stream:
+            return (FakeResponse(token) for token in
+                    stream_chunks(canned_response(str(prompt)), self.latency.sample(), self.token_latency))
+        delay = self.latency.sample()
+        if delay:
+            time.sleep(delay)
+        return FakeResponse(canned_response(str(prompt)))
@@ -0,0 +1,321 @@
+# instrumentation.py
+"""Per-node timing, LLM call and token instrumentation.
+
+A pipeline run inside trace_request() records every node decorated with
+@instrumented() as a span: its wall time and, through the registry's
+client proxies, each LLM call it makes (prompt and response characters,
+token estimates, cache hits, and retries, i.e. language corrections and
+repeated attempts). The trace summary goes into the result context;
+finished traces feed process-wide per-node aggregates with p50/p95 wall
+times, exported in the Prometheus text format and, when METRICS_FILE is
+set, written to that file after every request.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+from core.budget import estimate_tokens
+from utils.helpers import percentile
+
+# Wall times kept per node for the percentiles
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1000"))
+# Prometheus textfile rewritten after each request (disabled when empty)
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+# Call sites whose LLM calls count as retries of the node making them
+RETRY_CALL_SITES = ("language_correction",)
+
+class Span:
+    """One run of a node, or the whole request for the root span"""
+    __slots__ = ("id", "name", "parent_id", "started_at", "ended_at", "duration_ms", "model", "outcome",
+                 "calls", "cache_hits", "retries", "prompt_chars", "response_chars",
+                 "prompt_tokens", "response_tokens", "_start")
+
+    def __init__(self, span_id: int, name: str, parent_id: Optional[int] = None):
+        self.id = span_id
+        self.name = name
+        self.parent_id = parent_id
+        self.started_at = time.time()
+        self.ended_at = None
+        self.duration_ms = None
+        self.model = None
+        self.outcome = "ok"
+        self.calls = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+        self._start = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        if self.duration_ms is not None:
+            return self.duration_ms
+        return round((time.perf_counter() - self._start) * 1000, 2)
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__ if not name.startswith("_")}
+
+# Per-node totals summed over spans
+_COUNTERS = ("calls", "cache_hits", "retries", "prompt_chars", "response_chars",
+             "prompt_tokens", "response_tokens")
+
+class RequestTrace:
+    """Spans of one request; nodes running in worker threads add to it concurrently"""
+    def __init__(self, pipeline: str):
+        self.pipeline = pipeline
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self.open("request")
+
+    def open(self, name: str, parent: Optional[Span] = None) -> Span:
+        with self._lock:
+            span = Span(len(self.spans) + 1, name, parent.id if parent else None)
+            self.spans.append(span)
+            return span
+
+    def close(self, span: Span):
+        span.ended_at = time.time()
+        span.duration_ms = round((time.perf_counter() - span._start) * 1000, 2)
+
+    def record_call(self, span: Span, model: Optional[str], prompt: str, response: str,
+                    cached: bool, retry: bool):
+        with self._lock:
+            span.calls += 1
+            span.cache_hits += cached
+            span.retries += retry
+            span.prompt_chars += len(prompt)
+            span.response_chars += len(response)
+            span.prompt_tokens += estimate_tokens(prompt)
+            span.response_tokens += estimate_tokens(response)
+            if span.model is None:
+                span.model = model
+
+    def count_retry(self, span: Span):
+        with self._lock:
+            span.retries += 1
+
+    def adopt(self, span_dicts: List[Dict], parent: Span):
+        """Add copies of another trace's spans (its root left out) below parent"""
+        with self._lock:
+            ids = {}
+            for data in span_dicts:
+                if data["parent_id"] is None:
+                    ids[data["id"]] = parent
+                    continue
+                copied = Span(len(self.spans) + 1, data["name"], ids.get(data["parent_id"], parent).id)
+                for name in ("started_at", "ended_at", "duration_ms", "model", *_COUNTERS):
+                    setattr(copied, name, data[name])
+                copied.outcome = "coalesced"
+                ids[data["id"]] = copied
+                self.spans.append(copied)
+
+    def summary(self) -> Dict:
+        """Totals for the request and per node name"""
+        nodes = {}
+        totals = dict.fromkeys(_COUNTERS, 0)
+        with self._lock:
+            for span in self.spans:
+                for counter in _COUNTERS:
+                    totals[counter] += getattr(span, counter)
+                if span is self.root:
+                    continue
+                node = nodes.setdefault(span.name, {"runs": 0, "wall_ms": 0.0, "errors": 0,
+                                                    **dict.fromkeys(_COUNTERS, 0)})
+                node["runs"] += 1
+                node["wall_ms"] = round(node["wall_ms"] + span.elapsed_ms(), 2)
+                node["errors"] += span.outcome == "error"
+                for counter in _COUNTERS:
+                    node[counter] += getattr(span, counter)
+        return {"pipeline": self.pipeline, "wall_ms": self.root.elapsed_ms(), **totals, "nodes": nodes}
+
+    def span_dicts(self) -> List[Dict]:
+        """Every span as a plain dict, in start order (for core.database.save_translation_spans)"""
+        with self._lock:
+            return [{**span.to_dict(), "pipeline": self.pipeline} for span in self.spans]
+
+def pipeline_label(mode: str, framework: str = "") -> str:
+    """Trace name of a translation mode: basic, advanced, langgraph, crewai or expert"""
+    if mode == "agentic":
+        return "langgraph" if "LangGraph" in (framework or "") else "crewai"
+    return mode
+
+_trace = contextvars.ContextVar("request_trace", default=None)
+_span = contextvars.ContextVar("current_span", default=None)
+
+def current_trace() -> Optional[RequestTrace]:
+    return _trace.get()
+
+@contextmanager
+def trace_request(pipeline: str):
+    """Trace the pipeline run inside this block; a nested block joins the outer request"""
+    trace = _trace.get()
+    if trace is not None:
+        yield trace
+        return
+    trace = RequestTrace(pipeline)
+    trace_token = _trace.set(trace)
+    span_token = _span.set(trace.root)
+    try:
+        yield trace
+    except BaseException:
+        trace.root.outcome = "error"
+        raise
+    finally:
+        _span.reset(span_token)
+        _trace.reset(trace_token)
+        trace.close(trace.root)
+        _aggregate(trace)
+
+@contextmanager
+def span(name: str):
+    """Record the block as a span of the current request (no-op outside trace_request)"""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.open(name, _span.get())
+    token = _span.set(current)
+    try:
+        yield current
+    except BaseException:
+        current.outcome = "error"
+        raise
+    finally:
+        _span.reset(token)
+        trace.close(current)
+
+def instrumented(name: str):
+    """Decorator recording each run of a pipeline node as a span"""
+    def decorate(fn):
+        @wraps(fn)
+        def run(*args, **kwargs):
+            if _trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return run
+    return decorate
+
+def record_llm_call(model: Optional[str], prompt, response: str, cached: bool = False, site: str = ""):
+    """Charge one LLM call to the innermost running span"""
+    trace = _trace.get()
+    if trace is None:
+        return
+    trace.record_call(_span.get() or trace.root, model, str(prompt), response or "", cached,
+                      site in RETRY_CALL_SITES)
+
+def count_retry():
+    """Count a repeated attempt (e.g. a retranslation after a failed validation) on the running span"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.count_retry(_span.get() or trace.root)
+
+def _traced(fn, *args, **kwargs):
+    result = fn(*args, **kwargs)
+    trace = _trace.get()
+    return result, trace.span_dicts() if trace is not None else None
+
+def shared_run(flight, key: str, fn, *args, **kwargs):
+    """fn(*args, **kwargs) through a SingleFlight; a caller sharing another's run adopts its spans.
+
+    The adopted spans are marked "coalesced": they show which nodes produced
+    the result but stay out of the process-wide aggregates, which counted
+    them for the original request.
+    """
+    (result, spans), shared = flight.run(key, _traced, fn, *args, **kwargs)
+    trace = _trace.get()
+    if shared and trace is not None and spans:
+        trace.adopt(spans, _span.get() or trace.root)
+    return result
+
+# Process-wide aggregates per (pipeline, node)
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def _aggregate(trace: RequestTrace):
+    with trace._lock:
+        spans = list(trace.spans)
+    with _metrics_lock:
+        for finished in spans:
+            if finished.outcome == "coalesced":
+                continue
+            metrics = _metrics.get((trace.pipeline, finished.name))
+            if metrics is None:
+                metrics = _metrics[(trace.pipeline, finished.name)] = {
+                    "durations": deque(maxlen=METRICS_WINDOW), "runs": 0, "wall_ms": 0.0, "errors": 0,
+                    **dict.fromkeys(_COUNTERS, 0)
+                }
+            metrics["durations"].append(finished.elapsed_ms())
+            metrics["runs"] += 1
+            metrics["wall_ms"] += finished.elapsed_ms()
+            metrics["errors"] += finished.outcome == "error"
+            for counter in _COUNTERS:
+                metrics[counter] += getattr(finished, counter)
+    if METRICS_FILE:
+        try:
+            write_metrics_file(METRICS_FILE)
+        except OSError:
+            pass
+
+def get_node_metrics() -> Dict:
+    """Per "pipeline/node" run counts, p50/p95 wall time and LLM usage since start-up"""
+    with _metrics_lock:
+        snapshot = {key: {**metrics, "durations": list(metrics["durations"])}
+                    for key, metrics in _metrics.items()}
+    stats = {}
+    for (pipeline, node), metrics in sorted(snapshot.items()):
+        durations = metrics.pop("durations")
+        stats[f"{pipeline}/{node}"] = {
+            **metrics,
+            "wall_ms": round(metrics["wall_ms"], 2),
+            "p50_ms": percentile(durations, 50),
+            "p95_ms": percentile(durations, 95)
+        }
+    return stats
+
+# (metric name, help text, aggregate field) of the per-node counters
+_PROMETHEUS_COUNTERS = (
+    ("transcend_node_runs_total", "Node runs", "runs"),
+    ("transcend_node_errors_total", "Node runs that raised", "errors"),
+    ("transcend_node_llm_calls_total", "LLM calls made by the node", "calls"),
+    ("transcend_node_cache_hits_total", "LLM calls answered from the response cache", "cache_hits"),
+    ("transcend_node_retries_total", "Language corrections and repeated attempts", "retries"),
+    ("transcend_node_prompt_tokens_total", "Estimated prompt tokens", "prompt_tokens"),
+    ("transcend_node_response_tokens_total", "Estimated response tokens", "response_tokens"),
+)
+
+def prometheus_text() -> str:
+    """Node metrics in the Prometheus text exposition format"""
+    with _metrics_lock:
+        snapshot = {key: {**metrics, "durations": list(metrics["durations"])}
+                    for key, metrics in _metrics.items()}
+    labels = {key: f'pipeline="{key[0]}",node="{key[1]}"' for key in snapshot}
+    lines = ["# HELP transcend_node_duration_ms Wall time of node runs in milliseconds",
+             "# TYPE transcend_node_duration_ms summary"]
+    for key, metrics in sorted(snapshot.items()):
+        for quantile in (50, 95):
+            lines.append(f'transcend_node_duration_ms{{{labels[key]},quantile="{quantile / 100}"}} '
+                         f'{percentile(metrics["durations"], quantile)}')
+        lines.append(f"transcend_node_duration_ms_sum{{{labels[key]}}} {round(metrics['wall_ms'], 2)}")
+        lines.append(f"transcend_node_duration_ms_count{{{labels[key]}}} {metrics['runs']}")
+    for name, help_text, field in _PROMETHEUS_COUNTERS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines += [f"{name}{{{labels[key]}}} {metrics[field]}" for key, metrics in sorted(snapshot.items())]
+    return "\n".join(lines) + "\n"
+
+def write_metrics_file(path: str = METRICS_FILE):
+    """Atomically replace path with the current metrics (node_exporter textfile format)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+def reset_node_metrics():
+    with _metrics_lock:
+        _metrics.clear()
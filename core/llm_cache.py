@@ -0,0 +1,301 @@
+# llm_cache.py
+"""Content-addressed cache for LLM responses.
+
+Clients handed out by core.llm_registry are wrapped in proxies that look
+up every prompt by a hash of (client, prompt, generation config) before
+calling the model, so re-running a request replays from the cache. The
+proxies also report every call, cached or not, to core.instrumentation.
+Call sites label themselves with call_site(), which drives the per-node
+statistics and lets a site opt out:
+
+    with call_site("validate", cache=False):
+        response = llm.invoke(prompt)
+
+    @call_site("enrich")
+    def enrich_node(state): ...
+"""
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from core.instrumentation import record_llm_call
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "disk")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "4096"))
+
+# (node name, caching allowed) of the code currently calling the LLM
+_call_site = contextvars.ContextVar("llm_call_site", default=("other", True))
+
+@contextmanager
+def call_site(name: str, cache: bool = True):
+    """Label the LLM calls made inside this block (also usable as a decorator).
+
+    cache=False also holds for every call site nested inside the block.
+    """
+    token = _call_site.set((name, cache and _call_site.get()[1]))
+    try:
+        yield
+    finally:
+        _call_site.reset(token)
+
+def current_call_site() -> tuple:
+    return _call_site.get()
+
+class MemoryBackend:
+    """In-process LRU backend"""
+    def __init__(self, max_entries: int = LLM_CACHE_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def info(self) -> Dict:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries)}
+
+class DiskBackend:
+    """SQLite file backend, evicting least recently used entries above max_bytes"""
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used_at REAL NOT NULL
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used_at)")
+            self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._connection()
+        row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        conn = self._connection()
+        # Overwriting a key only adds the difference to the running total
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute("""INSERT INTO responses (key, response, size, last_used_at) VALUES (?, ?, ?, ?)
+                            ON CONFLICT(key) DO UPDATE SET response = excluded.response,
+                                size = excluded.size, last_used_at = excluded.last_used_at""",
+                         (key, value, size, time.time()))
+        with self._lock:
+            self._bytes += size - (row[0] if row else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        # Trim to 90% so eviction does not run on every insert at the limit
+        target = int(self.max_bytes * 0.9)
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > target:
+            conn.execute("""DELETE FROM responses WHERE key IN (
+                                SELECT key FROM (
+                                    SELECT key, SUM(size) OVER (ORDER BY last_used_at DESC) AS kept
+                                    FROM responses)
+                                WHERE kept > ?)""", (target,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._bytes = total
+
+    def info(self) -> Dict:
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"backend": "disk", "path": self.path, "entries": entries,
+                "bytes": size, "max_bytes": self.max_bytes}
+
+class LLMCache:
+    """Response cache with per-call-site hit statistics"""
+    def __init__(self, backend):
+        self.backend = backend
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(client_key, prompt, config=None) -> str:
+        payload = json.dumps([client_key, prompt, config or {}], sort_keys=True,
+                             ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, node: str, outcome: str):
+        with self._lock:
+            stats = self._stats.setdefault(node, {"hits": 0, "misses": 0, "bypassed": 0})
+            stats[outcome] += 1
+
+    def lookup(self, key: str) -> tuple:
+        """(cached response or None, whether the response may be stored)"""
+        node, enabled = current_call_site()
+        if not enabled:
+            self._count(node, "bypassed")
+            return None, False
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            value = None
+        self._count(node, "hits" if value is not None else "misses")
+        return value, True
+
+    def store(self, key: str, value: str):
+        if not value:
+            return
+        try:
+            self.backend.put(key, value)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            nodes = {node: dict(stats) for node, stats in self._stats.items()}
+        for stats in nodes.values():
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        try:
+            backend = self.backend.info()
+        except Exception as e:
+            backend = {"error": str(e)}
+        return {"backend": backend, "nodes": nodes}
+
+class CachedMessage:
+    """Chat response replayed from the cache"""
+    def __init__(self, content: str):
+        self.content = content
+
+class CachedResponse:
+    """generate_content response replayed from the cache"""
+    def __init__(self, text: str):
+        self.text = text
+
+class _ClientProxy:
+    """Shared plumbing of the client proxies; cache is None when LLM_CACHE=0"""
+    def __init__(self, client, cache: Optional[LLMCache], client_key):
+        self._client = client
+        self._cache = cache
+        self._client_key = client_key
+        self._model = client_key[2] if isinstance(client_key, tuple) and len(client_key) > 2 else None
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _lookup(self, prompt, config) -> tuple:
+        """(cache key, cached response or None, whether the response may be stored)"""
+        if self._cache is None:
+            return None, None, False
+        key = self._cache.make_key(self._client_key, str(prompt), config)
+        cached, storable = self._cache.lookup(key)
+        return key, cached, storable
+
+    def _record(self, prompt, response: str, cached: bool = False):
+        record_llm_call(self._model, prompt, response, cached, current_call_site()[0])
+
+class CachedChatModel(_ClientProxy):
+    """Chat client proxy answering repeated prompts from the cache"""
+    def invoke(self, prompt, **kwargs):
+        key, cached, storable = self._lookup(prompt, kwargs)
+        if cached is not None:
+            self._record(prompt, cached, cached=True)
+            return CachedMessage(cached)
+        response = self._client.invoke(prompt, **kwargs)
+        content = response.content if isinstance(response.content, str) else ""
+        self._record(prompt, content)
+        if storable and content:
+            self._cache.store(key, content)
+        return response
+
+    def stream(self, prompt, **kwargs):
+        key, cached, storable = self._lookup(prompt, kwargs)
+        if cached is not None:
+            self._record(prompt, cached, cached=True)
+            yield CachedMessage(cached)
+            return
+        text = ""
+        for chunk in self._client.stream(prompt, **kwargs):
+            text += chunk.content
+            yield chunk
+        self._record(prompt, text)
+        if storable:
+            self._cache.store(key, text)
+
+class CachedGenerativeModel(_ClientProxy):
+    """generate_content proxy answering repeated prompts from the cache"""
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        key, cached, storable = self._lookup(prompt, {"generation_config": generation_config, **kwargs})
+        if cached is not None:
+            self._record(prompt, cached, cached=True)
+            return iter([CachedResponse(cached)]) if stream else CachedResponse(cached)
+        if stream:
+            return self._stream(key, storable, prompt, generation_config, **kwargs)
+        response = self._client.generate_content(prompt, generation_config=generation_config, **kwargs)
+        try:
+            text = response.text
+        except ValueError:
+            # Blocked or empty candidates have no text to record or cache
+            text = ""
+        self._record(prompt, text)
+        if storable and text:
+            self._cache.store(key, text)
+        return response
+
+    def _stream(self, key, storable, prompt, generation_config, **kwargs):
+        text = ""
+        for chunk in self._client.generate_content(prompt, generation_config=generation_config,
+                                                   stream=True, **kwargs):
+            text += chunk.text
+            yield chunk
+        self._record(prompt, text)
+        if storable:
+            self._cache.store(key, text)
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Process-wide response cache, or None when LLM_CACHE=0"""
+    global _shared_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            backend = DiskBackend() if LLM_CACHE_BACKEND == "disk" else MemoryBackend()
+            _shared_cache = LLMCache(backend)
+        return _shared_cache
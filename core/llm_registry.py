@@ -0,0 +1,122 @@
+import google.generativeai as genai
+from langchain_google_genai import ChatGoogleGenerativeAI
+from dotenv import load_dotenv
+import os
+import json
+import threading
+from typing import Callable, Dict, Optional
+from core.fake_llm import FakeChatModel, FakeGenerativeModel, LatencyModel
+from core.llm_cache import get_llm_cache, CachedChatModel, CachedGenerativeModel
+
+load_dotenv()
+
+DEFAULT_MODEL = "gemini-2.5-flash-preview-05-20"
+
+def use_fake_llm() -> bool:
+    """True when offline fake clients should replace Gemini"""
+    return os.getenv("TRANSCEND_FAKE_LLM", "0") == "1"
+
+def _fake_latency() -> LatencyModel:
+    return LatencyModel.from_env()
+
+def _fake_token_latency() -> float:
+    return float(os.getenv("TRANSCEND_FAKE_LLM_TOKEN_LATENCY", "0"))
+
+# Process-wide client registry. Clients own their HTTP sessions, so reusing
+# a client reuses its pooled connections across nodes, requests and threads.
+_clients = {}
+_usage = {}
+_lock = threading.Lock()
+_genai_configured = False
+
+def _lookup(key, factory, proxy):
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            # Every client reports its calls to core.instrumentation and answers
+            # repeated prompts from the shared response cache (unless LLM_CACHE=0)
+            client = proxy(client, get_llm_cache(), key)
+            _clients[key] = client
+            _usage[key] = {"created": 1, "reused": 0}
+        else:
+            _usage[key]["reused"] += 1
+        return client
+
+def get_chat_model(model: str = DEFAULT_MODEL, temperature: float = 0.3,
+                   max_tokens: Optional[int] = None, **kwargs) -> ChatGoogleGenerativeAI:
+    """Shared LangChain Gemini chat client for (model, temperature, max tokens)"""
+    key = ("chat", "fake" if use_fake_llm() else None, model, temperature, max_tokens,
+           tuple(sorted(kwargs.items())))
+
+    def factory():
+        if use_fake_llm():
+            return FakeChatModel(model, latency=_fake_latency(), token_latency=_fake_token_latency())
+        params = {
+            "model": model,
+            "google_api_key": os.getenv("GEMINI_API_KEY"),
+            "temperature": temperature,
+            **kwargs
+        }
+        if max_tokens is not None:
+            params["max_output_tokens"] = max_tokens
+        return ChatGoogleGenerativeAI(**params)
+
+    return _lookup(key, factory, CachedChatModel)
+
+def get_generative_model(model_name: str = DEFAULT_MODEL,
+                         generation_config: Optional[Dict] = None) -> genai.GenerativeModel:
+    """Shared google.generativeai model, configuring the SDK only once"""
+    key = ("genai", "fake" if use_fake_llm() else None, model_name,
+           json.dumps(generation_config or {}, sort_keys=True))
+
+    def factory():
+        global _genai_configured
+        if use_fake_llm():
+            return FakeGenerativeModel(model_name, latency=_fake_latency(),
+                                       token_latency=_fake_token_latency())
+        if not _genai_configured:
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            _genai_configured = True
+        return genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+
+    return _lookup(key, factory, CachedGenerativeModel)
+
+def stream_chat(llm, prompt, on_partial: Callable[[str], None]) -> str:
+    """Stream a chat model's reply, passing the text received so far to on_partial"""
+    text = ""
+    for chunk in llm.stream(prompt):
+        text += chunk.content
+        on_partial(text)
+    return text.strip()
+
+def stream_generate(model, prompt, on_partial: Callable[[str], None],
+                    generation_config: Optional[Dict] = None) -> str:
+    """Streaming generate_content on a generative model; see stream_chat"""
+    text = ""
+    for chunk in model.generate_content(prompt, generation_config=generation_config, stream=True):
+        text += chunk.text
+        on_partial(text)
+    return text.strip()
+
+def get_registry_stats() -> Dict:
+    """Client creation and reuse counts, overall and per client key"""
+    with _lock:
+        created = sum(u["created"] for u in _usage.values())
+        reused = sum(u["reused"] for u in _usage.values())
+        return {
+            "clients": len(_clients),
+            "created": created,
+            "reused": reused,
+            "reuse_ratio": round(reused / (created + reused), 3) if created + reused else 0.0,
+            "by_client": {"/".join(str(part) for part in key[:5] if part is not None): dict(usage)
+                          for key, usage in _usage.items()}
+        }
+
+def clear_registry():
+    """Drop all cached clients (e.g. after the API key changes)"""
+    global _genai_configured
+    with _lock:
+        _clients.clear()
+        _usage.clear()
+        _genai_configured = False
@@ -0,0 +1,176 @@
+# segmentation.py
+import contextvars
+import os
+import re
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+# Long documents are split into segments of at most SEGMENT_MAX_CHARS
+# (a single longer sentence stays whole) and translated SEGMENT_WORKERS at a time
+SEGMENT_MAX_CHARS = int(os.getenv("SEGMENT_MAX_CHARS", "1500"))
+SEGMENT_WORKERS = int(os.getenv("SEGMENT_WORKERS", "4"))
+# How much of the neighbouring source segments each prompt sees
+NEIGHBOR_CONTEXT_CHARS = int(os.getenv("NEIGHBOR_CONTEXT_CHARS", "300"))
+
+# separator is the whitespace that followed the segment in the source
+Segment = namedtuple("Segment", ["text", "separator"])
+
+# Sentence ends: Latin/Cyrillic punctuation, the Devanagari danda and CJK
+# full stops, optionally followed by closing quotes or brackets
+_SENTENCE_END = re.compile(r"([.!?…।॥]+[\"'”’»)\]]*)(\s+)|([。！？]+[\"'”’»)\]]*)(\s*)")
+_PARAGRAPH_BREAK = re.compile(r"(\n[ \t]*\n\s*)")
+_LAST_WORD = re.compile(r"(\S+)$")
+
+# Abbreviations whose trailing period does not end a sentence
+ABBREVIATIONS = {
+    "english": {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+                "inc", "ltd", "co", "no", "fig", "approx", "dept", "jan", "feb", "mar", "apr",
+                "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "a.m", "p.m"},
+    "french": {"m", "mme", "mlle", "dr", "pr", "st", "ste", "etc", "cf", "p.ex", "env", "av", "apr", "n°"},
+    "russian": {"т.е", "т.д", "т.п", "др", "пр", "г", "гг", "ул", "им", "см", "стр", "тыс", "млн", "руб"},
+    "hindi": {"डॉ", "श्री", "श्रीमती"},
+}
+
+def _is_abbreviation(sentence: str, abbreviations: set) -> bool:
+    word = _LAST_WORD.search(sentence)
+    if not word:
+        return False
+    token = word.group(1).rstrip(".").lstrip("(\"'“‘«").lower()
+    # Single-letter initials such as "J. Smith"
+    return token in abbreviations or (len(token) == 1 and token.isalpha())
+
+def split_sentences(text: str, language: str = "English") -> List[Segment]:
+    """Split a paragraph into sentences, keeping the whitespace after each"""
+    abbreviations = ABBREVIATIONS.get((language or "").lower(), set().union(*ABBREVIATIONS.values()))
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        end = match.start(2) if match.group(1) else match.start(4)
+        sentence = text[start:end]
+        if (match.group(1) and match.group(1).startswith(".")
+                and _is_abbreviation(sentence[:-len(match.group(1))], abbreviations)):
+            continue
+        sentences.append(Segment(sentence, match.group(2) or match.group(4) or ""))
+        start = match.end()
+    if start < len(text):
+        sentences.append(Segment(text[start:], ""))
+    return [s for s in sentences if s.text.strip()]
+
+def segment_text(text: str, language: str = "English", max_chars: int = SEGMENT_MAX_CHARS) -> List[Segment]:
+    """Split text into paragraph-aligned segments of whole sentences.
+
+    Text up to max_chars comes back as a single segment, so short requests
+    go through the pipelines exactly as before.
+    """
+    text = (text or "").strip()
+    if len(text) <= max_chars:
+        return [Segment(text, "")]
+
+    segments = []
+    parts = _PARAGRAPH_BREAK.split(text)
+    for paragraph, paragraph_break in zip(parts[::2], parts[1::2] + [""]):
+        chunk, chunk_separator = "", ""
+        for sentence in split_sentences(paragraph, language):
+            if chunk and len(chunk) + len(chunk_separator) + len(sentence.text) > max_chars:
+                segments.append(Segment(chunk, chunk_separator))
+                chunk, chunk_separator = "", ""
+            chunk = f"{chunk}{chunk_separator}{sentence.text}" if chunk else sentence.text
+            chunk_separator = sentence.separator
+        if chunk:
+            segments.append(Segment(chunk, paragraph_break or chunk_separator))
+    return segments or [Segment(text, "")]
+
+def segment_neighbors(segments: List[Segment], index: int,
+                      max_chars: int = NEIGHBOR_CONTEXT_CHARS) -> Dict[str, str]:
+    """Tail of the previous and head of the next source segment"""
+    neighbors = {}
+    if index > 0:
+        neighbors["previous"] = segments[index - 1].text[-max_chars:]
+    if index + 1 < len(segments):
+        neighbors["next"] = segments[index + 1].text[:max_chars]
+    return neighbors
+
+def neighbor_prompt(neighbors: Dict[str, str]) -> str:
+    """Prompt block with the surrounding text; empty for unsegmented requests"""
+    if not neighbors:
+        return ""
+    block = "\nSurrounding Text (context only, do NOT translate):\n"
+    if neighbors.get("previous"):
+        block += f"Before: ...{neighbors['previous']}\n"
+    if neighbors.get("next"):
+        block += f"After: {neighbors['next']}...\n"
+    return block
+
+class OrderedStream:
+    """Merges concurrently streamed segments into one in-order partial text.
+
+    Each segment reports its own text so far; on_partial receives the
+    finished segments plus the first unfinished one, so the reader sees
+    the document grow from the top while later segments are buffered.
+    """
+    def __init__(self, segments: List[Segment], on_partial: Callable[[str], None]):
+        self.segments = segments
+        self.on_partial = on_partial
+        self._texts = [""] * len(segments)
+        self._done = [False] * len(segments)
+        self._current = 0
+        self._emitted = ""
+        self._lock = threading.Lock()
+
+    def update(self, index: int, text: str):
+        with self._lock:
+            self._texts[index] = text
+            self._emit(index)
+
+    def finish(self, index: int):
+        with self._lock:
+            self._done[index] = True
+            self._emit(index)
+
+    def _emit(self, index: int):
+        while self._current < len(self.segments) - 1 and self._done[self._current]:
+            self._current += 1
+        if index <= self._current:
+            end = self._current + 1
+            text = join_segments(self.segments[:end], self._texts[:end])
+            if text != self._emitted:
+                self._emitted = text
+                self.on_partial(text)
+
+def translate_segments(segments: List[Segment], translate_segment: Callable,
+                       workers: int = SEGMENT_WORKERS,
+                       on_partial: Optional[Callable[[str], None]] = None) -> list:
+    """Run translate_segment(text, neighbors) for every segment, concurrently.
+
+    Results come back in segment order; an exception in any segment
+    propagates to the caller. With on_partial, translate_segment is also
+    given an on_partial keyword for its own stream and the streams are
+    merged in document order.
+    """
+    jobs = [(segment.text, segment_neighbors(segments, i)) for i, segment in enumerate(segments)]
+    stream = OrderedStream(segments, on_partial) if on_partial is not None else None
+
+    def run(index, context=None):
+        if context is not None:
+            # Worker threads inherit the caller's context variables, e.g. the LLM call site
+            return context.run(run, index)
+        if stream is None:
+            return translate_segment(*jobs[index])
+        try:
+            return translate_segment(*jobs[index], on_partial=partial(stream.update, index))
+        finally:
+            stream.finish(index)
+
+    if len(jobs) == 1 or workers <= 1:
+        return [run(i) for i in range(len(jobs))]
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs)), thread_name_prefix="segment") as pool:
+        return list(pool.map(run, range(len(jobs)),
+                             [contextvars.copy_context() for _ in jobs]))
+
+def join_segments(segments: List[Segment], translations: List[str]) -> str:
+    """Reassemble translated segments with the source's paragraph and sentence spacing"""
+    return "".join(f"{translation}{segment.separator}"
+                   for segment, translation in zip(segments, translations)).strip()
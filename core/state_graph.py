@@ -1,11 +1,19 @@
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableConfig
 from typing import TypedDict, Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 import os
 import json
 import time
 import re
+import threading
+from core.llm_registry import get_chat_model, stream_chat
+from core.llm_cache import call_site
+from core.segmentation import segment_text, translate_segments, join_segments, neighbor_prompt
+from utils.script_profile import language_matches
+from utils.languages import count_language_correction
+from core.budget import RequestBudget, budget_of, MAX_VALIDATE_RETRIES
+from core.instrumentation import instrumented, span, count_retry, trace_request
 
 load_dotenv()
 
@@ -18,14 +26,13 @@ class GraphState(TypedDict):
     translation: Optional[str]
     adapted: Optional[str]
     validation: Optional[str]
+    validate_rounds: int
+    budget: Optional[RequestBudget]
 
 def get_llm():
-    return ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash-preview-05-20",
-        google_api_key=os.getenv("GEMINI_API_KEY"),
-        temperature=0.3
-    )
+    return get_chat_model("gemini-2.5-flash-preview-05-20", temperature=0.3)
 
+@instrumented("search")
 def search_node(state: GraphState) -> GraphState:
     """Enhanced search node with comprehensive metadata collection"""
     return {
@@ -47,6 +54,8 @@ def search_node(state: GraphState) -> GraphState:
         }
     }
 
+@instrumented("enrich")
+@call_site("enrich")
 def enrich_node(state: GraphState) -> GraphState:
     """Comprehensive context enrichment with structured output"""
     llm = get_llm()
@@ -90,6 +99,7 @@ Provide your analysis in valid JSON format only."""
     try:
         response = llm.invoke(prompt)
         content = response.content.strip()
+        budget_of(state).charge(prompt, content)
         print(f"Enrichment raw response: {content}")  # Debug print
         
         # Try to parse JSON
@@ -131,8 +141,14 @@ Provide your analysis in valid JSON format only."""
         }
     }
 
-def translate_node(state: GraphState) -> GraphState:
-    """Enhanced translation with enriched context and language validation"""
+@instrumented("translate")
+def translate_node(state: GraphState, config: Optional[RunnableConfig] = None) -> GraphState:
+    """Enhanced translation with enriched context and language validation.
+
+    An on_partial callback in config["configurable"] receives the
+    translation as it streams in.
+    """
+    on_partial = ((config or {}).get("configurable") or {}).get("on_partial")
     llm = get_llm()
     ctx = state["context"]
 
@@ -143,7 +159,7 @@ def translate_node(state: GraphState) -> GraphState:
 
     Source Text:
     {ctx['source_text']}
-
+    {neighbor_prompt(ctx.get('neighbors'))}
     Contextual Information:
 
     Domain: {ctx['metadata']['domain']}
@@ -187,49 +203,40 @@ def translate_node(state: GraphState) -> GraphState:
 
     Ensure characters are appropriate for {ctx['languages']['target']}"""
 
-    response = llm.invoke(prompt)
-    translation = response.content.strip()
+    # A validate -> translate restart must not replay the translation that failed
+    if state.get("validation"):
+        count_retry()
+    with call_site("translate", cache=not state.get("validation")):
+        if on_partial is not None:
+            translation = stream_chat(llm, prompt, on_partial)
+        else:
+            response = llm.invoke(prompt)
+            translation = response.content.strip()
+    budget = budget_of(state)
+    budget.charge(prompt, translation)
 
     # Basic language validation
     if not is_language_match(translation, ctx['languages']['target']):
         print("Language validation failed, retrying...")
-        response = llm.invoke(f"Correct this translation to proper {ctx['languages']['target']}:\n{translation}")
+        count_language_correction("translate", ctx['languages']['target'])
+        prompt = f"Correct this translation to proper {ctx['languages']['target']}:\n{translation}"
+        with call_site("language_correction", cache=False):
+            response = llm.invoke(prompt)
         translation = response.content.strip()
+        budget.charge(prompt, translation)
 
     return {**state, "translation": translation}
 
 def is_language_match(text: str, target_lang: str) -> bool:
-    """Basic language validation"""
-    if not text or not target_lang:
-        return False
-
-    target_lang = target_lang.lower()
-
-    # Language-specific validation rules
-    if "tamil" in target_lang:
-        # Check for Tamil Unicode block
-        return any('\u0B80' <= char <= '\u0BFF' for char in text)
-    elif "hindi" in target_lang:
-        # Check for Devanagari Unicode block
-        return any('\u0900' <= char <= '\u097F' for char in text)
-    elif "russian" in target_lang:
-        # Check for Cyrillic Unicode block
-        return any('\u0400' <= char <= '\u04FF' for char in text)
-    elif "french" in target_lang:
-        # Check for French accents
-        return any(char in "éèêàùç" for char in text.lower())
-    elif "english" in target_lang:
-        # Check for common English words
-        return any(word in text.lower() for word in ["the", "and", "for", "with"])
-
-    # Default check for non-Latin scripts
-    if "latin" not in target_lang:
-        return not any(ord(char) < 128 for char in text if char.isalpha())
-
-    return True
+    """Basic language validation: the text is mostly in the target language's script"""
+    return language_matches(text, target_lang)
 
+@instrumented("adapt")
 def adapt_node(state: GraphState) -> GraphState:
-    """Optimized cultural adaptation with validation"""
+    """Optimized cultural adaptation with validation; skipped when the budget runs low"""
+    budget = budget_of(state)
+    if not budget.allows("adapt"):
+        return {**state, "adapted": None}
     llm = get_llm()
     ctx = state["context"]
 
@@ -267,21 +274,31 @@ def adapt_node(state: GraphState) -> GraphState:
 
     Include NO additional commentary"""
 
-    response = llm.invoke(prompt)
+    with call_site("adapt", cache=not state.get("validation")):
+        response = llm.invoke(prompt)
     adapted = response.content.strip()
+    budget.charge(prompt, adapted)
 
     # Validate language
     if not is_language_match(adapted, ctx['languages']['target']):
         print("Adaptation language validation failed, retrying...")
-        response = llm.invoke(f"Convert this to proper {ctx['languages']['target']}:\n{adapted}")
+        count_language_correction("adapt", ctx['languages']['target'])
+        prompt = f"Convert this to proper {ctx['languages']['target']}:\n{adapted}"
+        with call_site("language_correction", cache=False):
+            response = llm.invoke(prompt)
         adapted = response.content.strip()
+        budget.charge(prompt, adapted)
 
     return {**state, "adapted": adapted}
 
+@instrumented("validate")
 def validate_node(state: GraphState) -> GraphState:
-    """Comprehensive quality validation"""
+    """Comprehensive quality validation; skipped when the budget runs low"""
+    budget = budget_of(state)
+    if not budget.allows("validate"):
+        return {**state, "validation": "SKIPPED"}
     llm = get_llm()
-    text = state.get('adapted', state['translation'])
+    text = state.get('adapted') or state['translation']
     ctx = state["context"]
 
     prompt = f"""**Quality Validation**
@@ -306,18 +323,33 @@ def validate_node(state: GraphState) -> GraphState:
     Evaluation:
     Respond ONLY with "GOOD" if all criteria pass, otherwise "BAD"."""
 
-    response = llm.invoke(prompt)
+    with call_site("validate", cache=not state.get("validation")):
+        response = llm.invoke(prompt)
     validation = response.content.strip().upper()
-
-    return {**state, "validation": validation}
-
-def build_graph(intensity=3):
-    """Build optimized state graph"""
+    budget.charge(prompt, validation)
+
+    return {**state, "validation": validation, "validate_rounds": state.get("validate_rounds", 0) + 1}
+
+def route_validation(state: GraphState) -> str:
+    """Restart at translate on a BAD validation, within the retry limit and budget"""
+    if "BAD" not in (state.get("validation") or ""):
+        return "end"
+    budget = budget_of(state)
+    if state.get("validate_rounds", 0) > MAX_VALIDATE_RETRIES:
+        budget.skip("retranslate", "retry limit")
+        return "end"
+    if not budget.allows("retranslate"):
+        return "end"
+    return "restart"
+
+def build_graph(intensity=3, enrich=True):
+    """Build optimized state graph; enrich=False starts at translate with a prepared context"""
     builder = StateGraph(GraphState)
 
     # Core nodes
-    builder.add_node("search", search_node)
-    builder.add_node("enrich", enrich_node)
+    if enrich:
+        builder.add_node("search", search_node)
+        builder.add_node("enrich", enrich_node)
     builder.add_node("translate", translate_node)
 
     # Conditional nodes
@@ -327,9 +359,12 @@ def build_graph(intensity=3):
         builder.add_node("validate", validate_node)
 
     # Build edges
-    builder.set_entry_point("search")
-    builder.add_edge("search", "enrich")
-    builder.add_edge("enrich", "translate")
+    if enrich:
+        builder.set_entry_point("search")
+        builder.add_edge("search", "enrich")
+        builder.add_edge("enrich", "translate")
+    else:
+        builder.set_entry_point("translate")
 
     current = "translate"
     if intensity >= 3:
@@ -339,7 +374,7 @@ def build_graph(intensity=3):
         builder.add_edge(current, "validate")
         builder.add_conditional_edges(
             "validate",
-            lambda state: "restart" if "BAD" in state["validation"] else "end",
+            route_validation,
             {"restart": "translate", "end": END}
         )
     else:
@@ -347,43 +382,90 @@ def build_graph(intensity=3):
 
     return builder.compile()
 
-def run_state_graph(query, metadata, source_lang, target_lang, intensity=3):
-    """Execute the state graph with comprehensive error handling"""
-    start_time = time.time()
-
-    init_state = {
-        "query": query,
-        "metadata": metadata,
-        "source_lang": source_lang,
-        "target_lang": target_lang,
-        "context": {},
-        "translation": None,
-        "adapted": None,
-        "validation": None
+# Compiled graphs are immutable and safe to invoke concurrently, so each
+# intensity is built once per process instead of on every request
+_graph_cache = {}
+_graph_lock = threading.Lock()
+
+def get_graph(intensity=3, enrich=True):
+    """Cached compiled graph for an intensity"""
+    key = (intensity, enrich)
+    with _graph_lock:
+        graph = _graph_cache.get(key)
+        if graph is None:
+            graph = build_graph(intensity, enrich)
+            _graph_cache[key] = graph
+        return graph
+
+def run_segmented_graph(init_state, segments, intensity=3, on_partial=None):
+    """Enrich the whole document once, then run the translation stages per segment"""
+    shared = enrich_node(search_node(init_state))
+    graph = get_graph(intensity, enrich=False)
+
+    def translate_segment(text, neighbors, on_partial=None):
+        result = graph.invoke({
+            **shared,
+            "query": text,
+            "context": {**shared["context"], "source_text": text, "neighbors": neighbors}
+        }, config={"configurable": {"on_partial": on_partial}})
+        return result.get("adapted") or result["translation"]
+
+    translations = translate_segments(segments, translate_segment, on_partial=on_partial)
+    return {
+        **shared,
+        "translation": join_segments(segments, translations),
+        "context": {**shared["context"], "segments": len(segments)}
     }
 
-    try:
-        graph = build_graph(intensity)
-        result = graph.invoke(init_state)
-        
-        # Final validation
-        final_translation = result.get("adapted", result["translation"])
-        if not is_language_match(final_translation, target_lang):
-            print("Final language validation failed, correcting...")
-            llm = get_llm()
-            response = llm.invoke(f"Convert this to proper {target_lang}:\n{final_translation}")
-            final_translation = response.content.strip()
-        
-        print(f"Graph completed in {time.time() - start_time:.2f} seconds")
-        return {
-            'translation': final_translation,
-            'context': result.get("context", {}),
-            'metadata': metadata
+def run_state_graph(query, metadata, source_lang, target_lang, intensity=3, on_partial=None):
+    """Execute the state graph with comprehensive error handling"""
+    with trace_request("langgraph") as trace:
+        segments = segment_text(query, source_lang)
+        budget = RequestBudget.for_request(len(segments))
+
+        init_state = {
+            "query": query,
+            "metadata": metadata,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "context": {},
+            "translation": None,
+            "adapted": None,
+            "validation": None,
+            "validate_rounds": 0,
+            "budget": budget
         }
-    except Exception as e:
-        print(f"Graph error: {str(e)}")
-        return {
-            'translation': f"Translation error: {str(e)}",
-            'context': {"error": str(e)},
-            'metadata': metadata
-        }
\ No newline at end of file
+
+        try:
+            if len(segments) > 1:
+                result = run_segmented_graph(init_state, segments, intensity, on_partial)
+            else:
+                result = get_graph(intensity).invoke(init_state, config={"configurable": {"on_partial": on_partial}})
+
+            # Final validation
+            final_translation = result.get("adapted") or result["translation"]
+            if not is_language_match(final_translation, target_lang):
+                print("Final language validation failed, correcting...")
+                count_language_correction("final", target_lang)
+                llm = get_llm()
+                prompt = f"Convert this to proper {target_lang}:\n{final_translation}"
+                with span("final_check"), call_site("language_correction", cache=False):
+                    response = llm.invoke(prompt)
+                final_translation = response.content.strip()
+                budget.charge(prompt, final_translation)
+
+            instrumentation = trace.summary()
+            print(f"Graph completed in {instrumentation['wall_ms'] / 1000:.2f} seconds")
+            return {
+                'translation': final_translation,
+                'context': {**result.get("context", {}), "budget": budget.summary(),
+                            "instrumentation": instrumentation},
+                'metadata': metadata
+            }
+        except Exception as e:
+            print(f"Graph error: {str(e)}")
+            return {
+                'translation': f"Translation error: {str(e)}",
+                'context': {"error": str(e), "instrumentation": trace.summary()},
+                'metadata': metadata
+            }
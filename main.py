@@ -5,6 +5,13 @@ from ui.metadata_studio import render_metadata_studio
 from ui.translation_workshop import render_translation_workshop
 from ui.results_panel import render_results_panel
 from ui.history_view import render_history_view
+from core.llm_registry import get_registry_stats
+from services.term_cache import get_term_cache
+from services.metadata_cache import get_metadata_cache
+from core.llm_cache import get_llm_cache
+from utils.languages import get_language_correction_stats
+from core.instrumentation import get_node_metrics
+from core.database import get_slowest_nodes
 
 # Page configuration
 st.set_page_config(
@@ -28,6 +35,28 @@ def debug_info():
                                 height=200)
         st.sidebar.json(st.session_state)
         
+        st.sidebar.subheader("LLM Clients")
+        st.sidebar.json(get_registry_stats())
+        
+        st.sidebar.subheader("Term Cache")
+        st.sidebar.json(get_term_cache().get_stats())
+        
+        st.sidebar.subheader("Metadata Cache")
+        st.sidebar.json(get_metadata_cache().get_stats())
+        
+        if get_llm_cache() is not None:
+            st.sidebar.subheader("LLM Cache")
+            st.sidebar.json(get_llm_cache().get_stats())
+        
+        st.sidebar.subheader("Language Corrections")
+        st.sidebar.json(get_language_correction_stats())
+        
+        st.sidebar.subheader("Node Metrics")
+        st.sidebar.json(get_node_metrics())
+        
+        st.sidebar.subheader("Slowest Nodes (7 days)")
+        st.sidebar.json(get_slowest_nodes(days=7, limit=5))
+        
         if st.session_state.get("project"):
             st.sidebar.subheader("Project Data")
             st.sidebar.json(st.session_state.project)
@@ -0,0 +1,221 @@
+# batch_translation.py
+"""Headless batch translation: JSONL/CSV records in, JSONL results out.
+
+Each input record needs a "text" field; "id", "source_lang", "target_lang",
+"mode", "framework", "intensity", "metadata" and "feedback" are optional and
+fall back to the command-line defaults. Completed ids are appended to a
+checkpoint file, so an interrupted run resumes where it stopped; with
+--project-id, ids are checkpointed only once their results are saved.
+A result reaches the output file together with its checkpoint entry, so
+a resumed run leaves one line per id. Failed records go to
+<output>.errors instead and are retried on resume.
+
+Usage:
+    python -m services.batch_translation input.jsonl --output results.jsonl \\
+        --mode agentic --framework LangGraph --workers 8
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterator, Optional
+
+from core.instrumentation import trace_request, pipeline_label
+from utils.helpers import percentile
+
+logger = logging.getLogger(__name__)
+
+RECORD_FIELDS = ("source_lang", "target_lang", "mode", "framework", "intensity", "metadata", "feedback")
+# Futures kept in flight per worker; bounds memory on very large inputs
+QUEUE_DEPTH = 4
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Records from a .jsonl or .csv file, with ids defaulting to the row number"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = csv.DictReader(f) if path.lower().endswith(".csv") else (
+            json.loads(line) for line in f if line.strip())
+        for index, row in enumerate(rows, 1):
+            # CSV cells carry metadata and feedback as JSON strings
+            for key in ("metadata", "feedback"):
+                if isinstance(row.get(key), str):
+                    row[key] = json.loads(row[key]) if row[key].strip() else None
+            row["id"] = str(row.get("id") or index)
+            yield row
+
+def load_checkpoint(path: str) -> set:
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+def warm_up():
+    """Import the pipelines up front so start-up cost is not billed to the first records"""
+    import services.translation_service  # noqa: F401
+    import services.expert_translation  # noqa: F401
+
+def translate_record(record: Dict, defaults: Dict) -> Dict:
+    """Translate one record; runs inside a pool worker"""
+    options = {key: record.get(key) or defaults.get(key) for key in RECORD_FIELDS}
+    start = time.perf_counter()
+    trace = None
+    try:
+        if options["mode"] == "expert":
+            from services.expert_translation import translate_text
+        else:
+            from services.translation_service import translate_text
+        with trace_request(pipeline_label(options["mode"], options["framework"])) as trace:
+            result = translate_text(
+                record["text"], options["source_lang"], options["target_lang"], options["metadata"] or {},
+                options["mode"], options["framework"], int(options["intensity"]), options["feedback"]
+            )
+        translation = result.get("translation")
+        context = result.get("context")
+        error = context.get("error") if isinstance(context, dict) else None
+        if not translation:
+            error = error or "Empty translation"
+        elif translation.startswith("Translation error:"):
+            error, translation = translation, None
+    except Exception as e:
+        translation, error = None, f"{type(e).__name__}: {str(e)}"
+
+    return {
+        "id": record["id"],
+        "source_text": record["text"],
+        **{key: options[key] for key in ("source_lang", "target_lang", "mode", "framework", "intensity")},
+        "translation": translation,
+        "error": error,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        # Saved with the translation; left out of the results file
+        "spans": trace.span_dicts() if trace is not None else None
+    }
+
+def save_results(results: list, project_id: int):
+    """Persist successful results to a project in one transaction"""
+    from services.translation_service import persist_translations
+    persist_translations([{
+        "project_id": project_id,
+        "source_text": r["source_text"],
+        "source_lang": r["source_lang"],
+        "target_lang": r["target_lang"],
+        "translation": r["translation"],
+        "metadata": {},
+        "framework": r["framework"],
+        "mode": f"Batch ({r['mode']})",
+        "intensity": r["intensity"]
+    } for r in results], spans=[r.get("spans") for r in results])
+
+def run_batch(input_path: str, output_path: str, defaults: Dict, workers: int = 4,
+              use_processes: bool = False, checkpoint_path: Optional[str] = None,
+              project_id: Optional[int] = None, save_every: int = 200,
+              errors_path: Optional[str] = None) -> Dict:
+    """Translate every unfinished record of input_path and return run statistics"""
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    errors_path = errors_path or f"{output_path}.errors"
+    done = load_checkpoint(checkpoint_path)
+    latencies, errors = [], {}
+    unsaved = []
+    stats = {"processed": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+
+    warm_up()
+    pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_class(max_workers=workers, initializer=warm_up) as pool, \
+            open(output_path, "a", encoding="utf-8") as output, \
+            open(errors_path, "a", encoding="utf-8") as failures, \
+            open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        # Start every worker before the clock runs
+        wait([pool.submit(time.sleep, 0) for _ in range(workers)])
+        start = time.perf_counter()
+
+        def write(file, results):
+            file.write("".join(json.dumps({key: value for key, value in r.items() if key != "spans"},
+                                          ensure_ascii=False) + "\n" for r in results))
+            file.flush()
+
+        def commit(results):
+            # Output and checkpoint follow the save, so a crash before it retries the records
+            if project_id is not None:
+                save_results(results, project_id)
+            write(output, results)
+            checkpoint.write("".join(r["id"] + "\n" for r in results))
+            checkpoint.flush()
+
+        def collect(futures):
+            for future in futures:
+                result = future.result()
+                stats["processed"] += 1
+                latencies.append(result["latency_ms"])
+                if result["error"]:
+                    # Failed records stay out of the output and checkpoint and are retried on resume
+                    write(failures, [result])
+                    stats["failed"] += 1
+                    kind = result["error"].split(":", 1)[0][:80]
+                    errors[kind] = errors.get(kind, 0) + 1
+                    continue
+                stats["succeeded"] += 1
+                unsaved.append(result)
+                if project_id is None or len(unsaved) >= save_every:
+                    commit(unsaved)
+                    unsaved.clear()
+
+        pending = set()
+        for record in read_records(input_path):
+            if record["id"] in done:
+                stats["skipped"] += 1
+                continue
+            pending.add(pool.submit(translate_record, record, defaults))
+            if len(pending) >= workers * QUEUE_DEPTH:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+        collect(wait(pending)[0])
+        if unsaved:
+            commit(unsaved)
+        elapsed = time.perf_counter() - start
+
+    return {
+        **stats,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(stats["processed"] / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_ms": percentile(latencies, 50),
+        "latency_p95_ms": percentile(latencies, 95),
+        "errors": errors
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch translation from JSONL/CSV to JSONL")
+    parser.add_argument("input", help=".jsonl or .csv file of records with a 'text' field")
+    parser.add_argument("--output", required=True, help="JSONL results file (appended to)")
+    parser.add_argument("--checkpoint", help="Completed-id file (default: <output>.checkpoint)")
+    parser.add_argument("--errors", help="JSONL file of failed records (default: <output>.errors)")
+    parser.add_argument("--mode", default="basic", choices=["basic", "advanced", "agentic", "expert"])
+    parser.add_argument("--framework", default="LangGraph", choices=["LangGraph", "CrewAI"])
+    parser.add_argument("--intensity", type=int, default=3)
+    parser.add_argument("--source-lang", default="Auto")
+    parser.add_argument("--target-lang", default="Tamil")
+    parser.add_argument("--metadata", default="{}", help="Default metadata as a JSON object")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true", help="Use a process pool instead of threads")
+    parser.add_argument("--project-id", type=int, help="Also save successful results to this project")
+    parser.add_argument("--save-every", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    defaults = {
+        "source_lang": args.source_lang,
+        "target_lang": args.target_lang,
+        "mode": args.mode,
+        "framework": args.framework,
+        "intensity": args.intensity,
+        "metadata": json.loads(args.metadata),
+        "feedback": None
+    }
+    summary = run_batch(args.input, args.output, defaults, args.workers, args.processes,
+                        args.checkpoint, args.project_id, args.save_every, args.errors)
+    json.dump(summary, sys.stderr, indent=2)
+    print(file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,15 @@
-import google.generativeai as genai
 from dotenv import load_dotenv
 import os
 import json
+from core.llm_registry import get_generative_model
+from core.llm_cache import call_site
 
 load_dotenv()
 
 def get_llm(model_name="gemini-2.5-flash-preview-05-20"):
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model = genai.GenerativeModel(model_name=model_name)
-    return model
+    return get_generative_model(model_name)
 
+@call_site("cultural_adaptation")
 def adapt_text(text, region, model="gemini-2.5-flash-preview-05-20", audience="Adults", purpose="General"):
     llm = get_llm(model)
     
@@ -34,6 +34,7 @@ def adapt_text(text, region, model="gemini-2.5-flash-preview-05-20", audience="A
     response = llm.generate_content(prompt)
     return response.text.strip()
 
+@call_site("cultural_analysis")
 def cultural_adaptation_analysis(text, region):
     llm = get_llm("gemini-2.5-flash-preview-05-20")
     
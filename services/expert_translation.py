@@ -8,85 +8,310 @@ import os
 import logging
 from wikipediaapi import Wikipedia as WikipediaAPI
 from langdetect import detect
+from langdetect.detector_factory import init_factory
 from textblob import TextBlob
 from deep_translator import GoogleTranslator
 from langgraph.graph import StateGraph, END
 from typing import Dict, Any, Optional, TypedDict
-from typing import TypedDict, Optional, Dict, Any
+from typing import TypedDict, Optional, Dict, Any, Annotated
 from core.crewai_orchestrator import run_crewai_translation
 from core.database import get_translation_history, save_translation
+from services.translation_memory import get_translation_memory, is_reusable
+from services.term_cache import get_term_cache, MISSING
+from services.langlinks_index import get_langlinks_index
+from utils.helpers import session_value
+from utils.languages import language_code, language_name, count_language_correction
+from utils.script_profile import language_matches
+from utils.single_flight import SingleFlight, request_key
+from core.llm_registry import get_chat_model
+from core.llm_cache import call_site, current_call_site
+from core.budget import RequestBudget, budget_of, NO_BUDGET
+from core.instrumentation import instrumented, span, count_retry, trace_request, shared_run
+from core.segmentation import (segment_text, translate_segments, join_segments, neighbor_prompt,
+                               SEGMENT_MAX_CHARS)
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langdetect import detect
 from textblob import TextBlob
 from deep_translator import GoogleTranslator
-import streamlit as st
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial, wraps
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# langdetect loads its language profiles lazily, which races when segments
+# are validated on several threads at once; load them up front
+init_factory()
+
+# Terminology lookups fan out over a shared pool; each backend has its own
+# concurrency cap and every term must resolve within TERM_LOOKUP_TIMEOUT of
+# starting (a term still queued that long after submission is dropped too)
+TERM_LOOKUP_WORKERS = int(os.getenv("TERM_LOOKUP_WORKERS", "12"))
+TERM_LOOKUP_TIMEOUT = float(os.getenv("TERM_LOOKUP_TIMEOUT", "10"))
+BACKEND_LIMITS = {
+    "wikipedia": threading.BoundedSemaphore(int(os.getenv("WIKIPEDIA_CONCURRENCY", "4"))),
+    "translator": threading.BoundedSemaphore(int(os.getenv("TRANSLATOR_CONCURRENCY", "4"))),
+    "llm": threading.BoundedSemaphore(int(os.getenv("LLM_CONCURRENCY", "4"))),
+}
+_term_executor = ThreadPoolExecutor(max_workers=TERM_LOOKUP_WORKERS, thread_name_prefix="term-lookup")
+# Deadline (time.monotonic()) of the term lookup running in this context
+_term_deadline = contextvars.ContextVar("term_deadline", default=None)
+
+class TermDeadlineExceeded(Exception):
+    """A term lookup ran out of time before it could take a backend slot"""
+
+@contextmanager
+def backend_slot(backend: str):
+    """Hold one of the backend's slots; inside a term lookup, wait no longer than its deadline.
+
+    A lookup past its deadline gives up at the next slot instead of queueing
+    for more backend calls, so a timed-out term frees its pool worker once
+    the call already in flight returns.
+    """
+    limit = BACKEND_LIMITS[backend]
+    deadline = _term_deadline.get()
+    if deadline is None:
+        with limit:
+            yield
+        return
+    remaining = deadline - time.monotonic()
+    if remaining <= 0 or not limit.acquire(timeout=remaining):
+        raise TermDeadlineExceeded(backend)
+    try:
+        yield
+    finally:
+        limit.release()
+
+# Air-gapped deployments answer terms from the langlinks index only
+WIKIPEDIA_OFFLINE = os.getenv("WIKIPEDIA_OFFLINE", "0") == "1"
+
+EXPERT_AGENTS = ("coherence_checker", "sentiment_analyzer", "terminology_specialist", "wikipedia_researcher")
+
+# One Wikipedia client per language, shared across services and threads
+_wiki_clients = {}
+_wiki_lock = threading.Lock()
+
+def get_wiki_client(language: str) -> WikipediaAPI:
+    """Shared WikipediaAPI client for a language edition"""
+    with _wiki_lock:
+        client = _wiki_clients.get(language)
+        if client is None:
+            client = WikipediaAPI(
+                language=language,
+                extract_format='wiki',
+                user_agent='CustomTranslationService/1.0'
+            )
+            _wiki_clients[language] = client
+        return client
+
+def wiki_language_code(language: str) -> str:
+    """Wikipedia edition code for a language name such as "Tamil" """
+    return language_code(language, default=language.lower())
+
+def merge_dicts(left: Optional[Dict], right: Optional[Dict]) -> Dict:
+    """Reducer that lets parallel branches contribute to one dict"""
+    return {**(left or {}), **(right or {})}
+
+class ExpertGraphState(TypedDict, total=False):
+    query: str
+    source_lang: str
+    target_lang: str
+    metadata: Dict
+    feedback: Optional[Dict]
+    tm_reference: Optional[Dict]
+    neighbors: Dict
+    context: Dict
+    # Written by the parallel branches that run between search and translate
+    query_sentiment: Dict
+    term_translations: Dict
+    term_timeouts: list
+    branch_timings: Annotated[Dict, merge_dicts]
+    translation: Optional[str]
+    error: Optional[str]
+    cultural_analysis: Dict
+    budget: RequestBudget
+
+def timed_branch(name: str, node):
+    """Wrap a branch node so its wall time lands in branch_timings"""
+    @wraps(node)
+    def run(state):
+        start = time.perf_counter()
+        update = node(state)
+        return {**update, "branch_timings": {name: round(time.perf_counter() - start, 4)}}
+    return run
+
+def enabled_expert_agents() -> tuple:
+    """Expert agents switched on in the session (all of them by default)"""
+    agents = session_value("expert_agents", {})
+    return tuple(agent for agent in EXPERT_AGENTS if agents.get(agent, True))
+
 class ExpertTranslationService:
     def __init__(self, model="gemini-flash-preview-0506", max_retries=3):
-        self.llm = ChatGoogleGenerativeAI(
-            model=model,
-            google_api_key=os.getenv("GEMINI_API_KEY"),
-            temperature=0.3,
-            max_retries=max_retries
-        )
+        self.llm = get_chat_model(model, temperature=0.3, max_retries=max_retries)
         self.max_retries = max_retries
-        self.language_codes = {
-            'ta': 'Tamil',
-            'en': 'English',
-            'hi': 'Hindi'
-        }
-        self.wiki = WikipediaAPI(
-            language='en',
-            extract_format='wiki',
-            user_agent='CustomTranslationService/1.0'
-        )
-        self.translation_memory = {}
+        self.wiki = get_wiki_client('en')
+        self.term_cache = get_term_cache()
+        self.translation_memory = get_translation_memory()
+        self._graph_cache = {}
+        self._graph_lock = threading.Lock()
         
-    def get_term_from_wikipedia(self, term: str, target_lang: str) -> Optional[str]:
+    def get_term_from_wikipedia(self, term: str, target_lang: str,
+                                budget: RequestBudget = NO_BUDGET) -> Optional[str]:
         """Search for a term in Wikipedia and return the translation"""
+        # The offline langlinks index answers without any network access
+        lang_code = wiki_language_code(target_lang)
+        langlinks = get_langlinks_index()
+        if langlinks is not None:
+            title = langlinks.lookup(term, lang_code)
+            if title or WIKIPEDIA_OFFLINE:
+                return title
+        elif WIKIPEDIA_OFFLINE:
+            return None
+        
+        cached = self.term_cache.get(term, target_lang)
+        if cached is not MISSING:
+            return cached
         try:
-            # First try English Wikipedia
+            translation = self._lookup_wikipedia_term(term, target_lang, budget)
+        except TermDeadlineExceeded:
+            raise
+        except Exception as e:
+            # Transient failures are not cached; the next request retries
+            logger.error(f"Wikipedia search failed: {str(e)}")
+            return None
+        self.term_cache.put(term, target_lang, translation)
+        return translation
+    
+    @instrumented("wiki_term")
+    @call_site("wiki_term")
+    def _lookup_wikipedia_term(self, term: str, target_lang: str,
+                               budget: RequestBudget = NO_BUDGET) -> Optional[str]:
+        """Uncached Wikipedia resolution; None when the term is not found"""
+        # First try English Wikipedia
+        with backend_slot("wikipedia"):
             page = self.wiki.page(term)
-            if page.exists():
+            exists = page.exists()
+            if exists:
                 # Check if page has equivalent in target language
                 lang_links = page.langlinks
-                if target_lang.lower() in lang_links:
-                    return lang_links[target_lang.lower()].title
+                lang_code = wiki_language_code(target_lang)
+                if lang_code in lang_links:
+                    return lang_links[lang_code].title
                 
                 # If no direct link, try to find the term in the page text
                 text = page.text[:2000]  # Limit to first 2000 chars
-                prompt = f"""Find the most relevant translation for "{term}" in {target_lang} from this Wikipedia text:
-                
-                {text}
-                
-                Return ONLY the translated term in {target_lang} or "Not found" if not available."""
-                
+        if exists:
+            prompt = f"""Find the most relevant translation for "{term}" in {target_lang} from this Wikipedia text:
+            
+            {text}
+            
+            Return ONLY the translated term in {target_lang} or "Not found" if not available."""
+            
+            with backend_slot("llm"):
                 response = self.llm.invoke(prompt)
-                translation = response.content.strip()
-                if translation.lower() != "not found":
-                    return translation
-                
-            # Try target language Wikipedia directly
-            target_wiki = WikipediaAPI(
-                language=target_lang.lower(),
-                extract_format='wiki',
-                user_agent='CustomTranslationService/1.0'
-            )
+            translation = response.content.strip()
+            budget.charge(prompt, translation)
+            if translation.lower() != "not found":
+                return translation
+            
+        # Try target language Wikipedia directly
+        with backend_slot("wikipedia"):
+            target_wiki = get_wiki_client(wiki_language_code(target_lang))
             search_results = target_wiki.search(term)
             if search_results:
                 for result in search_results[:3]:  # Check top 3 results
                     page = target_wiki.page(result)
                     if page.exists():
                         return page.title
-                        
-            return None
-        except Exception as e:
-            logger.error(f"Wikipedia search failed: {str(e)}")
-            return None
+                    
+        return None
+    
+    def resolve_term(self, term: str, target_lang: str, use_wikipedia: bool = True,
+                     budget: RequestBudget = NO_BUDGET) -> Optional[str]:
+        """Translate one term: Wikipedia first, then the general-purpose translator"""
+        if use_wikipedia:
+            wiki_trans = self.get_term_from_wikipedia(term, target_lang, budget)
+            if wiki_trans:
+                return wiki_trans
+        
+        with backend_slot("translator"):
+            general_trans = GoogleTranslator(
+                source='auto',
+                target=language_code(target_lang, default=target_lang.lower())
+            ).translate(term)
+        
+        if general_trans and general_trans != term:
+            return general_trans
+        return None
+    
+    def _resolve_term_by(self, started: dict, timeout: float, term: str, target_lang: str,
+                         use_wikipedia: bool, budget: RequestBudget) -> Optional[str]:
+        """resolve_term with a deadline counted from the moment the lookup leaves the queue"""
+        started[term] = time.monotonic()
+        _term_deadline.set(started[term] + timeout)
+        return self.resolve_term(term, target_lang, use_wikipedia, budget)
+    
+    def resolve_terms(self, terms: list, target_lang: str, use_wikipedia: bool = True,
+                      timeout: float = TERM_LOOKUP_TIMEOUT, budget: RequestBudget = NO_BUDGET) -> tuple:
+        """Resolve terms concurrently; returns (translations, terms that missed their deadline)
+        
+        Each term gets timeout seconds from when its lookup starts, so terms
+        queued behind a busy pool are not charged for the wait; one that has
+        not started within timeout of submission is dropped.
+        """
+        started = {}
+        submitted = time.monotonic()
+        # Each lookup runs in a copy of the caller's context, so its spans join the request trace
+        futures = {
+            _term_executor.submit(contextvars.copy_context().run, self._resolve_term_by,
+                                  started, timeout, term, target_lang, use_wikipedia, budget): term
+            for term in dict.fromkeys(str(t) for t in terms if t)
+        }
+        
+        def deadline(future):
+            return started.get(futures[future], submitted) + timeout
+        
+        pending, expired = set(futures), set()
+        while pending:
+            now = time.monotonic()
+            late = {future for future in pending if not future.done() and deadline(future) <= now}
+            expired |= late
+            pending -= late
+            if not pending:
+                break
+            done, _ = wait(pending, timeout=min(deadline(future) for future in pending) - now,
+                           return_when=FIRST_COMPLETED)
+            pending -= done
+        
+        # Collect in term order so downstream prompts are deterministic
+        term_translations = {}
+        timed_out = []
+        for future, term in futures.items():
+            if future in expired:
+                timed_out.append(term)
+                continue
+            try:
+                translation = future.result()
+            except TermDeadlineExceeded:
+                timed_out.append(term)
+                continue
+            except Exception as e:
+                logger.warning(f"Term lookup failed for '{term}': {str(e)}")
+                continue
+            if translation:
+                term_translations[term] = translation
+        
+        # Queued lookups are cancelled; running ones stop at their next backend slot
+        for future in expired:
+            future.cancel()
+        if timed_out:
+            logger.warning(f"Term lookups timed out after {timeout}s: {timed_out}")
+        return term_translations, timed_out
     
     def analyze_sentiment(self, text: str) -> Dict:
         """Analyze sentiment of text using TextBlob"""
@@ -103,15 +328,22 @@ class ExpertTranslationService:
             logger.error(f"Sentiment analysis failed: {str(e)}")
             return {"polarity": 0, "subjectivity": 0, "assessment": "neutral"}
     
-    def check_translation_memory(self, text: str, target_lang: str) -> Optional[str]:
+    def check_translation_memory(self, text: str, target_lang: str, source_lang: str = "Auto",
+                                 mode: str = "", metadata: Optional[Dict] = None) -> Optional[str]:
         """Check if translation exists in memory"""
-        key = f"{text[:100]}_{target_lang}"
-        return self.translation_memory.get(key)
+        return self.translation_memory.get(text, source_lang, target_lang, mode, metadata)
     
-    def add_to_translation_memory(self, text: str, target_lang: str, translation: str):
+    def add_to_translation_memory(self, text: str, target_lang: str, translation: str,
+                                  source_lang: str = "Auto", mode: str = "",
+                                  metadata: Optional[Dict] = None):
         """Add translation to memory"""
-        key = f"{text[:100]}_{target_lang}"
-        self.translation_memory[key] = translation
+        self.translation_memory.put(text, source_lang, target_lang, translation, mode, metadata)
+    
+    def find_fuzzy_matches(self, text: str, source_lang: str, target_lang: str,
+                           limit: int = 3, mode: str = "", metadata: Optional[Dict] = None) -> list:
+        """Near matches from translation memory above the fuzzy threshold, within the same mode and metadata"""
+        return self.translation_memory.find_similar(text, source_lang, target_lang, limit,
+                                                    mode=mode, metadata=metadata)
     
     def monolingual_validation(self, text: str, target_lang: str) -> Dict:
         """Validate if text is in the correct target language and makes sense"""
@@ -120,15 +352,10 @@ class ExpertTranslationService:
             detected_lang = detect(text)
             
             # Convert language code to full name
-            lang_map = {
-                'ta': 'Tamil',
-                'en': 'English',
-                'hi': 'Hindi'
-            }
-            target_lang_name = lang_map.get(target_lang.lower(), target_lang)
+            target_lang = language_name(target_lang)
             
-            # Check if detected language matches target language
-            if detected_lang.lower() != target_lang.lower():
+            # Check if the text is in the target language
+            if not language_matches(text, target_lang):
                 return {
                     "valid": False,
                     "reason": "language_mismatch",
@@ -169,8 +396,11 @@ class ExpertTranslationService:
                         feedback: Optional[Dict] = None) -> Dict:
         """Expert translation with all advanced features"""
         # Check translation memory first if enabled
-        if st.session_state.get("enable_translation_memory", True):
-            cached = self.check_translation_memory(text, target_lang)
+        if session_value("enable_translation_memory", True):
+            cached = self.check_translation_memory(
+                text, target_lang, source_lang, f"expert/{framework}/{intensity}",
+                {**metadata, "user_feedback": feedback}
+            )
             if cached:
                 return {
                     'translation': cached,
@@ -185,314 +415,346 @@ class ExpertTranslationService:
         else:
             raise ValueError(f"Unsupported framework: {framework}")
     
-    def run_expert_state_graph(self, text: str, source_lang: str, target_lang: str,
-                             metadata: Dict, intensity: int, feedback: Optional[Dict]) -> Dict:
-        """Run expert translation using LangGraph state machine"""
+    @instrumented("search")
+    def _search_node(self, state: Dict[str, Any], expert_agents: tuple = ()) -> Dict[str, Any]:
+        """Build the shared request context the parallel branches read"""
+        languages = {
+            "source": language_name(state["source_lang"]),
+            "target": language_name(state["target_lang"])
+        }
+        
+        return {
+            "context": {
+                "source_text": state["query"],
+                "languages": languages,
+                "tm_reference": state.get("tm_reference"),
+                "metadata": {
+                    **state["metadata"],
+                    "user_feedback": state.get("feedback"),
+                    "languages": languages,
+                    "expert_agents": {agent: True for agent in expert_agents}
+                }
+            }
+        }
+    
+    @instrumented("sentiment")
+    def _sentiment_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Sentiment analysis branch"""
+        return {"query_sentiment": self.analyze_sentiment(state["query"])}
+    
+    @call_site("terminology")
+    def extract_terms(self, text: str, domain: str = "General", budget: RequestBudget = NO_BUDGET) -> list:
+        """Ask the LLM for domain-specific terms that need special translation"""
+        prompt = f"""Extract domain-specific terms from this text that might need special translation:
+        
+        {text}
+        
+        Domain: {domain}
+        
+        Return a JSON array of terms."""
+        
+        with backend_slot("llm"):
+            response = self.llm.invoke(prompt)
+        terms = response.content.strip()
+        budget.charge(prompt, terms)
+        
+        # Parse terms
         try:
-            # Initialize graph builder
-            builder = StateGraph(Dict)
-            
-            # Define all nodes first
-            def search_node(state: Dict[str, Any]) -> Dict[str, Any]:
-                """Enhanced search with sentiment analysis"""
-                sentiment = self.analyze_sentiment(state["query"])
-                
-                if not sentiment["polarity"]:
-                    # If sentiment analysis failed or neutral, skip terminology and go directly to translation
-                    return {
-                        **state,
-                        "query_sentiment": sentiment,
-                        "context": {
-                            "source_text": state["query"],
-                            "skip_terminology": True,
-                            "metadata": {
-                                **state["metadata"],
-                                "user_feedback": feedback,
-                                "languages": {
-                                    "source": state["source_lang"],
-                                    "target": state["target_lang"]
-                                },
-                                "expert_agents": {
-                                    "terminology_specialist": True,
-                                    "coherence_checker": True
-                                }
-                            }
-                        }
-                    }
-                else:
-                    return {
-                        **state,
-                        "query_sentiment": sentiment,
-                        "context": {
-                            "source_text": state["query"],
-                            "skip_terminology": False,
-                            "metadata": {
-                                **state["metadata"],
-                                "user_feedback": feedback,
-                                "languages": {
-                                    "source": state["source_lang"],
-                                    "target": state["target_lang"]
-                                },
-                                "expert_agents": {
-                                    "terminology_specialist": True,
-                                    "coherence_checker": True
-                                }
-                            }
-                        }
-                    }
-            
-            def translate_with_retry(state: Dict[str, Any]) -> Dict[str, Any]:
-                """Translation with retry counter"""
-                try:
-                    translation = self.llm.invoke(state["query"])
-                    return {**state, "translation": translation.content}
-                except Exception as e:
-                    logger.error(f"Translation failed: {str(e)}")
-                    if state.get("retry_count", 0) < 3:
-                        return {**state, "retry_count": state.get("retry_count", 0) + 1}
-                    else:
-                        raise Exception("Maximum retries exceeded")
+            terms = json.loads(terms)
+            if not isinstance(terms, list):
+                terms = [terms]
+        except json.JSONDecodeError:
+            terms = []
+        return terms
+    
+    def get_term_translations(self, text: str, target_lang: str, domain: str = "General",
+                              use_wikipedia: bool = True, budget: RequestBudget = NO_BUDGET) -> Dict:
+        """Extract and concurrently resolve the terminology of a text"""
+        term_translations, _ = self.resolve_terms(
+            self.extract_terms(text, domain, budget), target_lang, use_wikipedia, budget=budget
+        )
+        return term_translations
+    
+    @instrumented("terminology")
+    def _terminology_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle specialized terminology"""
+        ctx = state["context"]
+        use_wikipedia = ctx["metadata"].get("expert_agents", {}).get("wikipedia_researcher", False)
+        
+        budget = budget_of(state)
+        terms = self.extract_terms(ctx["source_text"], ctx["metadata"].get("domain", "General"), budget)
+        term_translations, timed_out = self.resolve_terms(
+            terms, ctx["languages"]["target"], use_wikipedia, budget=budget
+        )
+        return {"term_translations": term_translations, "term_timeouts": timed_out}
 
-            def terminology_node(state: Dict[str, Any]) -> Dict[str, Any]:
-                """Handle specialized terminology"""
-                # Get terminology specialist preference from context or default to True
-                enable_terminology = state.get("context", {}).get("expert_agents", {}).get("terminology_specialist", True)
-                if not enable_terminology:
-                    return state
-                    
-                ctx = state["context"]
-                text = ctx["source_text"]
-                
-                # Extract key terms
-                prompt = f"""Extract domain-specific terms from this text that might need special translation:
-                
-                {text}
-                
-                Domain: {ctx["metadata"].get("domain", "General")}
-                
-                Return a JSON array of terms."""
-                
+    @instrumented("translate")
+    @call_site("translate")
+    def _translate_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Expert translation with all features; joins the parallel branches"""
+        sentiment = state.get("query_sentiment") or {}
+        ctx = {
+            **state["context"],
+            "term_translations": state.get("term_translations", {}),
+            "term_timeouts": state.get("term_timeouts", []),
+            "sentiment_analysis": sentiment,
+            # If sentiment analysis failed or neutral, terminology was of little use
+            "skip_terminology": not sentiment.get("polarity")
+        }
+        
+        # A near match from translation memory turns this into a small edit
+        reference = ctx.get("tm_reference")
+        reference_block = ""
+        if reference:
+            reference_block = f"""
+        Similar Previously Translated Segment ({reference['score']:.0%} match):
+        Source: {reference['source_text']}
+        Translation: {reference['translation']}
+        Edit this reference translation only where the source text differs.
+        """
+        
+        # Build prompt with all contextual information
+        prompt = f"""**Expert Translation Task**
+        Source: {ctx["languages"]["source"]} - Target: {ctx["languages"]["target"]}
+        
+        Source Text:
+        {ctx["source_text"]}
+        {neighbor_prompt(state.get("neighbors"))}
+        Context:
+        - Domain: {ctx["metadata"].get("domain", "General")}
+        - Tone: {ctx["metadata"].get("tone", "Neutral")}
+        - Audience: {ctx["metadata"].get("audience", "Adults")}
+        - Purpose: {ctx["metadata"].get("purpose", "General")}
+        
+        Term Translations:
+        {json.dumps(ctx.get("term_translations", {}), indent=2)}
+        
+        User Feedback:
+        {json.dumps(ctx["metadata"].get("user_feedback", {}), indent=2)}
+        {reference_block}
+        Instructions:
+        1. Use provided term translations where available
+        2. Maintain original sentiment and tone
+        3. Adapt for target audience and culture
+        4. Ensure grammatical correctness
+        5. Preserve technical meaning for domain-specific content
+        
+        Return ONLY the translated text in {ctx["languages"]["target"]}."""
+        
+        response = self.llm.invoke(prompt)
+        translation = response.content.strip()
+        budget = budget_of(state)
+        budget.charge(prompt, translation)
+        
+        # Validate language
+        if not language_matches(translation, ctx["languages"]["target"]):
+            logger.warning(f"Language mismatch detected: Expected {ctx['languages']['target']}")
+            count_language_correction("expert_translate", ctx["languages"]["target"])
+            # Try to correct the language
+            prompt = f"Convert this text to proper {ctx['languages']['target']} while maintaining meaning:\n{translation}"
+            with call_site("language_correction", cache=False):
                 response = self.llm.invoke(prompt)
-                terms = response.content.strip()
-                
-                # Parse terms
-                try:
-                    terms = json.loads(terms)
-                    if not isinstance(terms, list):
-                        terms = [terms]
-                except json.JSONDecodeError:
-                    terms = []
-                
-                term_translations = {}
-                
-                for term in terms:
-                    # Try Wikipedia first
-                    wiki_trans = self.get_term_from_wikipedia(term, ctx["languages"]["target"])
-                    if wiki_trans:
-                        term_translations[term] = wiki_trans
-                        continue
-                        
-                    # Then try general translation
-                    general_trans = GoogleTranslator(
-                        source='auto',
-                        target=ctx["languages"]["target"].lower()
-                    ).translate(term)
-                    
-                    if general_trans and general_trans != term:
-                        term_translations[term] = general_trans
+            translation = response.content.strip()
+            budget.charge(prompt, translation)
             
-                return {
-                    **state,
-                    "context": {
-                        **ctx,
-                        "term_translations": term_translations
-                    }
-                }
+            # Double-check after correction
+            if not language_matches(translation, ctx["languages"]["target"]):
+                logger.error(f"Language correction failed: Still not in {ctx['languages']['target']}")
+                return {"context": ctx, "translation": None, "error": "Language validation failed"}
+        
+        return {"context": ctx, "translation": translation}
 
-            def translate_node(state: Dict[str, Any]) -> Dict[str, Any]:
-                """Expert translation with all features"""
-                ctx = state["context"]
-                
-                # Build prompt with all contextual information
-                prompt = f"""**Expert Translation Task**
-                Source: {ctx["languages"]["source"]} - Target: {ctx["languages"]["target"]}
-                
-                Source Text:
-                {ctx["source_text"]}
-                
-                Context:
-                - Domain: {ctx["metadata"].get("domain", "General")}
-                - Tone: {ctx["metadata"].get("tone", "Neutral")}
-                - Audience: {ctx["metadata"].get("audience", "Adults")}
-                - Purpose: {ctx["metadata"].get("purpose", "General")}
-                
-                Term Translations:
-                {json.dumps(ctx.get("term_translations", {}), indent=2)}
-                
-                User Feedback:
-                {json.dumps(ctx["metadata"].get("user_feedback", {}), indent=2)}
-                
-                Instructions:
-                1. Use provided term translations where available
-                2. Maintain original sentiment and tone
-                3. Adapt for target audience and culture
-                4. Ensure grammatical correctness
-                5. Preserve technical meaning for domain-specific content
-                
-                Return ONLY the translated text in {ctx["languages"]["target"]}."""
-                
+    @instrumented("coherence")
+    @call_site("coherence")
+    def _coherence_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Check and improve text coherence; skipped when the budget runs low"""
+        ctx = state["context"]
+        translation = state["translation"]
+        budget = budget_of(state)
+        if not budget.allows("coherence"):
+            return {"translation": translation}
+        
+        prompt = f"""Improve the coherence and flow of this {ctx["languages"]["target"]} text:
+        
+        {translation}
+        
+        Requirements:
+        - Maintain original meaning
+        - Improve sentence transitions
+        - Ensure logical flow
+        - Keep {ctx["metadata"].get("tone", "Neutral")} tone
+        
+        Return ONLY the improved text."""
+        
+        response = self.llm.invoke(prompt)
+        improved = response.content.strip()
+        budget.charge(prompt, improved)
+        
+        # Validate language after coherence improvement
+        if not language_matches(improved, ctx["languages"]["target"]):
+            logger.warning(f"Language mismatch after coherence improvement: Expected {ctx['languages']['target']}")
+            count_language_correction("expert_coherence", ctx["languages"]["target"])
+            # Try to correct the language
+            prompt = f"Convert this text to proper {ctx['languages']['target']} while maintaining coherence:\n{improved}"
+            with call_site("language_correction", cache=False):
                 response = self.llm.invoke(prompt)
-                translation = response.content.strip()
-                
-                # Validate language
-                detected_lang = detect(translation)
-                if detected_lang.lower() != ctx["languages"]["target"].lower():
-                    logger.warning(f"Language mismatch detected: Expected {ctx['languages']['target']}, got {detected_lang}")
-                    # Try to correct the language
-                    prompt = f"Convert this text to proper {ctx['languages']['target']} while maintaining meaning:\n{translation}"
-                    response = self.llm.invoke(prompt)
-                    translation = response.content.strip()
-                    
-                    # Double-check after correction
-                    detected_lang = detect(translation)
-                    if detected_lang.lower() != ctx["languages"]["target"].lower():
-                        logger.error(f"Language correction failed: Still not in {ctx['languages']['target']}")
-                        return {**state, "translation": None, "error": "Language validation failed"}
-                
-                return {**state, "translation": translation}
+            improved = response.content.strip()
+            budget.charge(prompt, improved)
+            
+            # Double-check after correction
+            if not language_matches(improved, ctx["languages"]["target"]):
+                logger.error(f"Language correction failed after coherence: Still not in {ctx['languages']['target']}")
+                return {**state, "translation": None, "error": "Language validation failed after coherence"}
+        
+        return {**state, "translation": improved}
 
-            def coherence_node(state: Dict[str, Any]) -> Dict[str, Any]:
-                """Check and improve text coherence"""
-                # Get coherence checker preference from context or default to True
-                enable_coherence = state.get("context", {}).get("expert_agents", {}).get("coherence_checker", True)
-                if not enable_coherence:
-                    return state
-                
-                ctx = state["context"]
-                translation = state["translation"]
-                
-                prompt = f"""Improve the coherence and flow of this {ctx["languages"]["target"]} text:
-                
-                {translation}
-                
-                Requirements:
-                - Maintain original meaning
-                - Improve sentence transitions
-                - Ensure logical flow
-                - Keep {ctx["metadata"].get("tone", "Neutral")} tone
-                
-                Return ONLY the improved text."""
-                
-                response = self.llm.invoke(prompt)
-                improved = response.content.strip()
-                
-                # Validate language after coherence improvement
-                detected_lang = detect(improved)
-                if detected_lang.lower() != ctx["languages"]["target"].lower():
-                    logger.warning(f"Language mismatch after coherence improvement: Expected {ctx['languages']['target']}, got {detected_lang}")
-                    # Try to correct the language
-                    prompt = f"Convert this text to proper {ctx['languages']['target']} while maintaining coherence:\n{improved}"
-                    response = self.llm.invoke(prompt)
-                    improved = response.content.strip()
-                    
-                    # Double-check after correction
-                    detected_lang = detect(improved)
-                    if detected_lang.lower() != ctx["languages"]["target"].lower():
-                        logger.error(f"Language correction failed after coherence: Still not in {ctx['languages']['target']}")
-                        return {**state, "translation": None, "error": "Language validation failed after coherence"}
-                
-                return {**state, "translation": improved}
+    @instrumented("cultural_analysis")
+    @call_site("cultural_analysis")
+    def _cultural_analysis_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze cultural fit and provide adaptation suggestions; skipped when the budget runs low"""
+        ctx = state["context"]
+        translation = state["translation"]
+        budget = budget_of(state)
+        if not budget.allows("cultural_analysis"):
+            return {**state, "cultural_analysis": None}
+        
+        try:
+            prompt = f"""Analyze the cultural fit of this translation for {ctx["metadata"].get("region", "global")}:
+            
+            Original text: {state["query"]}
+            Translated text: {translation}
+            
+            Requirements:
+            1. Provide a complexity score (1-10)
+            2. List any cultural adaptations needed
+            3. Rate overall cultural fit (high/medium/low)
+            4. Identify any cultural sensitivities
+            
+            Return a JSON object with:
+            - complexity_score: number between 1-10
+            - cultural_adaptations: list of suggested changes
+            - overall_fit: "high", "medium", or "low"
+            - issues: list of cultural concerns
+            
+            Format:
+            {{
+                "complexity_score": 5,
+                "cultural_adaptations": [],
+                "overall_fit": "medium",
+                "issues": []
+            }}"""
+            
+            response = self.llm.invoke(prompt)
+            content = response.content.strip()
+            budget.charge(prompt, content)
+            
+            try:
+                analysis = json.loads(content)
+            except json.JSONDecodeError as e:
+                logger.error(f"Invalid JSON response: {str(e)}\nContent: {content}")
+                # Return default analysis with error
+                return {**state, "cultural_analysis": {
+                    "error": "Invalid JSON response",
+                    "complexity_score": 5,
+                    "cultural_adaptations": [],
+                    "overall_fit": "medium",
+                    "issues": ["Invalid JSON format in response"]
+                }}
+            
+            # Validate and sanitize analysis fields
+            if not isinstance(analysis.get("complexity_score"), (int, float)):
+                analysis["complexity_score"] = 5
+            elif not (1 <= analysis["complexity_score"] <= 10):
+                analysis["complexity_score"] = 5
+            
+            if analysis.get("overall_fit") not in ["high", "medium", "low"]:
+                analysis["overall_fit"] = "medium"
+            
+            if not isinstance(analysis.get("cultural_adaptations"), list):
+                analysis["cultural_adaptations"] = []
+            
+            if not isinstance(analysis.get("issues"), list):
+                analysis["issues"] = []
+            
+            return {**state, "cultural_analysis": analysis}
+        except Exception as e:
+            logger.error(f"Cultural analysis failed: {str(e)}")
+            return {**state, "cultural_analysis": {
+                "error": str(e),
+                "complexity_score": 5,
+                "cultural_adaptations": [],
+                "overall_fit": "medium",
+                "issues": ["Analysis failed"]
+            }}
 
-            def cultural_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
-                """Analyze cultural fit and provide adaptation suggestions"""
-                ctx = state["context"]
-                translation = state["translation"]
-                
-                try:
-                    prompt = f"""Analyze the cultural fit of this translation for {ctx["metadata"].get("region", "global")}:
-                    
-                    Original text: {state["query"]}
-                    Translated text: {translation}
-                    
-                    Requirements:
-                    1. Provide a complexity score (1-10)
-                    2. List any cultural adaptations needed
-                    3. Rate overall cultural fit (high/medium/low)
-                    4. Identify any cultural sensitivities
-                    
-                    Return a JSON object with:
-                    - complexity_score: number between 1-10
-                    - cultural_adaptations: list of suggested changes
-                    - overall_fit: "high", "medium", or "low"
-                    - issues: list of cultural concerns
-                    
-                    Format:
-                    {{
-                        "complexity_score": 5,
-                        "cultural_adaptations": [],
-                        "overall_fit": "medium",
-                        "issues": []
-                    }}"""
-                    
-                    response = self.llm.invoke(prompt)
-                    content = response.content.strip()
-                    
-                    try:
-                        analysis = json.loads(content)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Invalid JSON response: {str(e)}\nContent: {content}")
-                        # Return default analysis with error
-                        return {**state, "cultural_analysis": {
-                            "error": "Invalid JSON response",
-                            "complexity_score": 5,
-                            "cultural_adaptations": [],
-                            "overall_fit": "medium",
-                            "issues": ["Invalid JSON format in response"]
-                        }}
-                    
-                    # Validate and sanitize analysis fields
-                    if not isinstance(analysis.get("complexity_score"), (int, float)):
-                        analysis["complexity_score"] = 5
-                    elif not (1 <= analysis["complexity_score"] <= 10):
-                        analysis["complexity_score"] = 5
-                    
-                    if analysis.get("overall_fit") not in ["high", "medium", "low"]:
-                        analysis["overall_fit"] = "medium"
-                    
-                    if not isinstance(analysis.get("cultural_adaptations"), list):
-                        analysis["cultural_adaptations"] = []
-                    
-                    if not isinstance(analysis.get("issues"), list):
-                        analysis["issues"] = []
-                    
-                    return {**state, "cultural_analysis": analysis}
-                except Exception as e:
-                    logger.error(f"Cultural analysis failed: {str(e)}")
-                    return {**state, "cultural_analysis": {
-                        "error": str(e),
-                        "complexity_score": 5,
-                        "cultural_adaptations": [],
-                        "overall_fit": "medium",
-                        "issues": ["Analysis failed"]
-                    }}
-            
-            # Add nodes to graph
-            builder.add_node("search", search_node)
-            builder.add_node("translate_with_retry", translate_with_retry)
-            builder.add_node("terminology", terminology_node)
-            builder.add_node("translate", translate_node)
-            builder.add_node("coherence", coherence_node)
-            builder.add_node("cultural_analysis", cultural_analysis_node)
-            
-            # Set entry point and build graph
-            builder.set_entry_point("search")
-            builder.add_edge("search", "translate_with_retry")
-            builder.add_edge("translate_with_retry", "terminology")
-            builder.add_edge("terminology", "translate")
+    def build_expert_graph(self, expert_agents: tuple = EXPERT_AGENTS, segmented: bool = False):
+        """Compile the expert pipeline for a set of enabled expert agents.
+
+        Sentiment analysis and terminology lookup are independent, so they
+        fan out from search and join before translate. The segmented variant
+        translates one segment of a long document: the document-wide
+        sentiment, terminology and cultural analysis run once outside it, so
+        it goes straight from search to translate.
+        """
+        builder = StateGraph(ExpertGraphState)
+        
+        # Add nodes to graph; nodes are bound methods, per-request data lives in the state
+        builder.add_node("search", partial(self._search_node, expert_agents=expert_agents))
+        builder.add_node("translate", self._translate_node)
+        final = END if segmented else "cultural_analysis"
+        if not segmented:
+            builder.add_node("cultural_analysis", self._cultural_analysis_node)
+        
+        branches = {}
+        if "sentiment_analyzer" in expert_agents and not segmented:
+            branches["sentiment"] = self._sentiment_node
+        if "terminology_specialist" in expert_agents and not segmented:
+            branches["terminology"] = self._terminology_node
+        
+        # Set entry point and build graph
+        builder.set_entry_point("search")
+        for name, node in branches.items():
+            builder.add_node(name, timed_branch(name, node))
+            builder.add_edge("search", name)
+        if branches:
+            builder.add_edge(list(branches), "translate")
+        else:
+            builder.add_edge("search", "translate")
+        if "coherence_checker" in expert_agents:
+            builder.add_node("coherence", self._coherence_node)
             builder.add_edge("translate", "coherence")
-            builder.add_edge("coherence", "cultural_analysis")
-            
-            graph = builder.compile()
+            builder.add_edge("coherence", final)
+        else:
+            builder.add_edge("translate", final)
+        if not segmented:
+            builder.add_edge("cultural_analysis", END)
+        
+        return builder.compile()
+    
+    def get_expert_graph(self, expert_agents: tuple = EXPERT_AGENTS, segmented: bool = False):
+        """Compiled expert graph, cached per set of enabled agents (the only inputs that shape it)"""
+        key = (tuple(sorted(expert_agents)), segmented)
+        with self._graph_lock:
+            graph = self._graph_cache.get(key)
+            if graph is None:
+                graph = self.build_expert_graph(key[0], segmented)
+                self._graph_cache[key] = graph
+            return graph
+    
+    def run_expert_state_graph(self, text: str, source_lang: str, target_lang: str,
+                             metadata: Dict, intensity: int, feedback: Optional[Dict],
+                             tm_reference: Optional[Dict] = None) -> Dict:
+        """Run expert translation using LangGraph state machine"""
+        try:
+            expert_agents = enabled_expert_agents()
+            segments = segment_text(text, source_lang)
+            budget = RequestBudget.for_request(len(segments))
+            if len(segments) > 1:
+                return self.run_segmented_expert_graph(
+                    text, segments, source_lang, target_lang, metadata, intensity, feedback, expert_agents,
+                    budget
+                )
+            graph = self.get_expert_graph(expert_agents)
             
             # Run graph with initial state
             init_state = {
@@ -500,15 +762,19 @@ class ExpertTranslationService:
                 "source_lang": source_lang,
                 "target_lang": target_lang,
                 "metadata": metadata,
+                "feedback": feedback,
                 "context": {},
-                "translation": None
+                "translation": None,
+                "tm_reference": tm_reference,
+                "budget": budget
             }
             
             result = graph.invoke(init_state)
             
             return {
                 'translation': result.get('translation', ''),
-                'context': result.get('context', {}),
+                'context': {**result.get('context', {}), 'branch_timings': result.get('branch_timings', {}),
+                            'budget': budget.summary()},
                 'metadata': metadata,
                 'analysis': result.get('cultural_analysis', None)
             }
@@ -520,27 +786,90 @@ class ExpertTranslationService:
                 'metadata': metadata
             }
 
+    def run_segmented_expert_graph(self, text: str, segments: list, source_lang: str, target_lang: str,
+                                   metadata: Dict, intensity: int, feedback: Optional[Dict],
+                                   expert_agents: tuple, budget: RequestBudget) -> Dict:
+        """Expert translation of a long document, segment by segment"""
+        # Document-wide enrichment, shared by every segment
+        shared = {}
+        if "sentiment_analyzer" in expert_agents:
+            with span("sentiment"):
+                shared["query_sentiment"] = self.analyze_sentiment(text)
+        if "terminology_specialist" in expert_agents:
+            with span("terminology"):
+                shared["term_translations"], shared["term_timeouts"] = self.resolve_terms(
+                    self.extract_terms(text, metadata.get("domain", "General"), budget),
+                    target_lang, "wikipedia_researcher" in expert_agents, budget=budget
+                )
+        
+        graph = self.get_expert_graph(expert_agents, segmented=True)
+        results = translate_segments(segments, lambda segment, neighbors: graph.invoke({
+            **shared,
+            "query": segment,
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "metadata": metadata,
+            "feedback": feedback,
+            "neighbors": neighbors,
+            "context": {},
+            "translation": None,
+            "budget": budget
+        }))
+        
+        branch_timings = {}
+        for result in results:
+            for name, seconds in result.get("branch_timings", {}).items():
+                branch_timings[name] = round(branch_timings.get(name, 0) + seconds, 4)
+        context = {**results[0].get("context", {}), "source_text": text,
+                   "segments": len(segments), "branch_timings": branch_timings}
+        
+        if any(not result.get("translation") for result in results):
+            return {
+                'translation': None,
+                'context': {**context, 'error': "Language validation failed for a segment"},
+                'metadata': metadata
+            }
+        
+        translation = join_segments(segments, [result["translation"] for result in results])
+        analysis = self._cultural_analysis_node(
+            {"query": text, "translation": translation, "context": context, "budget": budget}
+        )["cultural_analysis"]
+        context["budget"] = budget.summary()
+        return {
+            'translation': translation,
+            'context': context,
+            'metadata': metadata,
+            'analysis': analysis
+        }
+
     def run_expert_crewai(self, text: str, source_lang: str, target_lang: str,
                          metadata: Dict, intensity: int, feedback: Optional[Dict]) -> Dict:
         """Run expert translation using CrewAI orchestrator"""
         try:
-            # Run CrewAI translation
+            # The expert extras are charged to the same budget as the CrewAI run
+            budget = RequestBudget.for_request(len(segment_text(text, source_lang)))
             result = run_crewai_translation(
-                text, source_lang, target_lang, metadata, intensity, feedback
+                text, source_lang, target_lang, metadata, intensity, feedback, budget=budget
             )
             
             # Add expert features
-            if st.session_state.expert_agents.get("sentiment_analyzer", True):
+            expert_agents = session_value("expert_agents", {})
+            if expert_agents.get("sentiment_analyzer", True):
                 sentiment = self.analyze_sentiment(text)
                 result["context"]["sentiment_analysis"] = sentiment
             
-            if st.session_state.expert_agents.get("terminology_specialist", True):
-                term_translations = self.get_term_translations(text, target_lang)
+            if expert_agents.get("terminology_specialist", True):
+                term_translations = self.get_term_translations(text, target_lang, budget=budget)
                 result["context"]["term_translations"] = term_translations
             
-            if st.session_state.expert_agents.get("coherence_checker", True):
-                improved = self.improve_coherence(result["translation"])
-                result["translation"] = improved
+            if expert_agents.get("coherence_checker", True):
+                improved = self._coherence_node({
+                    "context": {"languages": {"target": target_lang}, "metadata": metadata},
+                    "translation": result["translation"],
+                    "budget": budget
+                })
+                result["translation"] = improved["translation"]
+            result["context"]["budget"] = budget.summary()
             
             return result
         except Exception as e:
@@ -551,13 +880,14 @@ class ExpertTranslationService:
                 'metadata': metadata
             }
 
+    @instrumented("translate_with_context")
     def translate_with_context(self, text: str, source_lang: str, target_lang: str,
                              metadata: Dict) -> str:
         """Translate text with context and metadata"""
         try:
             # Convert language codes to full names
-            source_lang_name = self.language_codes.get(source_lang.lower(), source_lang)
-            target_lang_name = self.language_codes.get(target_lang.lower(), target_lang)
+            source_lang_name = language_name(source_lang)
+            target_lang_name = language_name(target_lang)
             
             prompt = f"""Translate this text from {source_lang_name} to {target_lang_name}:
             {text}
@@ -569,14 +899,25 @@ class ExpertTranslationService:
             """
             
             # Add retry logic
+            last = ""
             for attempt in range(self.max_retries):
                 try:
-                    response = self.llm.invoke(prompt)
+                    # Later attempts retry a rejected answer, so they skip the cache
+                    if attempt:
+                        count_retry()
+                    with call_site("translate_with_context", cache=attempt == 0):
+                        response = self.llm.invoke(prompt)
                     translation = response.content.strip()
                     
-                    # Validate language
-                    if self.monolingual_validation(translation, target_lang):
+                    # Only an answer in the wrong language is rejected; a failed
+                    # sense check or validation error is logged and kept
+                    validation = self.monolingual_validation(translation, target_lang)
+                    if validation["reason"] != "language_mismatch":
+                        if not validation["valid"]:
+                            logger.warning(f"Keeping translation that failed validation: {validation['message']}")
                         return translation
+                    count_language_correction("translate_with_context", target_lang)
+                    last = translation or last
                     
                 except Exception as e:
                     logger.warning(f"Translation attempt {attempt + 1} failed: {str(e)}")
@@ -584,7 +925,8 @@ class ExpertTranslationService:
                         raise
                     time.sleep(2 ** attempt)  # Exponential backoff
             
-            return ""
+            # Out of retries: a translation in the wrong script still beats an empty one
+            return last
             
         except Exception as e:
             logger.error(f"Basic translation failed: {str(e)}")
@@ -607,30 +949,78 @@ class ExpertTranslationService:
 
     def translate_text(self, text: str, source_lang: str, target_lang: str, 
                   metadata: Dict, mode: str = "basic", framework: str = "LangGraph", 
-                  intensity: int = 3, feedback: Optional[Dict] = None) -> Dict:
-        """Main translation function that selects the appropriate translation mode"""
+                  intensity: int = 3, feedback: Optional[Dict] = None,
+                  use_memory: Optional[bool] = None) -> Dict:
+        """Main translation function that selects the appropriate translation mode.
+
+        use_memory overrides the session's translation memory setting.
+        """
         try:
-            if mode == "expert":
-                if framework == "LangGraph":
-                    return self.run_expert_state_graph(
-                        text, source_lang, target_lang, metadata, intensity, feedback
-                    )
-                elif framework == "CrewAI":
-                    return self.run_expert_crewai(
-                        text, source_lang, target_lang, metadata, intensity, feedback
-                    )
+            if use_memory is None:
+                use_memory = session_value("enable_translation_memory", True)
+            tm_mode = f"{mode}/{framework}/{intensity}" if mode == "expert" else mode
+            tm_metadata = {**(metadata or {}), "user_feedback": feedback}
+            # A call site that opted out of caching (e.g. retranslate) wants a fresh translation
+            reuse = use_memory and current_call_site()[1]
+            if reuse:
+                cached = self.check_translation_memory(text, target_lang, source_lang, tm_mode, tm_metadata)
+                if cached:
+                    return {
+                        'translation': cached,
+                        'context': {"source": "translation_memory"},
+                        'metadata': metadata
+                    }
+            
+            # Fall back to near matches: reuse outright or pass as a reference. Feedback
+            # asks for a different translation than the remembered one, and only the
+            # unsegmented LangGraph prompt takes a reference, so otherwise skip the search
+            tm_reference = None
+            fuzzy_reuse = reuse and not feedback
+            takes_reference = (mode == "expert" and framework == "LangGraph"
+                               and len(text.strip()) <= SEGMENT_MAX_CHARS)
+            if use_memory and (fuzzy_reuse or takes_reference):
+                matches = self.find_fuzzy_matches(text, source_lang, target_lang, limit=1,
+                                                  mode=tm_mode, metadata=tm_metadata)
+                if fuzzy_reuse and matches and is_reusable(matches[0], text):
+                    return {
+                        'translation': matches[0]["translation"],
+                        'context': {"source": "translation_memory_fuzzy", "tm_match": matches[0]},
+                        'metadata': metadata
+                    }
+                if takes_reference and matches:
+                    tm_reference = matches[0]
+            
+            with trace_request("expert") as trace:
+                if mode == "expert":
+                    if framework == "LangGraph":
+                        result = self.run_expert_state_graph(
+                            text, source_lang, target_lang, metadata, intensity, feedback,
+                            tm_reference=tm_reference
+                        )
+                    elif framework == "CrewAI":
+                        result = self.run_expert_crewai(
+                            text, source_lang, target_lang, metadata, intensity, feedback
+                        )
+                    else:
+                        raise ValueError(f"Unsupported framework: {framework}")
                 else:
-                    raise ValueError(f"Unsupported framework: {framework}")
-            else:
-                # Basic translation
-                translation = self.translate_with_context(
-                    text, source_lang, target_lang, metadata
+                    # Basic translation
+                    translation = self.translate_with_context(
+                        text, source_lang, target_lang, metadata
+                    )
+                    result = {
+                        'translation': translation,
+                        'context': {},
+                        'metadata': metadata
+                    }
+                result['context']['instrumentation'] = trace.summary()
+            
+            # Only remember successful translations
+            if use_memory and result.get('translation') and not result.get('context', {}).get('error'):
+                self.add_to_translation_memory(
+                    text, target_lang, result['translation'], source_lang, tm_mode, tm_metadata
                 )
-                return {
-                    'translation': translation,
-                    'context': {},
-                    'metadata': metadata
-                }
+            return result
         except Exception as e:
             logger.error(f"Translation failed: {str(e)}")
             return {
@@ -640,12 +1030,28 @@ class ExpertTranslationService:
             }
     # Close ExpertTranslationService class
 
+_default_service = None
+_default_service_lock = threading.Lock()
+_single_flight = SingleFlight()
+
+def get_expert_service() -> ExpertTranslationService:
+    """Shared service instance, so its compiled graphs are reused across requests"""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = ExpertTranslationService()
+        return _default_service
+
 # Standalone function for compatibility with imports
 def translate_text(text: str, source_lang: str, target_lang: str, 
                   metadata: Dict, mode: str = "basic", framework: str = "LangGraph", 
                   intensity: int = 3, feedback: Optional[Dict] = None) -> Dict:
     """Standalone wrapper for the ExpertTranslationService.translate_text method"""
-    service = ExpertTranslationService()
-    return service.translate_text(
-        text, source_lang, target_lang, metadata, mode, framework, intensity, feedback
-    )
\ No newline at end of file
+    service = get_expert_service()
+    # Concurrent identical requests wait for one pipeline run instead of each starting their own;
+    # feedback retranslations and cache opt-outs always run alone
+    args = (text, source_lang, target_lang, metadata, mode, framework, intensity, feedback)
+    if feedback or not current_call_site()[1]:
+        return service.translate_text(*args)
+    key = request_key(text, source_lang, target_lang, mode, framework, intensity, metadata, feedback)
+    return shared_run(_single_flight, key, service.translate_text, *args)
\ No newline at end of file
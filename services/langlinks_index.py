@@ -0,0 +1,256 @@
+# langlinks_index.py
+"""Offline Wikipedia interlanguage-link index.
+
+Builds a read-only SQLite index from a local langlinks dump so term
+lookups need no network access. Two input formats are accepted (plain
+or .gz):
+
+  * TSV lines of  source_title<TAB>lang<TAB>target_title
+  * the MediaWiki SQL dumps  <wiki>-langlinks.sql  plus  <wiki>-page.sql,
+    which maps the langlinks page ids to titles
+
+Usage:
+    python -m services.langlinks_index build --langlinks enwiki-langlinks.sql.gz \\
+        --pages enwiki-page.sql.gz --output langlinks.db
+    python -m services.langlinks_index lookup --index langlinks.db API ta
+
+Point LANGLINKS_INDEX_PATH at the built file to enable it in the app.
+"""
+import argparse
+import gzip
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from itertools import islice
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LANGLINKS_INDEX_PATH = os.getenv("LANGLINKS_INDEX_PATH", "")
+BATCH_SIZE = 50000
+
+# One parenthesised row of an INSERT statement, and the values inside it
+_SQL_ROW = re.compile(r"\(((?:'(?:[^'\\]|\\.)*'|[^'()])*)\)")
+_SQL_VALUE = re.compile(r"'((?:[^'\\]|\\.)*)'|(NULL)|([^,']+)")
+_SQL_ESCAPE = re.compile(r"\\(.)")
+_SQL_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "0": "\0"}
+
+def normalize_title(title: str) -> str:
+    """Lookup form of a title: NFC, underscores as spaces, casefolded"""
+    title = unicodedata.normalize("NFC", title).replace("_", " ")
+    return " ".join(title.split()).casefold()
+
+def display_title(title: str) -> str:
+    """Title as Wikipedia shows it: spaces, first letter upper-case"""
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+def _open_dump(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+def _sql_rows(path: str, table: str) -> Iterator[list]:
+    """Rows of the INSERT statements for table in a MediaWiki SQL dump"""
+    prefix = f"INSERT INTO `{table}` VALUES "
+    with _open_dump(path) as dump:
+        for line in dump:
+            if not line.startswith(prefix):
+                continue
+            for row in _SQL_ROW.finditer(line, len(prefix)):
+                values = []
+                for quoted, null, bare in _SQL_VALUE.findall(row.group(1)):
+                    if null:
+                        values.append(None)
+                    elif bare:
+                        values.append(bare.strip())
+                    else:
+                        values.append(_SQL_ESCAPE.sub(
+                            lambda m: _SQL_ESCAPES.get(m.group(1), m.group(1)), quoted))
+                yield values
+
+def _batches(rows: Iterator, size: int = BATCH_SIZE) -> Iterator[list]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+def _stage_tsv(conn: sqlite3.Connection, path: str):
+    """Copy the links of a TSV dump into staged_links"""
+    def links():
+        with _open_dump(path) as dump:
+            for line in dump:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) >= 3 and parts[2]:
+                    yield display_title(parts[0]), parts[1].strip().lower(), display_title(parts[2])
+    for batch in _batches(links()):
+        conn.executemany("INSERT INTO staged_links (source, lang, target) VALUES (?, ?, ?)", batch)
+
+def _stage_sql(conn: sqlite3.Connection, langlinks_path: str, pages_path: str):
+    """Copy both SQL dumps into staging tables and join them into staged_links on page id"""
+    conn.execute("CREATE TABLE staged_pages (page_id INTEGER PRIMARY KEY, title TEXT NOT NULL)")
+    conn.execute("CREATE TABLE staged_page_links (page_id INTEGER NOT NULL, lang TEXT NOT NULL, "
+                 "target TEXT NOT NULL)")
+    # Only main-namespace articles carry term translations
+    pages = ((int(row[0]), display_title(row[2])) for row in _sql_rows(pages_path, "page")
+             if len(row) >= 3 and row[1] == "0")
+    for batch in _batches(pages):
+        conn.executemany("INSERT OR IGNORE INTO staged_pages VALUES (?, ?)", batch)
+    links = ((int(row[0]), row[1].strip().lower(), display_title(row[2]))
+             for row in _sql_rows(langlinks_path, "langlinks") if len(row) >= 3 and row[2])
+    for batch in _batches(links):
+        conn.executemany("INSERT INTO staged_page_links VALUES (?, ?, ?)", batch)
+    conn.execute("""INSERT INTO staged_links (source, lang, target)
+                    SELECT p.title, l.lang, l.target
+                    FROM staged_page_links l JOIN staged_pages p ON p.page_id = l.page_id
+                    ORDER BY l.rowid""")
+    conn.execute("DROP TABLE staged_page_links")
+    conn.execute("DROP TABLE staged_pages")
+
+def build_index(langlinks_path: str, output_path: str, pages_path: Optional[str] = None) -> Dict:
+    """Build the index file from a dump and return row counts"""
+    if langlinks_path.endswith((".sql", ".sql.gz")) and not pages_path:
+        raise ValueError("SQL langlinks dumps need --pages to resolve page ids")
+
+    # Build next to the target and swap it in, so readers never see a partial index
+    tmp_path = f"{output_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.create_function("normalize_title", 1, normalize_title, deterministic=True)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("""CREATE TABLE pages (
+        page_id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL UNIQUE
+    )""")
+    conn.execute("""CREATE TABLE title_norm (
+        norm TEXT PRIMARY KEY,
+        page_id INTEGER NOT NULL
+    ) WITHOUT ROWID""")
+    conn.execute("""CREATE TABLE langlinks (
+        page_id INTEGER NOT NULL,
+        lang TEXT NOT NULL,
+        title TEXT NOT NULL,
+        PRIMARY KEY (page_id, lang)
+    ) WITHOUT ROWID""")
+    # Dump rows are staged on disk in the index file itself, so building from
+    # a full dump does not hold its titles in memory
+    conn.execute("CREATE TABLE staged_links (source TEXT NOT NULL, lang TEXT NOT NULL, target TEXT NOT NULL)")
+
+    with conn:
+        if pages_path:
+            _stage_sql(conn, langlinks_path, pages_path)
+        else:
+            _stage_tsv(conn, langlinks_path)
+        # Pages are numbered in order of first appearance
+        conn.execute("""INSERT INTO pages (title)
+                        SELECT source FROM staged_links GROUP BY source ORDER BY MIN(rowid)""")
+        # First title wins when several normalize to the same form
+        conn.execute("""INSERT OR IGNORE INTO title_norm
+                        SELECT normalize_title(title), page_id FROM pages ORDER BY page_id""")
+        conn.execute("""INSERT OR IGNORE INTO langlinks
+                        SELECT p.page_id, s.lang, s.target
+                        FROM staged_links s JOIN pages p ON p.title = s.source
+                        ORDER BY s.rowid""")
+        conn.execute("DROP TABLE staged_links")
+
+    counts = {
+        "pages": conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0],
+        "langlinks": conn.execute("SELECT COUNT(*) FROM langlinks").fetchone()[0],
+    }
+    conn.execute("ANALYZE")
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_path, output_path)
+    return counts
+
+class LanglinksIndex:
+    """Read-only lookups against a built index, one connection per thread"""
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.conn = conn
+        return conn
+
+    def _page_id(self, term: str) -> Optional[int]:
+        conn = self._connection()
+        row = conn.execute("SELECT page_id FROM pages WHERE title = ?", (display_title(term),)).fetchone()
+        if row is None:
+            row = conn.execute("SELECT page_id FROM title_norm WHERE norm = ?",
+                               (normalize_title(term),)).fetchone()
+        return row[0] if row else None
+
+    def lookup(self, term: str, lang: str) -> Optional[str]:
+        """Title of term's article in the lang edition (a language code), or None"""
+        page_id = self._page_id(term)
+        title = None
+        if page_id is not None:
+            row = self._connection().execute(
+                "SELECT title FROM langlinks WHERE page_id = ? AND lang = ?",
+                (page_id, lang.lower())).fetchone()
+            title = row[0] if row else None
+        with self._lock:
+            self.stats["lookups"] += 1
+            self.stats["hits"] += title is not None
+        return title
+
+    def languages(self, term: str) -> Dict[str, str]:
+        """All interlanguage links of term, keyed by language code"""
+        page_id = self._page_id(term)
+        if page_id is None:
+            return {}
+        rows = self._connection().execute(
+            "SELECT lang, title FROM langlinks WHERE page_id = ?", (page_id,)).fetchall()
+        return dict(rows)
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+def get_langlinks_index() -> Optional[LanglinksIndex]:
+    """Index configured by LANGLINKS_INDEX_PATH, or None when there is none"""
+    global _shared_index
+    if not LANGLINKS_INDEX_PATH or not os.path.exists(LANGLINKS_INDEX_PATH):
+        return None
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = LanglinksIndex(LANGLINKS_INDEX_PATH)
+        return _shared_index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Wikipedia langlinks index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build an index from a langlinks dump")
+    build.add_argument("--langlinks", required=True, help="TSV or langlinks.sql[.gz] dump")
+    build.add_argument("--pages", help="page.sql[.gz] dump, required for SQL langlinks dumps")
+    build.add_argument("--output", default=LANGLINKS_INDEX_PATH or "langlinks.db")
+
+    lookup = commands.add_parser("lookup", help="Look up a term in a built index")
+    lookup.add_argument("--index", default=LANGLINKS_INDEX_PATH or "langlinks.db")
+    lookup.add_argument("term")
+    lookup.add_argument("lang", help="Language code, e.g. ta")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        counts = build_index(args.langlinks, args.output, args.pages)
+        print(f"Indexed {counts['pages']} pages and {counts['langlinks']} links into {args.output}")
+    else:
+        print(LanglinksIndex(args.index).lookup(args.term, args.lang) or "Not found")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# metadata_cache.py
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from core.database import get_metadata_cache_entry, save_metadata_cache_entry, count_metadata_cache_entries
+from utils.single_flight import request_key
+
+logger = logging.getLogger(__name__)
+
+# Least recently used rows beyond this are evicted on write
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "5000"))
+
+class MetadataCache:
+    """Persistent (normalized text, mode, model) -> extracted metadata cache"""
+    def __init__(self, max_entries: int = METADATA_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def get(self, text: str, mode: str, model: Optional[str]) -> Optional[Dict]:
+        """Cached metadata for the text, or None"""
+        try:
+            cached = get_metadata_cache_entry(request_key(text, mode, model))
+        except Exception as e:
+            logger.error(f"Metadata cache lookup failed: {str(e)}")
+            cached = None
+        self._count("hits" if cached is not None else "misses")
+        return json.loads(cached) if cached is not None else None
+
+    def put(self, text: str, mode: str, model: Optional[str], metadata: Dict):
+        try:
+            evicted = save_metadata_cache_entry(request_key(text, mode, model), mode, model,
+                                                json.dumps(metadata, ensure_ascii=False), self.max_entries)
+            self._count("writes")
+            self._count("evictions", evicted)
+        except Exception as e:
+            logger.error(f"Metadata cache write failed: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        try:
+            stats["entries"] = count_metadata_cache_entries()
+        except Exception as e:
+            logger.error(f"Metadata cache count failed: {str(e)}")
+        return stats
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_metadata_cache() -> MetadataCache:
+    """Process-wide metadata cache"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = MetadataCache()
+        return _shared_cache
@@ -1,107 +1,155 @@
-import google.generativeai as genai
 from dotenv import load_dotenv
 import os
+import re
 import json
+from bisect import bisect_right
+from itertools import accumulate
+from core.llm_registry import get_generative_model
+from core.llm_cache import call_site
+from services.metadata_cache import get_metadata_cache
 from utils.helpers import parse_metadata
 
 load_dotenv()
 
 def get_llm(model_name="gemini-2.5-flash-preview-05-20"):
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model = genai.GenerativeModel(model_name=model_name)
-    return model
+    return get_generative_model(model_name)
 
-def extract_metadata_basic(text):
-    # Initialize with default values
-    metadata = {
-        "domain": "General",
-        "tone": "Neutral",
-        "time_period": "Contemporary",
-        "region": "Global",
-        "audience": "Adults",
-        "complexity": "Medium",
-        "purpose": "General",
-        "emotional_tone": "Neutral"
-    }
-    
-    # Domain detection
-    domain_keywords = {
-        "Medical": ["medical", "health", "doctor", "hospital"],
-        "Technical": ["technical", "engineering", "software", "code"],
-        "Legal": ["legal", "law", "contract", "agreement"],
-        "Business": ["business", "enterprise", "corporate", "sale"],
-        "Education": ["education", "school", "university", "learn"],
-        "Entertainment": ["entertainment", "movie", "music", "game"]
-    }
-    
-    for domain, keywords in domain_keywords.items():
-        if any(kw in text.lower() for kw in keywords):
-            metadata["domain"] = domain
-            break
-    
-    # Tone detection
-    if any(word in text.lower() for word in ["buddy", "pal", "dude", "hey", "hi", "wassup"]):
-        metadata["tone"] = "Informal"
-    elif any(word in text.lower() for word in ["sir", "madam", "respectfully", "honorable"]):
-        metadata["tone"] = "Formal"
-    
-    # Time period detection
-    if any(word in text.lower() for word in ["ancient", "medieval", "century"]):
-        metadata["time_period"] = "Historical"
-    elif any(word in text.lower() for word in ["future", "next gen", "tomorrow"]):
-        metadata["time_period"] = "Futuristic"
-    
-    # Region detection
-    region_keywords = {
+# Keyword tables per metadata field; within a field the first label with a
+# matching keyword wins, so the order of labels is their priority. Keywords
+# match whole words only, so inflected forms are listed explicitly
+METADATA_KEYWORDS = {
+    "domain": {
+        "Medical": ["medical", "health", "doctor", "doctors", "hospital", "hospitals"],
+        "Technical": ["technical", "engineering", "software", "code", "codes", "coding"],
+        "Legal": ["legal", "law", "laws", "contract", "contracts", "agreement", "agreements"],
+        "Business": ["business", "businesses", "enterprise", "enterprises", "corporate", "sale", "sales"],
+        "Education": ["education", "school", "schools", "university", "universities",
+                      "learn", "learns", "learned", "learnt", "learning"],
+        "Entertainment": ["entertainment", "movie", "movies", "music", "game", "games", "gaming"]
+    },
+    "tone": {
+        "Informal": ["buddy", "buddies", "pal", "pals", "dude", "dudes", "hey", "hi", "wassup"],
+        "Formal": ["sir", "madam", "respectfully", "honorable"]
+    },
+    "time_period": {
+        "Historical": ["ancient", "medieval", "century", "centuries"],
+        "Futuristic": ["future", "next gen", "tomorrow"]
+    },
+    "region": {
         "North America": ["usa", "united states", "canada", "mexico"],
         "Europe": ["europe", "eu", "uk", "united kingdom"],
         "Asia": ["asia", "china", "india", "japan"],
         "Africa": ["africa", "nigeria", "south africa", "egypt"]
+    },
+    "audience": {
+        "Children": ["child", "kid", "kids", "children", "toy", "toys"],
+        "Teens": ["teen", "teens", "teenager", "teenagers", "youth", "student", "students"],
+        "Seniors": ["senior", "seniors", "elderly", "retirement"],
+        "Academics": ["academic", "academics", "research", "study", "studies", "thesis"]
+    },
+    "purpose": {
+        "Business": ["business", "businesses", "company", "companies", "enterprise", "enterprises",
+                     "corporate"],
+        "Legal": ["legal", "law", "laws", "contract", "contracts", "agreement", "agreements"],
+        "Entertainment": ["entertainment", "movie", "movies", "music", "game", "games", "gaming"],
+        "Education": ["education", "school", "schools", "university", "universities",
+                      "learn", "learns", "learned", "learnt", "learning"]
+    },
+    "emotional_tone": {
+        "Humorous": ["funny", "joke", "jokes", "laugh", "laughs", "laughed", "laughing", "humor"],
+        "Serious": ["serious", "important", "critical", "urgent"],
+        "Inspiring": ["inspire", "inspires", "inspired", "inspiring", "motivate", "motivated",
+                      "motivating", "encourage", "encouraged", "encouraging", "hope", "hopes", "hoped",
+                      "hoping"]
     }
-    
-    for region, keywords in region_keywords.items():
-        if any(kw in text.lower() for kw in keywords):
-            metadata["region"] = region
-            break
-    
-    # Audience detection
-    if any(word in text.lower() for word in ["child", "kid", "children", "toy"]):
-        metadata["audience"] = "Children"
-    elif any(word in text.lower() for word in ["teen", "youth", "student"]):
-        metadata["audience"] = "Teens"
-    elif any(word in text.lower() for word in ["senior", "elderly", "retirement"]):
-        metadata["audience"] = "Seniors"
-    elif any(word in text.lower() for word in ["academic", "research", "study", "thesis"]):
-        metadata["audience"] = "Academics"
+}
+
+DEFAULT_METADATA = {
+    "domain": "General",
+    "tone": "Neutral",
+    "time_period": "Contemporary",
+    "region": "Global",
+    "audience": "Adults",
+    "complexity": "Medium",
+    "purpose": "General",
+    "emotional_tone": "Neutral"
+}
+
+def _trie_pattern(trie):
+    """Regex for the keywords of a character trie; shared prefixes are only matched once"""
+    ends = "" in trie
+    branches = [(r"\s+" if char == " " else re.escape(char)) + _trie_pattern(rest)
+                for char, rest in sorted(trie.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 and not ends else "(?:" + "|".join(branches) + ")"
+    return body + "?" if ends else body
+
+def _compile_keywords(tables):
+    """One alternation of every keyword between word boundaries, shaped as a prefix trie.
+
+    Shared prefixes keep the regex engine from retrying every keyword at
+    each word; a longer keyword is preferred over its prefix.
+    """
+    trie = {}
+    for labels in tables.values():
+        for keywords in labels.values():
+            for keyword in keywords:
+                node = trie
+                for char in keyword:
+                    node = node.setdefault(char, {})
+                node[""] = {}
+    return re.compile(r"\b" + _trie_pattern(trie) + r"\b")
+
+_KEYWORD_PATTERN = _compile_keywords(METADATA_KEYWORDS)
+_KEYWORD_SETS = {field: [(label, frozenset(kws)) for label, kws in labels.items()]
+                 for field, labels in METADATA_KEYWORDS.items()}
+# Joins batched documents; neither a word nor whitespace, so no match spans two documents
+_DOCUMENT_SEPARATOR = "\0"
+
+def _classify(matches, word_count):
+    """Metadata from the keyword matches of one text"""
+    metadata = dict(DEFAULT_METADATA)
+    # Phrases match across any whitespace
+    found = {" ".join(match.split()) for match in matches}
+    for field, labels in _KEYWORD_SETS.items():
+        for label, keywords in labels:
+            if found & keywords:
+                metadata[field] = label
+                break
     
     # Complexity detection
-    word_count = len(text.split())
     if word_count < 20:
         metadata["complexity"] = "Simple"
     elif word_count > 100:
         metadata["complexity"] = "Advanced"
     
-    # Purpose detection
-    if any(word in text.lower() for word in ["business", "company", "enterprise", "corporate"]):
-        metadata["purpose"] = "Business"
-    elif any(word in text.lower() for word in ["legal", "law", "contract", "agreement"]):
-        metadata["purpose"] = "Legal"
-    elif any(word in text.lower() for word in ["entertainment", "movie", "music", "game"]):
-        metadata["purpose"] = "Entertainment"
-    elif any(word in text.lower() for word in ["education", "school", "university", "learn"]):
-        metadata["purpose"] = "Education"
-    
-    # Emotional tone detection
-    if any(word in text.lower() for word in ["funny", "joke", "laugh", "humor"]):
-        metadata["emotional_tone"] = "Humorous"
-    elif any(word in text.lower() for word in ["serious", "important", "critical", "urgent"]):
-        metadata["emotional_tone"] = "Serious"
-    elif any(word in text.lower() for word in ["inspire", "motivate", "encourage", "hope"]):
-        metadata["emotional_tone"] = "Inspiring"
-    
     return metadata
 
-def extract_metadata_advanced(text, model="gemini-1.5-flash"):
+def extract_metadata_basic(text):
+    """Keyword-based metadata; every field is classified from one scan of the text"""
+    lowered = (text or "").lower()
+    return _classify(set(_KEYWORD_PATTERN.findall(lowered)), len(lowered.split()))
+
+def extract_metadata_basic_batch(texts):
+    """extract_metadata_basic for many documents, scanned together in a single pass"""
+    lowered = [(text or "").lower() for text in texts]
+    # Offset at which each following document starts in the joined text
+    bounds = list(accumulate(len(text) + len(_DOCUMENT_SEPARATOR) for text in lowered))
+    matches = [set() for _ in lowered]
+    for match in _KEYWORD_PATTERN.finditer(_DOCUMENT_SEPARATOR.join(lowered)):
+        matches[bisect_right(bounds, match.start())].add(match.group())
+    return [_classify(found, len(text.split())) for found, text in zip(matches, lowered)]
+
+# Model used by each LLM extraction mode
+METADATA_MODELS = {
+    "advanced": "gemini-1.5-flash",
+    "agentic": "gemini-2.5-flash-preview-05-20"
+}
+
+@call_site("metadata")
+def _extract_metadata_llm(text, model):
+    """Metadata parsed from the LLM's JSON answer, or None when it is not valid JSON"""
     llm = get_llm(model)
     
     prompt = f"""Analyze the text and extract metadata. Respond in JSON with:
@@ -131,14 +179,26 @@ def extract_metadata_advanced(text, model="gemini-1.5-flash"):
             return json.loads(json_str)
     except:
         pass
-    
+    return None
+
+def extract_metadata_advanced(text, model="gemini-1.5-flash"):
     # Fallback to basic extraction
-    return extract_metadata_basic(text)
+    return _extract_metadata_llm(text, model) or extract_metadata_basic(text)
 
 def extract_metadata(text, mode="basic"):
+    """Metadata for text, answered from the metadata cache when it was analyzed before"""
+    model = METADATA_MODELS.get(mode, METADATA_MODELS["agentic"]) if mode != "basic" else None
+    cache = get_metadata_cache()
+    metadata = cache.get(text, mode, model)
+    if metadata is not None:
+        return metadata
+    
     if mode == "basic":
-        return extract_metadata_basic(text)
-    elif mode == "advanced":
-        return extract_metadata_advanced(text)
-    else:  # agentic
-        return extract_metadata_advanced(text, "gemini-2.5-flash-preview-05-20")
\ No newline at end of file
+        metadata = extract_metadata_basic(text)
+    else:  # advanced / agentic
+        metadata = _extract_metadata_llm(text, model)
+        if not metadata:
+            # Basic fallbacks are not cached, so the next request asks the LLM again
+            return extract_metadata_basic(text)
+    cache.put(text, mode, model, metadata)
+    return metadata
\ No newline at end of file
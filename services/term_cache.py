@@ -0,0 +1,85 @@
+# term_cache.py
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from core.database import get_term_cache_entry, save_term_cache_entry, purge_term_cache
+from utils.helpers import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Resolved terms change rarely; "not found" is retried sooner in case a
+# page or language link is added
+TERM_CACHE_TTL = float(os.getenv("TERM_CACHE_TTL_HOURS", "720")) * 3600
+TERM_CACHE_NEGATIVE_TTL = float(os.getenv("TERM_CACHE_NEGATIVE_TTL_HOURS", "24")) * 3600
+
+# Returned by TermCache.get when nothing usable is cached; None means a
+# cached "not found"
+MISSING = object()
+
+class TermCache:
+    """Persistent (term, target language) -> translation cache with TTLs"""
+    def __init__(self, ttl: float = TERM_CACHE_TTL, negative_ttl: float = TERM_CACHE_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "writes": 0}
+
+    @staticmethod
+    def _key(term: str, target_lang: str) -> tuple:
+        return normalize_text(term), (target_lang or "").lower()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, term: str, target_lang: str):
+        """Cached translation, None for a cached "not found", or MISSING"""
+        try:
+            row = get_term_cache_entry(*self._key(term, target_lang))
+        except Exception as e:
+            logger.error(f"Term cache lookup failed: {str(e)}")
+            row = None
+
+        if row is None:
+            self._count("misses")
+            return MISSING
+        translation, expires_at = row
+        if expires_at <= time.time():
+            self._count("expired")
+            return MISSING
+        self._count("hits" if translation is not None else "negative_hits")
+        return translation
+
+    def put(self, term: str, target_lang: str, translation: Optional[str]):
+        """Cache a resolution; translation=None records "not found" """
+        ttl = self.ttl if translation is not None else self.negative_ttl
+        try:
+            save_term_cache_entry(*self._key(term, target_lang), translation, time.time() + ttl)
+            self._count("writes")
+        except Exception as e:
+            logger.error(f"Term cache write failed: {str(e)}")
+
+    def purge_expired(self) -> int:
+        """Drop expired rows from the database"""
+        return purge_term_cache(time.time())
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"] + stats["expired"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["negative_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def get_term_cache() -> TermCache:
+    """Process-wide term cache shared by all service instances"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = TermCache()
+        return _shared_cache
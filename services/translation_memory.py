@@ -0,0 +1,227 @@
+# translation_memory.py
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from math import ceil
+from typing import Dict, List, Optional
+
+from core.database import get_tm_entry, save_tm_entry, iter_tm_entries
+from utils.helpers import normalize_text
+
+logger = logging.getLogger(__name__)
+
+TM_CACHE_SIZE = int(os.getenv("TM_CACHE_SIZE", "2048"))
+# Minimum similarity for a fuzzy match to be offered as a reference
+TM_FUZZY_THRESHOLD = float(os.getenv("TM_FUZZY_THRESHOLD", "0.75"))
+# Fuzzy matches at or above this score are reused without calling the LLM
+TM_FUZZY_REUSE = float(os.getenv("TM_FUZZY_REUSE", "0.97"))
+NGRAM_SIZE = 4
+# Extra rare n-grams scanned beyond the minimal prefix; candidates must hit
+# several of them, which prunes most posting-list noise before scoring
+PREFIX_SLACK = 10
+
+def make_tm_key(text: str, source_lang: str, target_lang: str,
+                mode: str = "", metadata: Optional[Dict] = None) -> str:
+    """Content address of a translation request"""
+    payload = json.dumps(
+        [normalize_text(text), source_lang or "", target_lang or "", mode or "", metadata or {}],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def make_context_key(mode: str = "", metadata: Optional[Dict] = None) -> str:
+    """Hash of the request settings (mode, metadata, feedback) that partitions fuzzy matching"""
+    payload = json.dumps([mode or "", metadata or {}], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+_NUMBER = re.compile(r"\d+(?:[.,:/-]\d+)*")
+
+def numbers_match(text: str, other: str) -> bool:
+    """Whether two texts contain the same numbers in the same order"""
+    return _NUMBER.findall(text or "") == _NUMBER.findall(other or "")
+
+def is_reusable(match: Optional[Dict], text: str, threshold: float = TM_FUZZY_REUSE) -> bool:
+    """Whether a fuzzy match may stand in for a new translation of text.
+
+    A long text that differs only in a number still scores close to 1, so
+    the numbers of both sources must also agree.
+    """
+    return (match is not None and match["score"] >= threshold
+            and numbers_match(normalize_text(text), match["source_text"]))
+
+def char_ngrams(text: str, n: int = NGRAM_SIZE) -> set:
+    """Set of character n-grams of the normalized, lowercased text"""
+    text = f" {normalize_text(text).lower()} "
+    if len(text) <= n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+class FuzzyIndex:
+    """Inverted character n-gram index scored with the Dice coefficient.
+
+    Candidates are generated with prefix filtering: a segment can only
+    reach the threshold if it shares enough of the query's rarest n-grams,
+    so only short posting lists are scanned and few candidates are scored.
+    """
+    def __init__(self, threshold: float = TM_FUZZY_THRESHOLD):
+        self.threshold = threshold
+        self._postings = defaultdict(list)
+        self._segments = []
+        self._by_source = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._segments)
+
+    def add(self, source_text: str, source_lang: str, target_lang: str, translation: str,
+            context_key: str = ""):
+        """Index a segment, replacing the translation of an identical source"""
+        bucket = (source_lang or "", target_lang or "", context_key or "")
+        source = normalize_text(source_text)
+        with self._lock:
+            segment_id = self._by_source.get((bucket, source))
+            if segment_id is not None:
+                _, _, _, grams = self._segments[segment_id]
+                self._segments[segment_id] = (bucket, source, translation, grams)
+                return
+            grams = frozenset(char_ngrams(source))
+            segment_id = len(self._segments)
+            self._segments.append((bucket, source, translation, grams))
+            self._by_source[(bucket, source)] = segment_id
+            for gram in grams:
+                self._postings[(bucket, gram)].append(segment_id)
+
+    def search(self, text: str, source_lang: str, target_lang: str,
+               limit: int = 3, threshold: Optional[float] = None, context_key: str = "") -> List[Dict]:
+        """Best matches for text in the same language pair and context, highest score first"""
+        threshold = self.threshold if threshold is None else threshold
+        bucket = (source_lang or "", target_lang or "", context_key or "")
+        query = char_ngrams(text)
+        size = len(query)
+
+        with self._lock:
+            ranked = sorted(query, key=lambda g: len(self._postings.get((bucket, g), ())))
+            min_overlap = max(1, ceil(threshold * size / (2 - threshold)))
+            prefix = min(size, size - min_overlap + PREFIX_SLACK)
+            counts = Counter()
+            for gram in ranked[:prefix]:
+                counts.update(self._postings.get((bucket, gram), ()))
+            required = min_overlap - (size - prefix)
+            candidates = [c for c, hits in counts.items() if hits >= required]
+
+            min_len = size * threshold / (2 - threshold)
+            max_len = size * (2 - threshold) / threshold
+            matches = []
+            for segment_id in candidates:
+                _, source, translation, grams = self._segments[segment_id]
+                if not min_len <= len(grams) <= max_len:
+                    continue
+                score = 2 * len(query & grams) / (size + len(grams))
+                if score >= threshold:
+                    matches.append({
+                        "source_text": source,
+                        "translation": translation,
+                        "score": round(score, 4)
+                    })
+
+        matches.sort(key=lambda m: m["score"], reverse=True)
+        return matches[:limit]
+
+class TranslationMemory:
+    """SQLite-backed translation memory with a bounded in-process LRU hot tier"""
+    def __init__(self, capacity: int = TM_CACHE_SIZE):
+        self.capacity = capacity
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+        self.fuzzy = FuzzyIndex()
+        self._fuzzy_loaded = False
+        self._fuzzy_lock = threading.Lock()
+        self.stats = {"hot_hits": 0, "db_hits": 0, "misses": 0, "fuzzy_hits": 0}
+
+    def _remember(self, key: str, translation: str):
+        with self._lock:
+            self._hot[key] = translation
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.capacity:
+                self._hot.popitem(last=False)
+
+    def get(self, text: str, source_lang: str, target_lang: str,
+            mode: str = "", metadata: Optional[Dict] = None) -> Optional[str]:
+        """Look up a translation, hot tier first, then the database"""
+        key = make_tm_key(text, source_lang, target_lang, mode, metadata)
+        with self._lock:
+            if key in self._hot:
+                self._hot.move_to_end(key)
+                self.stats["hot_hits"] += 1
+                return self._hot[key]
+
+        try:
+            translation = get_tm_entry(key)
+        except Exception as e:
+            logger.error(f"Translation memory lookup failed: {str(e)}")
+            translation = None
+
+        if translation is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["db_hits"] += 1
+        self._remember(key, translation)
+        return translation
+
+    def put(self, text: str, source_lang: str, target_lang: str, translation: str,
+            mode: str = "", metadata: Optional[Dict] = None):
+        """Store a translation in both tiers"""
+        if not text or not translation:
+            return
+        key = make_tm_key(text, source_lang, target_lang, mode, metadata)
+        context_key = make_context_key(mode, metadata)
+        self._remember(key, translation)
+        if self._fuzzy_loaded:
+            self.fuzzy.add(text, source_lang, target_lang, translation, context_key)
+        try:
+            save_tm_entry(key, normalize_text(text), source_lang, target_lang, mode, translation, context_key)
+        except Exception as e:
+            logger.error(f"Translation memory write failed: {str(e)}")
+
+    def _ensure_fuzzy_index(self):
+        """Build the n-gram index from the database on first use"""
+        with self._fuzzy_lock:
+            if self._fuzzy_loaded:
+                return
+            try:
+                # Entries saved before context keys existed match no request
+                for _, source_text, source_lang, target_lang, translation, context_key in iter_tm_entries():
+                    self.fuzzy.add(source_text, source_lang, target_lang, translation,
+                                   context_key or "legacy")
+            except Exception as e:
+                logger.error(f"Fuzzy index build failed: {str(e)}")
+            self._fuzzy_loaded = True
+
+    def find_similar(self, text: str, source_lang: str, target_lang: str,
+                     limit: int = 3, threshold: Optional[float] = None,
+                     mode: str = "", metadata: Optional[Dict] = None) -> List[Dict]:
+        """Near matches for text among entries stored with the same mode and metadata"""
+        self._ensure_fuzzy_index()
+        matches = self.fuzzy.search(text, source_lang, target_lang, limit, threshold,
+                                    make_context_key(mode, metadata))
+        if matches:
+            self.stats["fuzzy_hits"] += 1
+        return matches
+
+_shared_memory = None
+_shared_lock = threading.Lock()
+
+def get_translation_memory() -> TranslationMemory:
+    """Process-wide translation memory shared by all service instances"""
+    global _shared_memory
+    with _shared_lock:
+        if _shared_memory is None:
+            _shared_memory = TranslationMemory()
+        return _shared_memory
@@ -1,23 +1,23 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 import os
 from core.state_graph import run_state_graph
 import json
 import time
 import logging
-import streamlit as st
-from core.database import get_translation_history
+from core.database import save_translations_bulk, save_translation_spans, transaction
 from core.crewai_orchestrator import run_crewai_translation
+from core.llm_registry import get_chat_model, stream_chat
+from core.llm_cache import call_site, current_call_site
+from core.instrumentation import instrumented, trace_request, pipeline_label, shared_run
+from utils.helpers import session_value
+from utils.single_flight import SingleFlight, request_key
+from core.segmentation import segment_text, translate_segments, join_segments, neighbor_prompt
 
 load_dotenv()
 
 def get_llm():
     try:
-        return ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash-preview-05-20",
-            google_api_key=os.getenv("GEMINI_API_KEY"),
-            temperature=0.3
-        )
+        return get_chat_model("gemini-2.5-flash-preview-05-20", temperature=0.3)
     except Exception as e:
         logging.error(f"LLM initialization failed: {str(e)}")
         raise ValueError(f"Failed to initialize language model: {str(e)}")
@@ -35,21 +35,30 @@ def safe_json_loads(data):
         logging.error(f"Error processing data: {str(e)}")
         return None
 
-def basic_translate(text, source_lang, target_lang, feedback=None):
-    try:
-        llm = get_llm()
-        
-        if source_lang == "Auto":
-            source_desc = "the detected source language"
-        else:
-            source_desc = source_lang
-        
-        # Build prompt with clear instructions
-        prompt = f"""You are a professional translator. Translate the following text from {source_desc} to {target_lang}.
+def persist_translations(rows, spans=None):
+    """Save translation rows in one transaction and return their ids.
+
+    spans optionally lists, per row, the trace spans of the request that
+    produced it; they are stored in the same transaction.
+    """
+    with transaction(immediate=True):
+        ids = save_translations_bulk(rows)
+        for translation_id, row_spans in zip(ids, spans or []):
+            if row_spans:
+                save_translation_spans(translation_id, row_spans)
+    return ids
+
+@instrumented("basic_translate")
+@call_site("basic_translate")
+def _basic_translate_segment(llm, text, source_desc, target_lang, feedback=None, neighbors=None,
+                             on_partial=None):
+    """Translate one segment with the basic prompt, streaming it to on_partial if given"""
+    # Build prompt with clear instructions
+    prompt = f"""You are a professional translator. Translate the following text from {source_desc} to {target_lang}.
 
 Source Text:
 {text}
-
+{neighbor_prompt(neighbors)}
 Instructions:
 1. Return ONLY the translated text
 2. Do not include any additional explanations
@@ -57,26 +66,48 @@ Instructions:
 
 {target_lang} translation:"""
 
-        if feedback:
-            prompt += "\n\nUser Feedback:\n"
-            if feedback.get("issues"):
-                prompt += f"- Please improve these aspects: {', '.join(feedback['issues'])}\n"
-            if feedback.get("custom"):
-                prompt += f"- Specific instructions: {feedback['custom']}\n"
-        
+    if feedback:
+        prompt += "\n\nUser Feedback:\n"
+        if feedback.get("issues"):
+            prompt += f"- Please improve these aspects: {', '.join(feedback['issues'])}\n"
+        if feedback.get("custom"):
+            prompt += f"- Specific instructions: {feedback['custom']}\n"
+    
+    if on_partial is not None:
+        translation = stream_chat(llm, prompt, on_partial)
+    else:
         response = llm.invoke(prompt)
         
         if not response or not hasattr(response, 'content'):
             raise ValueError("Invalid response from language model")
             
         translation = response.content.strip()
-        if not translation:
-            raise ValueError("Empty translation received")
-            
+    if not translation:
+        raise ValueError("Empty translation received")
+    return translation
+
+def basic_translate(text, source_lang, target_lang, feedback=None, on_partial=None):
+    try:
+        llm = get_llm()
+        
+        if source_lang == "Auto":
+            source_desc = "the detected source language"
+        else:
+            source_desc = source_lang
+        
+        # Long documents are translated segment by segment, concurrently
+        segments = segment_text(text, source_lang)
+        translations = translate_segments(
+            segments,
+            lambda segment, neighbors, **stream: _basic_translate_segment(
+                llm, segment, source_desc, target_lang, feedback, neighbors, **stream),
+            on_partial=on_partial
+        )
+        
         return {
-            'translation': translation,
+            'translation': join_segments(segments, translations),
             'context': "Basic Mode Translation",
-            'metadata': {"mode": "basic"}
+            'metadata': {"mode": "basic", "segments": len(segments)}
         }
     except Exception as e:
         error_msg = f"Translation error: {str(e)}"
@@ -87,6 +118,8 @@ Instructions:
             'metadata': {"mode": "basic"}
         }
 
+@instrumented("advanced_translate")
+@call_site("advanced_translate")
 def advanced_translate(text, source_lang, target_lang, metadata, feedback=None):
     llm = get_llm()
     
@@ -124,7 +157,8 @@ def advanced_translate(text, source_lang, target_lang, metadata, feedback=None):
         'metadata': metadata
     }
 
-def agentic_translate(text, source_lang, target_lang, metadata, framework, intensity=3, feedback=None):
+def agentic_translate(text, source_lang, target_lang, metadata, framework, intensity=3, feedback=None,
+                      on_partial=None):
     if source_lang == "Auto":
         source_lang = "Auto"
     
@@ -133,10 +167,11 @@ def agentic_translate(text, source_lang, target_lang, metadata, framework, inten
     
     try:
         if "LangGraph" in framework:
-            return run_state_graph(text, metadata, source_lang, target_lang, intensity)
+            return run_state_graph(text, metadata, source_lang, target_lang, intensity, on_partial)
         else:  # CrewAI
             from core.crewai_orchestrator import run_crewai_translation
-            translation = run_crewai_translation(text, source_lang, target_lang, metadata, intensity, feedback)
+            translation = run_crewai_translation(text, source_lang, target_lang, metadata, intensity, feedback,
+                                                 on_partial)
             
             # Validate translation result
             if not isinstance(translation, dict) or 'translation' not in translation:
@@ -162,42 +197,65 @@ def agentic_translate(text, source_lang, target_lang, metadata, framework, inten
 
 # In your translation_service.py, modify the translate_text function:
 
-def translate_text(text, source_lang, target_lang, metadata, mode="basic", framework="LangGraph", intensity=3, feedback=None):
+def _run_translation(text, source_lang, target_lang, metadata, mode, framework, intensity, feedback,
+                     on_partial=None):
+    """Dispatch to the selected mode; returns (result, mode label)"""
+    if mode == "basic":
+        result = basic_translate(text, source_lang, target_lang, feedback, on_partial)
+        mode_str = "Basic Mode"
+    elif mode == "advanced":
+        result = advanced_translate(text, source_lang, target_lang, metadata, feedback)
+        mode_str = "Advanced Mode"
+    elif mode == "agentic":
+        if "LangGraph" in framework:
+            result = agentic_translate(text, source_lang, target_lang, metadata, framework, intensity, feedback,
+                                       on_partial)
+            mode_str = f"Agentic Mode ({framework})"
+        else:
+            result = run_crewai_translation(text, source_lang, target_lang, metadata, intensity, feedback,
+                                            on_partial)
+            mode_str = f"Agentic Mode (CrewAI)"
+    elif mode == "expert":
+        from services.expert_translation import translate_text as expert_translate
+        result = expert_translate(text, source_lang, target_lang, metadata, mode, framework, intensity, feedback)
+        mode_str = f"Expert Mode ({framework})"
+    return result, mode_str
+
+# Identical requests that are in flight at the same time share one run
+_single_flight = SingleFlight()
+
+def translate_text(text, source_lang, target_lang, metadata, mode="basic", framework="LangGraph", intensity=3, feedback=None,
+                   on_partial=None):
+    """Translate with the selected mode; on_partial receives the streamed text so far"""
     try:
-        if mode == "basic":
-            result = basic_translate(text, source_lang, target_lang, feedback)
-            mode_str = "Basic Mode"
-        elif mode == "advanced":
-            result = advanced_translate(text, source_lang, target_lang, metadata, feedback)
-            mode_str = "Advanced Mode"
-        elif mode == "agentic":
-            if "LangGraph" in framework:
-                result = agentic_translate(text, source_lang, target_lang, metadata, framework, intensity, feedback)
-                mode_str = f"Agentic Mode ({framework})"
+        # Streaming callers only join a run that streams to them too
+        key = request_key(text, source_lang, target_lang, mode, framework, intensity, metadata, feedback,
+                          on_partial is not None)
+        with trace_request(pipeline_label(mode, framework)) as trace:
+            args = (text, source_lang, target_lang, metadata, mode, framework, intensity, feedback)
+            if feedback or not current_call_site()[1]:
+                # Feedback retranslations and cache opt-outs want a fresh run of their own
+                result, mode_str = _run_translation(*args, on_partial=on_partial)
             else:
-                result = run_crewai_translation(text, source_lang, target_lang, metadata, intensity, feedback)
-                mode_str = f"Agentic Mode (CrewAI)"
-        elif mode == "expert":
-            result = expert_translate(text, source_lang, target_lang, metadata, framework, intensity, feedback)
-            mode_str = f"Expert Mode ({framework})"
+                result, mode_str = shared_run(_single_flight, key, _run_translation, *args,
+                                              on_partial=on_partial)
         
         # Save to database if in Streamlit context
         try:
-            if hasattr(st, 'session_state') and st.session_state.project and st.session_state.project.get("id"):
-                from core.database import save_translation
-                version = len(get_translation_history(st.session_state.project["id"])) + 1
-                save_translation(
-                    project_id=st.session_state.project["id"],
-                    source_text=text,
-                    source_lang=source_lang,
-                    target_lang=target_lang,
-                    translation=result['translation'],
-                    metadata=result.get('metadata', metadata),
-                    framework=framework,
-                    mode=mode_str,
-                    intensity=intensity,
-                    version=version
-                )
+            project = session_value("project")
+            if project and project.get("id"):
+                # Version is assigned inside the insert transaction
+                persist_translations([{
+                    "project_id": project["id"],
+                    "source_text": text,
+                    "source_lang": source_lang,
+                    "target_lang": target_lang,
+                    "translation": result['translation'],
+                    "metadata": result.get('metadata', metadata),
+                    "framework": framework,
+                    "mode": mode_str,
+                    "intensity": intensity
+                }], spans=[trace.span_dicts()])
         except Exception as db_error:
             logging.error(f"Database save failed: {str(db_error)}")
         
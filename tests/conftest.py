@@ -0,0 +1,21 @@
+# conftest.py
+"""Shared test setup: offline fake LLM clients and a throwaway database."""
+import os
+import tempfile
+
+# Set before any project module is imported: core.database opens DB_PATH on import
+os.environ["TRANSCENDAI_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="transcend_test_"), "test.db")
+os.environ["TRANSCEND_FAKE_LLM"] = "1"
+os.environ["LLM_CACHE"] = "0"
+
+import pytest  # noqa: E402
+
+from core import database  # noqa: E402
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """An empty database for one test"""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "test.db"))
+    database.init_db()
+    yield database
+    database.close_connection()
@@ -0,0 +1,3 @@
+-- MySQL dump of enwiki langlinks (trimmed)
+INSERT INTO `langlinks` VALUES (10,'ta','பயன்பாட்டு நிரலாக்க இடைமுகம்'),(10,'fr','Interface de programmation'),(12,'ta','கெப்லரின் கோள் இயக்க விதிகள்'),(12,'de','Keplersche Gesetze'),(13,'ta','விக்கிப்பீடியா:பற்றி'),(14,'ta','சி:\\விண்டோசு (பாதை)'),(99,'ta','இல்லாத பக்கம்'),(15,'es','');
+INSERT INTO `langlinks` VALUES (15,'TA ','இயந்திரக் கற்றல்'),(15,'fr','Apprentissage \"automatique\"');
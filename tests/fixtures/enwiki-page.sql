@@ -0,0 +1,4 @@
+-- MySQL dump of enwiki page (trimmed)
+DROP TABLE IF EXISTS `page`;
+INSERT INTO `page` VALUES (10,0,'Application_programming_interface',0,0,0.5,'20240101000000',NULL,1,100,'wikitext',NULL),(12,0,'Kepler\'s_laws_of_planetary_motion',0,0,0.2,'20240101000000',NULL,2,200,'wikitext',NULL),(13,4,'Wikipedia:About',0,0,0.1,'20240101000000',NULL,3,300,'wikitext',NULL);
+INSERT INTO `page` VALUES (14,0,'C:\\Windows_(path)',0,0,0.3,'20240101000000',NULL,4,400,'wikitext',NULL),(15,0,'Machine_learning',0,0,0.4,'20240101000000',NULL,5,500,'wikitext',NULL);
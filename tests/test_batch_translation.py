@@ -0,0 +1,88 @@
+# test_batch_translation.py
+import json
+
+import pytest
+
+from services import batch_translation
+
+DEFAULTS = {"source_lang": "English", "target_lang": "Tamil", "mode": "basic", "framework": "LangGraph",
+            "intensity": 1, "metadata": {}, "feedback": None}
+
+@pytest.fixture
+def records(tmp_path):
+    path = tmp_path / "input.jsonl"
+    path.write_text("".join(json.dumps({"id": f"r{i}", "text": f"Record number {i} is ready."}) + "\n"
+                            for i in range(5)), encoding="utf-8")
+    return str(path)
+
+def checkpointed(tmp_path):
+    return (tmp_path / "out.jsonl.checkpoint").read_text(encoding="utf-8").split()
+
+def output_ids(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+def test_ids_are_checkpointed_only_after_their_results_are_saved(fresh_db, records, tmp_path, monkeypatch):
+    project = fresh_db.create_project("batch")
+    saved = []
+    def save_results(results, project_id):
+        if saved:
+            raise RuntimeError("disk full")
+        saved.extend(r["id"] for r in results)
+    monkeypatch.setattr(batch_translation, "save_results", save_results)
+
+    with pytest.raises(RuntimeError):
+        batch_translation.run_batch(records, str(tmp_path / "out.jsonl"), DEFAULTS, workers=1,
+                                    project_id=project, save_every=2)
+    assert len(saved) == 2
+    assert checkpointed(tmp_path) == saved
+    assert output_ids(tmp_path / "out.jsonl") == saved
+
+    monkeypatch.undo()
+    batch_translation.run_batch(records, str(tmp_path / "out.jsonl"), DEFAULTS, workers=1,
+                                project_id=project, save_every=2)
+    assert sorted(output_ids(tmp_path / "out.jsonl")) == [f"r{i}" for i in range(5)]
+
+def test_resume_saves_each_record_once(fresh_db, records, tmp_path):
+    project = fresh_db.create_project("batch")
+    output = str(tmp_path / "out.jsonl")
+    stats = batch_translation.run_batch(records, output, DEFAULTS, workers=2, project_id=project, save_every=2)
+    assert stats["succeeded"] == 5
+    assert batch_translation.run_batch(records, output, DEFAULTS, workers=2, project_id=project)["skipped"] == 5
+    assert sorted(checkpointed(tmp_path)) == [f"r{i}" for i in range(5)]
+    assert len(fresh_db.get_translation_history(project)) == 5
+
+def test_results_are_saved_with_one_bulk_insert_per_batch(fresh_db, records, tmp_path, monkeypatch):
+    from services import translation_service
+    project = fresh_db.create_project("batch")
+    batches = []
+    def save_translations_bulk(rows):
+        batches.append(len(rows))
+        return fresh_db.save_translations_bulk(rows)
+    monkeypatch.setattr(translation_service, "save_translations_bulk", save_translations_bulk)
+
+    batch_translation.run_batch(records, str(tmp_path / "out.jsonl"), DEFAULTS, workers=2,
+                                project_id=project, save_every=3)
+    assert batches == [3, 2]
+    history = fresh_db.get_translation_history(project)
+    assert sorted(row[9] for row in history) == [1, 2, 3, 4, 5]
+    # Every saved row has its spans
+    for row in history:
+        spans = fresh_db.get_translation_spans(row[0])
+        assert spans and spans[0]["node"] == "request"
+
+def test_failed_records_go_to_the_errors_file_and_are_retried(records, tmp_path, monkeypatch):
+    translate_record = batch_translation.translate_record
+    def flaky(record, defaults):
+        if record["id"] == "r1":
+            return {**translate_record(record, defaults), "translation": None, "error": "RuntimeError: down"}
+        return translate_record(record, defaults)
+    monkeypatch.setattr(batch_translation, "translate_record", flaky)
+    output = str(tmp_path / "out.jsonl")
+    for _ in range(2):
+        batch_translation.run_batch(records, output, DEFAULTS, workers=2)
+    assert output_ids(tmp_path / "out.jsonl.errors") == ["r1", "r1"]
+
+    monkeypatch.undo()
+    assert batch_translation.run_batch(records, output, DEFAULTS, workers=2)["succeeded"] == 1
+    assert sorted(output_ids(output)) == [f"r{i}" for i in range(5)]
@@ -0,0 +1,11 @@
+# test_budget.py
+from core import budget
+from core.budget import RequestBudget
+
+def test_budget_scales_calls_per_segment_and_time_per_round(monkeypatch):
+    monkeypatch.setattr(budget, "SEGMENT_WORKERS", 4)
+    single, long = RequestBudget.for_request(1), RequestBudget.for_request(9)
+    assert long.max_calls == 9 * single.max_calls
+    assert long.max_tokens == 9 * single.max_tokens
+    # Nine segments run four at a time take three rounds
+    assert long.seconds == 3 * single.seconds
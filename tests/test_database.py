@@ -0,0 +1,34 @@
+# test_database.py
+import pytest
+
+def row(project_id, text, **extra):
+    return {"project_id": project_id, "source_text": text, "source_lang": "English",
+            "target_lang": "Tamil", "translation": text.upper(), "metadata": {"domain": "General"},
+            "framework": "", "mode": "basic", "intensity": 1, **extra}
+
+def translations(db):
+    return db.get_connection().execute(
+        "SELECT id, project_id, version, parent_id FROM translations ORDER BY id").fetchall()
+
+def test_bulk_insert_returns_the_ids_sqlite_assigned(fresh_db):
+    project = fresh_db.create_project("p")
+    first = fresh_db.save_translation(**row(project, "deleted"))
+    fresh_db.get_connection().execute("DELETE FROM translations WHERE id = ?", (first,))
+    fresh_db.get_connection().commit()
+
+    ids = fresh_db.save_translations_bulk([row(project, "a"), row(project, "b", parent_index=0)])
+    assert ids[0] > first
+    assert [tuple(r) for r in translations(fresh_db)] == [(ids[0], project, 1, None),
+                                                          (ids[1], project, 2, ids[0])]
+
+def test_bulk_insert_numbers_versions_per_project(fresh_db):
+    first, second = fresh_db.create_project("a"), fresh_db.create_project("b")
+    fresh_db.save_translations_bulk([row(first, "x"), row(second, "y"), row(first, "z"),
+                                     row(second, "w", version=7)])
+    assert [(r[1], r[2]) for r in translations(fresh_db)] == [(first, 1), (second, 1), (first, 2), (second, 7)]
+
+def test_bulk_insert_rejects_forward_parent_links(fresh_db):
+    project = fresh_db.create_project("p")
+    with pytest.raises(ValueError):
+        fresh_db.save_translations_bulk([row(project, "a", parent_index=0)])
+    assert translations(fresh_db) == []
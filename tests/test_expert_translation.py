@@ -0,0 +1,65 @@
+# test_expert_translation.py
+import pytest
+
+from core.instrumentation import trace_request
+from services.expert_translation import ExpertTranslationService
+
+METADATA = {"domain": "General", "tone": "Neutral", "region": "Global",
+            "audience": "Adults", "purpose": "General"}
+SENTENCE = "Please send the signed contract back by Friday. The invoice is attached to this message. "
+
+@pytest.fixture
+def service(fresh_db):
+    return ExpertTranslationService()
+
+@pytest.mark.parametrize("text", [SENTENCE, SENTENCE * 30], ids=["single", "segmented"])
+def test_every_llm_call_feeds_the_translation(service, text):
+    with trace_request("expert") as trace:
+        result = service.translate_text(text, "English", "Tamil", METADATA, "expert", "LangGraph", 3,
+                                        use_memory=False)
+    nodes = trace.summary()["nodes"]
+    assert result["translation"]
+    assert "translate_with_retry" not in nodes
+    # One call per segment for translate and coherence, one per document for the rest
+    segments = nodes["translate"]["runs"]
+    assert nodes["translate"]["calls"] == nodes["coherence"]["calls"] == segments
+    assert trace.summary()["calls"] == 2 * segments + nodes["terminology"]["calls"] + 1
+
+class ScriptedLLM:
+    """Chat model stand-in answering with the given replies in turn"""
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return type("Reply", (), {"content": self.replies.pop(0)})()
+
+def test_wrong_language_is_retried_and_the_last_answer_kept(service):
+    service.llm = ScriptedLLM("Hello there", "Hello again", "Still English")
+    assert service.translate_with_context("Hello", "English", "Tamil", METADATA) == "Still English"
+    # Language mismatches are caught by script detection, without a sense-check call
+    assert len(service.llm.prompts) == 3
+
+def test_only_language_mismatches_are_rejected(service):
+    service.llm = ScriptedLLM("Hello there", "வணக்கம் நண்பரே", "NO")
+    assert service.translate_with_context("Hello", "English", "Tamil", METADATA) == "வணக்கம் நண்பரே"
+    assert len(service.llm.prompts) == 3
+
+@pytest.mark.parametrize("framework", ["LangGraph", "CrewAI"])
+@pytest.mark.parametrize("text", [SENTENCE, SENTENCE * 30], ids=["single", "segmented"])
+def test_every_llm_call_is_charged_to_the_budget(service, framework, text):
+    with trace_request("expert") as trace:
+        result = service.translate_text(text, "English", "Tamil", METADATA, "expert", framework, 3,
+                                        use_memory=False)
+    assert result["context"]["budget"]["calls"] == trace.summary()["calls"]
+
+def test_expert_graphs_are_cached_per_agent_set(service):
+    agents = ("coherence_checker", "terminology_specialist")
+    graph = service.get_expert_graph(agents)
+    assert service.get_expert_graph(tuple(reversed(agents))) is graph
+    assert service.get_expert_graph(agents, segmented=True) is not graph
+    for intensity in (1, 4):
+        service.translate_text(SENTENCE, "English", "Tamil", METADATA, "expert", "LangGraph", intensity,
+                               use_memory=False)
+    assert len(service._graph_cache) == 3
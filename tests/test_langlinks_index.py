@@ -0,0 +1,73 @@
+# test_langlinks_index.py
+import gzip
+import os
+import shutil
+
+import pytest
+
+from services.langlinks_index import LanglinksIndex, _sql_rows, build_index, normalize_title
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def fixture(name):
+    return os.path.join(FIXTURES, name)
+
+@pytest.fixture
+def sql_index(tmp_path):
+    path = str(tmp_path / "langlinks.db")
+    counts = build_index(fixture("enwiki-langlinks.sql"), path, fixture("enwiki-page.sql"))
+    return counts, LanglinksIndex(path)
+
+def test_sql_rows_unescape_quotes_backslashes_and_nulls():
+    rows = list(_sql_rows(fixture("enwiki-page.sql"), "page"))
+    assert [row[:3] for row in rows] == [
+        ["10", "0", "Application_programming_interface"],
+        ["12", "0", "Kepler's_laws_of_planetary_motion"],
+        ["13", "4", "Wikipedia:About"],
+        ["14", "0", "C:\\Windows_(path)"],
+        ["15", "0", "Machine_learning"],
+    ]
+    assert rows[0][7] is None
+    links = list(_sql_rows(fixture("enwiki-langlinks.sql"), "langlinks"))
+    assert ["15", "fr", 'Apprentissage "automatique"'] in links
+
+def test_sql_dumps_join_langlinks_to_main_namespace_pages(sql_index):
+    counts, index = sql_index
+    # Page 13 is outside the main namespace, page 99 is missing and 15/es has no title
+    assert counts == {"pages": 4, "langlinks": 7}
+    assert index.lookup("Kepler's laws of planetary motion", "de") == "Keplersche Gesetze"
+    assert index.lookup("C:\\Windows (path)", "ta") == "சி:\\விண்டோசு (பாதை)"
+    assert index.lookup("Wikipedia:About", "ta") is None
+    assert index.languages("Machine learning") == {"ta": "இயந்திரக் கற்றல்",
+                                                    "fr": 'Apprentissage "automatique"'}
+
+def test_lookup_normalizes_titles(sql_index):
+    _, index = sql_index
+    assert index.lookup("application_programming_interface", "TA") == "பயன்பாட்டு நிரலாக்க இடைமுகம்"
+    assert index.lookup("  APPLICATION   programming interface ", "fr") == "Interface de programmation"
+    assert index.lookup("Application programming interface", "de") is None
+
+def test_tsv_dump_merges_titles_that_display_the_same(tmp_path):
+    path = str(tmp_path / "langlinks.db")
+    assert build_index(fixture("langlinks.tsv"), path) == {"pages": 3, "langlinks": 4}
+    index = LanglinksIndex(path)
+    assert index.languages("Machine learning") == {"ta": "இயந்திரக் கற்றல்",
+                                                    "fr": "Apprentissage automatique"}
+    # A differently cased title is its own page, but the first one owns the normalized form
+    assert index.lookup("MACHINE LEARNING", "de") == "Maschinelles Lernen"
+    assert index.lookup("machine LEARNING", "fr") == "Apprentissage automatique"
+    assert index.lookup("Queue (abstract data type)", "ta") == "வரிசை"
+
+def test_gzipped_dumps_and_normalize_title(tmp_path):
+    for name in ("enwiki-page.sql", "enwiki-langlinks.sql"):
+        with open(fixture(name), "rb") as src, gzip.open(tmp_path / f"{name}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    path = str(tmp_path / "langlinks.db")
+    counts = build_index(str(tmp_path / "enwiki-langlinks.sql.gz"), path, str(tmp_path / "enwiki-page.sql.gz"))
+    assert counts == {"pages": 4, "langlinks": 7}
+    assert not os.path.exists(path + ".tmp")
+    assert normalize_title("Cafe\u0301_Au  Lait") == "café au lait"
+
+def test_sql_dump_without_pages_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        build_index(fixture("enwiki-langlinks.sql"), str(tmp_path / "x.db"))
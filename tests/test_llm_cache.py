@@ -0,0 +1,19 @@
+# test_llm_cache.py
+from core.llm_cache import DiskBackend
+
+def test_overwrites_count_only_the_size_difference(tmp_path):
+    backend = DiskBackend(str(tmp_path / "cache.db"), max_bytes=1000)
+    for _ in range(20):
+        backend.put("same", "x" * 100)
+    backend.put("same", "x" * 60)
+    backend.put("other", "y" * 100)
+    assert backend._bytes == backend.info()["bytes"] == 160
+    assert backend.get("same") == "x" * 60
+
+def test_eviction_keeps_recently_used_entries(tmp_path):
+    backend = DiskBackend(str(tmp_path / "cache.db"), max_bytes=500)
+    for i in range(6):
+        backend.put(f"k{i}", "z" * 100)
+    assert backend.get("k0") is None
+    assert backend.get("k5") == "z" * 100
+    assert backend._bytes == backend.info()["bytes"] <= 500
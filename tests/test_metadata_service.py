@@ -0,0 +1,36 @@
+# test_metadata_service.py
+import pytest
+
+from services.metadata_service import extract_metadata_basic, extract_metadata_basic_batch
+
+@pytest.mark.parametrize("text, field, expected", [
+    ("The sky grew paler", "tone", "Neutral"),
+    ("She paled at the news", "tone", "Neutral"),
+    ("The rules were gamed", "domain", "General"),
+    ("Is this the right way?", "tone", "Neutral"),
+    ("The committee stayed neutral", "region", "Global"),
+])
+def test_keywords_do_not_match_inside_other_words(text, field, expected):
+    assert extract_metadata_basic(text)[field] == expected
+
+@pytest.mark.parametrize("text, field, expected", [
+    ("Both contracts were signed", "domain", "Legal"),
+    ("Machine learning at scale", "domain", "Education"),
+    ("Shipped across the United  States", "region", "North America"),
+    ("Hi, how are you?", "tone", "Informal"),
+])
+def test_listed_keyword_forms_are_matched(text, field, expected):
+    assert extract_metadata_basic(text)[field] == expected
+
+def test_batch_matches_per_document_results():
+    texts = [
+        "Our movies reach the united",
+        "states and Canada",
+        "",
+        None,
+        "Hey dude, the hospital research team is hoping for the future",
+        "word " * 150,
+    ]
+    assert extract_metadata_basic_batch(texts) == [extract_metadata_basic(t) for t in texts]
+    # A phrase split across two documents belongs to neither
+    assert extract_metadata_basic_batch(texts)[0]["region"] == "Global"
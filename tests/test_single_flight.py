@@ -0,0 +1,128 @@
+# test_single_flight.py
+import threading
+
+import pytest
+
+from core.instrumentation import span, trace_request
+from core.llm_cache import call_site
+from services import translation_service
+from utils.single_flight import SingleFlight
+
+class Rerun(BaseException):
+    """Stands in for Streamlit's StopException/RerunException"""
+
+def start_follower(flight, key, fn, results, **kwargs):
+    """Run flight.run in a thread once the leader holds key"""
+    def follow():
+        try:
+            results.append(flight.run(key, fn, **kwargs))
+        except Exception as e:
+            results.append(e)
+    thread = threading.Thread(target=follow)
+    thread.start()
+    return thread
+
+def wait_for_follower(flight):
+    while flight.get_stats()["coalesced"] == 0:
+        threading.Event().wait(0.01)
+
+def test_followers_receive_partials_in_their_own_thread():
+    flight, results, seen = SingleFlight(), [], []
+    follower_partials = []
+    def on_follower_partial(text):
+        follower_partials.append((text, threading.current_thread().name))
+    def fn(on_partial):
+        on_partial("a")
+        fn.thread = start_follower(flight, "k", fn, results, on_partial=on_follower_partial)
+        wait_for_follower(flight)
+        # A follower joining late first catches up on the text so far
+        while not follower_partials:
+            threading.Event().wait(0.01)
+        on_partial("ab")
+        return "abc"
+
+    assert flight.run("k", fn, on_partial=seen.append) == ("abc", False)
+    fn.thread.join()
+    assert seen == ["a", "ab"]
+    assert results == [("abc", True)]
+    assert follower_partials[0] == ("a", fn.thread.name)
+    assert {name for _, name in follower_partials} == {fn.thread.name}
+
+def test_interrupted_leader_lets_the_follower_run_again():
+    flight, results = SingleFlight(), []
+    runs = []
+    def fn():
+        runs.append(threading.current_thread().name)
+        if len(runs) == 1:
+            thread = start_follower(flight, "k", fn, results)
+            wait_for_follower(flight)
+            fn.thread = thread
+            raise Rerun()
+        return "fresh"
+
+    with pytest.raises(Rerun):
+        flight.do("k", fn)
+    fn.thread.join()
+    assert results == [("fresh", False)]
+    assert len(runs) == 2
+
+def test_failures_are_shared_with_followers():
+    flight, results = SingleFlight(), []
+    def fn():
+        fn.thread = start_follower(flight, "k", fn, results)
+        wait_for_follower(flight)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fn)
+    fn.thread.join()
+    assert isinstance(results[0], ValueError)
+
+@pytest.fixture
+def blocking_run(monkeypatch):
+    """_run_translation that blocks until released, counting runs"""
+    runs, release = [], threading.Event()
+    def run(text, *args, on_partial=None):
+        runs.append(text)
+        with span("basic_translate"):
+            release.wait(5)
+        return {"translation": text.upper(), "context": None, "metadata": {}}, "Basic Mode"
+    monkeypatch.setattr(translation_service, "_run_translation", run)
+    return runs, release
+
+def translate_in_thread(results, **kwargs):
+    def target():
+        with trace_request("basic") as trace:
+            result = translation_service.translate_text("hello", "English", "Tamil", {}, **kwargs)
+        results.append((result, trace))
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+def test_follower_trace_holds_the_leaders_spans(blocking_run):
+    runs, release = blocking_run
+    results = []
+    threads = [translate_in_thread(results)]
+    while not runs:
+        threading.Event().wait(0.01)
+    threads.append(translate_in_thread(results))
+    wait_for_follower(translation_service._single_flight)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(runs) == 1
+    assert [result["translation"] for result, _ in results] == ["HELLO", "HELLO"]
+    nodes = [[(span["name"], span["outcome"]) for span in trace.span_dicts()] for _, trace in results]
+    assert ("basic_translate", "ok") in nodes[0]
+    assert ("basic_translate", "coalesced") in nodes[1]
+
+def test_feedback_and_cache_opt_out_are_not_coalesced(blocking_run, monkeypatch):
+    runs, release = blocking_run
+    release.set()
+    monkeypatch.setattr(translation_service, "_single_flight", SingleFlight())
+    translation_service.translate_text("hello", "English", "Tamil", {}, feedback={"issues": ["tone"]})
+    with call_site("retry", cache=False):
+        translation_service.translate_text("hello", "English", "Tamil", {})
+    assert len(runs) == 2
+    assert translation_service._single_flight.get_stats()["executed"] == 0
@@ -0,0 +1,33 @@
+# test_term_lookup.py
+import time
+
+import pytest
+
+from services import expert_translation
+from services.expert_translation import ExpertTranslationService, backend_slot
+
+@pytest.fixture
+def service(monkeypatch):
+    service = ExpertTranslationService()
+    def resolve_term(term, target_lang, use_wikipedia=True, budget=None):
+        if term == "slow":
+            time.sleep(0.5)
+        with backend_slot("translator"):
+            return term.upper()
+    monkeypatch.setattr(service, "resolve_term", resolve_term)
+    return service
+
+def test_slow_term_times_out_without_dropping_the_others(service):
+    start = time.monotonic()
+    translations, timed_out = service.resolve_terms(["fast", "slow", "quick"], "Tamil", timeout=0.2)
+    assert time.monotonic() - start < 0.45
+    assert translations == {"fast": "FAST", "quick": "QUICK"}
+    assert timed_out == ["slow"]
+
+def test_lookup_past_its_deadline_gives_up_its_backend_slot(service, monkeypatch):
+    monkeypatch.setitem(expert_translation.BACKEND_LIMITS, "translator",
+                        expert_translation.threading.BoundedSemaphore(1))
+    with backend_slot("translator"):
+        translations, timed_out = service.resolve_terms(["fast"], "Tamil", timeout=0.1)
+    assert translations == {}
+    assert timed_out == ["fast"]
@@ -0,0 +1,99 @@
+# test_translation_memory.py
+import pytest
+
+from core.llm_cache import call_site
+from services.translation_memory import TranslationMemory, is_reusable, numbers_match
+
+TEXT = ("The quarterly report covers warehouse capacity, transport schedules and staffing "
+        "for the regional logistics teams over the coming months.")
+
+@pytest.fixture
+def memory(fresh_db):
+    return TranslationMemory()
+
+@pytest.fixture
+def service(memory):
+    from services.expert_translation import ExpertTranslationService
+    service = ExpertTranslationService()
+    service.translation_memory = memory
+    return service
+
+def test_fuzzy_matches_stay_within_mode(memory):
+    memory.put(TEXT, "English", "Tamil", "old", mode="basic", metadata={"domain": "General"})
+    assert memory.find_similar(TEXT + " ", "English", "Tamil", mode="basic", metadata={"domain": "General"})
+    assert not memory.find_similar(TEXT, "English", "Tamil", mode="expert/LangGraph/3",
+                                   metadata={"domain": "General"})
+
+def test_fuzzy_matches_stay_within_metadata_and_feedback(memory):
+    memory.put(TEXT, "English", "Tamil", "old", mode="basic",
+               metadata={"domain": "General", "user_feedback": None})
+    assert not memory.find_similar(TEXT, "English", "Tamil", mode="basic",
+                                   metadata={"domain": "Legal", "user_feedback": None})
+    assert not memory.find_similar(TEXT, "English", "Tamil", mode="basic",
+                                   metadata={"domain": "General", "user_feedback": {"issues": ["tone"]}})
+
+def test_fuzzy_index_rebuilt_from_database_keeps_contexts(fresh_db):
+    TranslationMemory().put(TEXT, "English", "Tamil", "old", mode="basic")
+    rebuilt = TranslationMemory()
+    assert rebuilt.find_similar(TEXT, "English", "Tamil", mode="basic")
+    assert not rebuilt.find_similar(TEXT, "English", "Tamil", mode="advanced")
+
+def test_numbers_must_match_for_reuse():
+    text = TEXT * 4 + " Deliver 120 units."
+    changed = TEXT * 4 + " Deliver 150 units."
+    match = {"source_text": changed, "translation": "old", "score": 0.99}
+    assert not numbers_match(text, changed)
+    assert not is_reusable(match, text)
+    assert is_reusable({**match, "source_text": text}, text)
+
+def test_near_identical_request_reuses_fuzzy_match(service):
+    service.translate_text(TEXT, "English", "Tamil", {"domain": "General"}, "expert", "LangGraph", 3)
+    result = service.translate_text(TEXT + "  ", "English", "Tamil", {"domain": "General"},
+                                    "expert", "LangGraph", 3)
+    assert result["context"]["source"] in ("translation_memory", "translation_memory_fuzzy")
+
+def _remember_fuzzy(service, feedback=None):
+    """Store a translation of TEXT that a request for TEXT + "!" matches fuzzily"""
+    metadata = {"domain": "General", "user_feedback": feedback}
+    service.translation_memory.put(TEXT, "English", "Tamil", "remembered", "expert/LangGraph/3", metadata)
+    matches = service.find_fuzzy_matches(TEXT + "!", "English", "Tamil", limit=1,
+                                         mode="expert/LangGraph/3", metadata=metadata)
+    assert matches and is_reusable(matches[0], TEXT + "!")
+
+def test_feedback_skips_fuzzy_reuse(service):
+    feedback = {"issues": ["Tone"], "custom": "More formal"}
+    _remember_fuzzy(service, feedback)
+    result = service.translate_text(TEXT + "!", "English", "Tamil", {"domain": "General"},
+                                    "expert", "LangGraph", 3, feedback)
+    assert result["translation"] != "remembered"
+    assert result["context"].get("source") != "translation_memory_fuzzy"
+
+def test_cache_opt_out_skips_memory(service):
+    _remember_fuzzy(service)
+    with call_site("retranslate", cache=False):
+        result = service.translate_text(TEXT + "!", "English", "Tamil", {"domain": "General"},
+                                        "expert", "LangGraph", 3)
+    assert result["translation"] != "remembered"
+    with call_site("retranslate", cache=False):
+        exact = service.translate_text(TEXT, "English", "Tamil", {"domain": "General"},
+                                       "expert", "LangGraph", 3)
+    assert exact["translation"] != "remembered"
+
+def test_basic_and_expert_results_are_not_shared(service):
+    service.translation_memory.put(TEXT, "English", "Tamil", "remembered", "basic",
+                                   {"domain": "General", "user_feedback": None})
+    result = service.translate_text(TEXT + "!", "English", "Tamil", {"domain": "General"},
+                                    "expert", "LangGraph", 3)
+    assert result["translation"] != "remembered"
+
+@pytest.mark.parametrize("framework, text", [("CrewAI", TEXT), ("LangGraph", TEXT * 20)],
+                         ids=["crewai", "segmented"])
+def test_fuzzy_search_only_runs_when_its_match_can_be_used(service, monkeypatch, framework, text):
+    searches = []
+    monkeypatch.setattr(service, "find_fuzzy_matches", lambda *args, **kwargs: searches.append(args) or [])
+    # With feedback there is no outright reuse, and these paths take no reference
+    service.translate_text(text, "English", "Tamil", {"domain": "General"}, "expert", framework, 3,
+                           {"issues": ["Tone"]})
+    assert searches == []
+    service.translate_text(text, "English", "Tamil", {"domain": "General"}, "expert", framework, 3)
+    assert len(searches) == 1
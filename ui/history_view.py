@@ -1,8 +1,12 @@
 # history_view.py
 import streamlit as st
-from core.database import get_translation_history, delete_translation
+from core.database import (get_translation_history, get_translation_history_page,
+                           get_translation_texts, delete_translation)
 from datetime import datetime
 import json
+import time
+
+HISTORY_PAGE_SIZE = 20
 
 def format_history(history):
     """Format history entries for display"""
@@ -26,11 +30,18 @@ def format_history(history):
 def render_history_view(project):
     st.title(f"📜 Translation History - {project['name']}")
     
-    # Get history from database
-    history = get_translation_history(project["id"])
-    formatted_history = format_history(history)
+    # Keyset pagination: a stack of before_id cursors, newest page first
+    cursor_key = f"history_cursors_{project['id']}"
+    if cursor_key not in st.session_state:
+        st.session_state[cursor_key] = [None]
+    cursors = st.session_state[cursor_key]
+    
+    # Get one page of history (without the large text columns)
+    entries, next_before_id = get_translation_history_page(
+        project["id"], before_id=cursors[-1], limit=HISTORY_PAGE_SIZE
+    )
     
-    if not formatted_history:
+    if not entries and len(cursors) == 1:
         st.info("No translation history yet. Start translating!")
         if st.button("Start Translating"):
             st.session_state.current_step = "translate"
@@ -38,7 +49,7 @@ def render_history_view(project):
         return
     
     # Download option
-    def get_history_text():
+    def get_history_text(formatted_history):
         text = f"Translation History for {project['name']}\n"
         text += "="*50 + "\n"
         for entry in formatted_history:
@@ -55,24 +66,38 @@ def render_history_view(project):
             text += "="*50 + "\n"
         return text
     
-    st.download_button(
-        label="📥 Download Full History",
-        data=get_history_text(),
-        file_name=f"{project['name']}_history.txt",
-        mime="text/plain"
-    )
+    # The full export reads every row, so only build it on request
+    if st.button("📄 Prepare Full History Download"):
+        st.session_state[f"history_export_{project['id']}"] = get_history_text(
+            format_history(get_translation_history(project["id"]))
+        )
+    export = st.session_state.get(f"history_export_{project['id']}")
+    if export:
+        st.download_button(
+            label="📥 Download Full History",
+            data=export,
+            file_name=f"{project['name']}_history.txt",
+            mime="text/plain"
+        )
     
     # Display history
     st.markdown("### Recent Translations")
-    for entry in formatted_history:
+    for entry in entries:
         with st.expander(f"Version {entry['version']} - {entry['mode']} - {entry['date']}"):
-            col1, col2 = st.columns([1, 1])
-            with col1:
-                st.markdown("**Source Text**")
-                st.text(entry["source_text"])
-            with col2:
-                st.markdown("**Translation**")
-                st.text(entry["translation"])
+            st.caption(f"From: {entry['source_lang']} → To: {entry['target_lang']}")
+            
+            # Full texts are fetched only for entries the user opens
+            if st.checkbox("Show full text", key=f"history_full_{entry['id']}"):
+                source_text, translation = get_translation_texts(entry["id"])
+                col1, col2 = st.columns([1, 1])
+                with col1:
+                    st.markdown("**Source Text**")
+                    st.text(source_text)
+                with col2:
+                    st.markdown("**Translation**")
+                    st.text(translation)
+            else:
+                st.text(entry["source_preview"])
             
             st.markdown(f"**Details:** {entry['framework']} | Intensity: {entry['intensity']}")
             
@@ -82,6 +107,17 @@ def render_history_view(project):
                 time.sleep(1)
                 st.rerun()
     
+    # Paging controls
+    col1, col2 = st.columns(2)
+    with col1:
+        if len(cursors) > 1 and st.button("← Newer"):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if next_before_id is not None and st.button("Older →"):
+            cursors.append(next_before_id)
+            st.rerun()
+    
     # Navigation buttons
     col1, col2 = st.columns(2)
     with col1:
@@ -4,6 +4,7 @@ import json
 from datetime import datetime
 from core.database import get_translation_history, save_translation
 from services.cultural_adaptation import cultural_adaptation_analysis
+from utils.script_profile import expected_script, language_matches
 
 def render_results_panel(project):
     # Format history for download
@@ -128,33 +129,10 @@ def render_results_panel(project):
         if not isinstance(translation, str):
             return False
             
-        target_lang = target_lang.lower()
-        translation = translation.lower()
-        
-        # Language-specific character checks
-        if "tamil" in target_lang:
-            # Tamil Unicode block: 0B80–0BFF
-            return not any('\u0B80' <= char <= '\u0BFF' for char in translation)
-        elif "hindi" in target_lang:
-            # Devanagari Unicode block: 0900–097F
-            return not any('\u0900' <= char <= '\u097F' for char in translation)
-        elif "russian" in target_lang:
-            # Cyrillic Unicode block: 0400–04FF
-            return not any('\u0400' <= char <= '\u04FF' for char in translation)
-        elif "french" in target_lang:
-            # Check for French accents
-            return not any(char in "éèêàùç" for char in translation)
-        elif "english" in target_lang:
-            # Check for common English words
-            english_words = ["the", "and", "for", "with", "this", "that"]
-            return not any(word in translation for word in english_words)
-        
-        # Generic check for non-Latin characters
-        if "latin" in target_lang or "roman" in target_lang:
-            non_latin = any(ord(char) > 127 for char in translation)
-            return non_latin
-            
-        return False
+        # Only languages with a known script can be checked
+        if expected_script(target_lang) is None:
+            return False
+        return not language_matches(translation, target_lang)
     
     st.title("📝 Translation Results")
     st.subheader(f"Project: {project['name']}")
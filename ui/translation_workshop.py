@@ -1,8 +1,10 @@
 # translation_workshop.py
 import streamlit as st
-import time
+import threading
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from services.translation_service import translate_text as basic_translate
 from services.expert_translation import translate_text as expert_translate
+from core.llm_cache import call_site
 
 def render_translation_workshop(project):
     st.title("🌐 Translate Content")
@@ -79,10 +81,8 @@ def render_translation_workshop(project):
         with st.status("🚀 Translating...", expanded=True) as status:
             if st.session_state.translation_mode == "basic":
                 st.write("⚡ Fast translation using Gemini...")
-                time.sleep(1)
             elif st.session_state.translation_mode == "advanced":
                 st.write("🧠 Processing with advanced AI...")
-                time.sleep(1)
             elif st.session_state.translation_mode == "agentic":
                 framework = st.session_state.get("framework", "LangGraph")
                 if framework == "LangGraph":
@@ -94,7 +94,6 @@ def render_translation_workshop(project):
                     
                     for step in steps:
                         st.write(f"🔹 {step}...")
-                        time.sleep(0.5)
                 else:
                     steps = ["Translator processing text"]
                     if st.session_state.intensity >= 2:
@@ -104,7 +103,6 @@ def render_translation_workshop(project):
                     
                     for step in steps:
                         st.write(f"🔹 {step}...")
-                        time.sleep(0.5)
             else:  # Expert mode
                 steps = [
                     "Analyzing text sentiment",
@@ -116,30 +114,43 @@ def render_translation_workshop(project):
                 
                 for step in steps:
                     st.write(f"🔹 {step}...")
-                    time.sleep(0.5)
             
+            # A retranslation asks for a fresh answer, not the cached one
+            retranslating = st.session_state.get("retranslate_mode", False)
             if st.session_state.translation_mode == "expert":
-                translation_result = expert_translate(
-                    source_text,
-                    source_lang,
-                    target_lang,
-                    project.get("metadata", {}),
-                    st.session_state.translation_mode,
-                    st.session_state.get("framework"),
-                    st.session_state.get("intensity", 3),
-                    project.get("user_feedback", {})
-                )
+                with call_site("retranslate", cache=not retranslating):
+                    translation_result = expert_translate(
+                        source_text,
+                        source_lang,
+                        target_lang,
+                        project.get("metadata", {}),
+                        st.session_state.translation_mode,
+                        st.session_state.get("framework"),
+                        st.session_state.get("intensity", 3),
+                        project.get("user_feedback", {})
+                    )
             else:
-                translation_result = basic_translate(
-                    source_text,
-                    source_lang,
-                    target_lang,
-                    project.get("metadata", {}),
-                    st.session_state.translation_mode,
-                    st.session_state.get("framework"),
-                    st.session_state.get("intensity", 3),
-                    project.get("user_feedback", {})
-                )
+                # Show the translation as it streams in; the result is saved once it completes
+                stream_box = st.empty()
+                script_ctx = get_script_run_ctx()
+                
+                def show_partial(text):
+                    # Segments stream from worker threads, which need the script context to draw
+                    add_script_run_ctx(threading.current_thread(), script_ctx)
+                    stream_box.markdown(text)
+                
+                with call_site("retranslate", cache=not retranslating):
+                    translation_result = basic_translate(
+                        source_text,
+                        source_lang,
+                        target_lang,
+                        project.get("metadata", {}),
+                        st.session_state.translation_mode,
+                        st.session_state.get("framework"),
+                        st.session_state.get("intensity", 3),
+                        project.get("user_feedback", {}),
+                        on_partial=show_partial
+                    )
             
             version = len(project.get("history", [])) + 1
             new_entry = {
@@ -1,13 +1,11 @@
+import json
+import re
+import unicodedata
+from utils.script_profile import dominant_script
+from utils.languages import language_code
+
 def get_lang_code(lang_name):
-    lang_map = {
-        "English": "en",
-        "Hindi": "hi",
-        "Tamil": "ta",
-        "Russian": "ru",
-        "French": "fr",
-        "Auto": "auto"
-    }
-    return lang_map.get(lang_name, "auto")
+    return language_code(lang_name)
 
 def parse_metadata(metadata_str):
     if isinstance(metadata_str, dict):
@@ -27,19 +25,45 @@ def parse_metadata(metadata_str):
         return metadata
 
 def detect_language(text):
-    """Simple language detection heuristic"""
+    """Simple language detection heuristic based on the dominant script"""
     if not text:
         return "Unknown"
     
-    # Check for specific character ranges
-    if any('\u0900' <= char <= '\u097F' for char in text):  # Devanagari (Hindi)
+    script = dominant_script(text)
+    if script == "devanagari":
         return "Hindi"
-    if any('\u0B80' <= char <= '\u0BFF' for char in text):  # Tamil
+    if script == "tamil":
         return "Tamil"
-    if any('\u0400' <= char <= '\u04FF' for char in text):  # Cyrillic (Russian)
+    if script == "cyrillic":
         return "Russian"
-    if any('à' in text or 'é' in text or 'ç' in text):  # French accents
+    if script == "latin" and any(accent in text for accent in "àéç"):  # French accents
         return "French"
     
     # Default to English
-    return "English"
\ No newline at end of file
+    return "English"
+
+def normalize_text(text):
+    """Canonical form of a source text used for hashing and lookups"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def session_value(key, default=None):
+    """st.session_state[key] during a Streamlit run; default in CLI runs and worker threads"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        import streamlit as st
+    except ImportError:
+        return default
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return default
+    return st.session_state.get(key, default)
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
@@ -0,0 +1,71 @@
+# languages.py
+"""Canonical registry of the supported languages.
+
+Every component refers to languages by display name ("Tamil"), ISO 639-1
+code ("ta") or langdetect code; get_language() resolves any of them to
+the same registry entry, so validators and prompt builders compare like
+with like.
+"""
+import threading
+from collections import namedtuple
+from typing import Dict, Optional
+
+# scripts name the utils.script_profile ranges the language is written in
+Language = namedtuple("Language", ["name", "code", "scripts", "langdetect_code"])
+
+LANGUAGES = (
+    Language("English", "en", ("latin",), "en"),
+    Language("Hindi", "hi", ("devanagari",), "hi"),
+    Language("Tamil", "ta", ("tamil",), "ta"),
+    Language("Russian", "ru", ("cyrillic",), "ru"),
+    Language("French", "fr", ("latin",), "fr"),
+)
+
+_lookup = {}
+for _language in LANGUAGES:
+    for _key in (_language.name, _language.code, _language.langdetect_code):
+        _lookup.setdefault(_key.lower(), _language)
+
+def get_language(value: str) -> Optional[Language]:
+    """Registry entry for a language name, ISO code or langdetect code"""
+    return _lookup.get((value or "").strip().lower())
+
+def find_language(value: str) -> Optional[Language]:
+    """get_language, also accepting names embedded in longer labels like "Tamil (India)" """
+    language = get_language(value)
+    if language is None:
+        value = (value or "").lower()
+        language = next((l for l in LANGUAGES if l.name.lower() in value), None)
+    return language
+
+def language_name(value: str) -> str:
+    """Display name for a name or code; unknown values are returned unchanged"""
+    language = get_language(value)
+    return language.name if language else value
+
+def language_code(value: str, default: str = "auto") -> str:
+    """ISO 639-1 code for a name or code, or default when unknown (e.g. "Auto")"""
+    language = get_language(value)
+    return language.code if language else default
+
+def shares_script(language: Language) -> bool:
+    """Whether another registered language uses the same script (e.g. English and French)"""
+    return any(other is not language and set(other.scripts) & set(language.scripts)
+               for other in LANGUAGES)
+
+# Language-correction LLM calls, counted per pipeline stage and target language
+_corrections = {"total": 0, "by_stage": {}, "by_language": {}}
+_corrections_lock = threading.Lock()
+
+def count_language_correction(stage: str, language: str):
+    with _corrections_lock:
+        _corrections["total"] += 1
+        _corrections["by_stage"][stage] = _corrections["by_stage"].get(stage, 0) + 1
+        name = language_name(language)
+        _corrections["by_language"][name] = _corrections["by_language"].get(name, 0) + 1
+
+def get_language_correction_stats() -> Dict:
+    with _corrections_lock:
+        return {"total": _corrections["total"],
+                "by_stage": dict(_corrections["by_stage"]),
+                "by_language": dict(_corrections["by_language"])}
@@ -0,0 +1,169 @@
+# script_profile.py
+"""Single-pass Unicode script profiling.
+
+script_profile() counts the characters of a text once and maps each
+distinct character to its script through a precomputed code-point range
+table, returning the share of every script among the letters found.
+Digits, punctuation and whitespace belong to no script and are ignored.
+script_profiles() does the same for many texts at once, vectorized with
+NumPy when it is installed.
+"""
+import os
+import threading
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, List, Optional
+
+from utils.languages import find_language, shares_script
+
+try:
+    import numpy as np
+except ImportError:  # optional: batch mode falls back to one pass per text
+    np = None
+
+# Share of a text's letters that must be in the expected script
+SCRIPT_MATCH_SHARE = float(os.getenv("SCRIPT_MATCH_SHARE", "0.5"))
+# Confidence langdetect needs before a same-script text counts as another language
+LANGDETECT_MIN_PROB = float(os.getenv("LANGDETECT_MIN_PROB", "0.9"))
+
+# (first code point, last code point, script), sorted and non-overlapping
+SCRIPT_RANGES = [
+    (0x0041, 0x005A, "latin"),
+    (0x0061, 0x007A, "latin"),
+    (0x00C0, 0x00D6, "latin"),
+    (0x00D8, 0x00F6, "latin"),
+    (0x00F8, 0x024F, "latin"),
+    (0x0370, 0x03FF, "greek"),
+    (0x0400, 0x052F, "cyrillic"),
+    (0x0530, 0x058F, "armenian"),
+    (0x0590, 0x05FF, "hebrew"),
+    (0x0600, 0x06FF, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x0980, 0x09FF, "bengali"),
+    (0x0A00, 0x0A7F, "gurmukhi"),
+    (0x0A80, 0x0AFF, "gujarati"),
+    (0x0B00, 0x0B7F, "oriya"),
+    (0x0B80, 0x0BFF, "tamil"),
+    (0x0C00, 0x0C7F, "telugu"),
+    (0x0C80, 0x0CFF, "kannada"),
+    (0x0D00, 0x0D7F, "malayalam"),
+    (0x0D80, 0x0DFF, "sinhala"),
+    (0x0E00, 0x0E7F, "thai"),
+    (0x10A0, 0x10FF, "georgian"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x1E00, 0x1EFF, "latin"),
+    (0x3040, 0x309F, "hiragana"),
+    (0x30A0, 0x30FF, "katakana"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xAC00, 0xD7AF, "hangul"),
+]
+
+_STARTS = [start for start, _, _ in SCRIPT_RANGES]
+_ENDS = [end for _, end, _ in SCRIPT_RANGES]
+SCRIPTS = list(dict.fromkeys(script for _, _, script in SCRIPT_RANGES))
+_RANGE_SCRIPTS = [SCRIPTS.index(script) for _, _, script in SCRIPT_RANGES]
+
+def script_of(char: str) -> Optional[str]:
+    """Script of a single character, or None for digits, punctuation and the like"""
+    code = ord(char)
+    i = bisect_right(_STARTS, code) - 1
+    if i >= 0 and code <= _ENDS[i]:
+        return SCRIPT_RANGES[i][2]
+    return None
+
+def _to_profile(counts: Dict[str, int]) -> Dict[str, float]:
+    total = sum(counts.values())
+    if not total:
+        return {}
+    return {script: count / total
+            for script, count in sorted(counts.items(), key=lambda item: -item[1])}
+
+def script_counts(text: str) -> Dict[str, int]:
+    """Number of letters per script, from one pass over the text"""
+    counts = {}
+    # Counter walks the text once in C; only distinct characters hit the range table
+    for char, count in Counter(text or "").items():
+        script = script_of(char)
+        if script is not None:
+            counts[script] = counts.get(script, 0) + count
+    return counts
+
+def script_profile(text: str) -> Dict[str, float]:
+    """Share of each script among the letters of text, largest first ({} when none)"""
+    return _to_profile(script_counts(text))
+
+def script_profiles(texts: List[str]) -> List[Dict[str, float]]:
+    """script_profile for many texts in one vectorized pass (NumPy when available)"""
+    texts = [text or "" for text in texts]
+    if np is None or not texts:
+        return [script_profile(text) for text in texts]
+
+    codes = np.frombuffer("".join(texts).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    owners = np.repeat(np.arange(len(texts)), [len(text) for text in texts])
+    ranges = np.searchsorted(np.asarray(_STARTS, dtype=np.uint32), codes, side="right") - 1
+    ranges_clipped = np.clip(ranges, 0, None)
+    in_range = (ranges >= 0) & (codes <= np.asarray(_ENDS, dtype=np.uint32)[ranges_clipped])
+    scripts = np.asarray(_RANGE_SCRIPTS)[ranges_clipped[in_range]]
+    table = np.bincount(owners[in_range] * len(SCRIPTS) + scripts,
+                        minlength=len(texts) * len(SCRIPTS)).reshape(len(texts), len(SCRIPTS))
+    return [_to_profile({SCRIPTS[i]: int(row[i]) for i in np.flatnonzero(row)}) for row in table]
+
+def dominant_script(text: str) -> Optional[str]:
+    profile = script_profile(text)
+    return next(iter(profile), None)
+
+def expected_script(language: str) -> Optional[str]:
+    """Script a language name or code is written in, or None when unknown"""
+    if any(label in (language or "").lower() for label in ("latin", "roman")):
+        return "latin"
+    registered = find_language(language)
+    return registered.scripts[0] if registered else None
+
+_detector_lock = threading.Lock()
+_detector_ready = False
+
+def _detected_language(text: str):
+    """langdetect's best guess as (code, probability), or None when unavailable"""
+    global _detector_ready
+    try:
+        from langdetect import detect_langs, DetectorFactory
+        from langdetect.detector_factory import init_factory
+        from langdetect.lang_detect_exception import LangDetectException
+    except ImportError:
+        return None
+    with _detector_lock:
+        if not _detector_ready:
+            # Profiles load once, before any concurrent use; seeded for repeatable guesses
+            DetectorFactory.seed = 0
+            init_factory()
+            _detector_ready = True
+    try:
+        guess = detect_langs(text)[0]
+    except LangDetectException:
+        return None
+    return guess.lang, guess.prob
+
+def language_matches(text: str, language: str, min_share: float = SCRIPT_MATCH_SHARE,
+                     profile: Optional[Dict[str, float]] = None) -> bool:
+    """Whether text is written in language.
+
+    The text must be mostly in the language's script. Where several
+    registered languages share that script (English and French), it only
+    fails if langdetect is confident it is another language. For
+    languages without a known script, any text that is not mostly Latin
+    passes.
+    """
+    if not text or not language:
+        return False
+    profile = script_profile(text) if profile is None else profile
+    script = expected_script(language)
+    if script is None:
+        return profile.get("latin", 0.0) < min_share
+    if profile.get(script, 0.0) < min_share:
+        return False
+    registered = find_language(language)
+    if registered is None or not shares_script(registered):
+        return True
+    guess = _detected_language(text)
+    return guess is None or guess[0] == registered.langdetect_code or guess[1] < LANGDETECT_MIN_PROB
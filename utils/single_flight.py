@@ -0,0 +1,119 @@
+# single_flight.py
+import copy
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.helpers import normalize_text
+
+def request_key(text: str, *settings) -> str:
+    """Hash of a translation request: normalized text plus its settings"""
+    payload = json.dumps([normalize_text(text), *settings], sort_keys=True,
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class _Call:
+    def __init__(self):
+        self.changed = threading.Condition()
+        self.finished = False
+        # Set when the leader was interrupted (e.g. a Streamlit rerun) rather than failing
+        self.abandoned = False
+        self.result = None
+        self.error = None
+        self.partial = None
+        self.updates = 0
+
+    def publish(self, partial: str):
+        with self.changed:
+            self.partial = partial
+            self.updates += 1
+            self.changed.notify_all()
+
+    def finish(self):
+        with self.changed:
+            self.finished = True
+            self.changed.notify_all()
+
+    def follow(self, on_partial: Optional[Callable[[str], None]]):
+        """Wait for the leader, passing its partial output to on_partial from this thread"""
+        seen = 0
+        while True:
+            with self.changed:
+                self.changed.wait_for(lambda: self.finished or self.updates != seen)
+                finished, partial, updates = self.finished, self.partial, self.updates
+            if finished:
+                return
+            if on_partial is not None:
+                on_partial(partial)
+            seen = updates
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent duplicates share its result.
+
+    The first caller for a key executes; callers arriving while it runs
+    block and receive a copy of its result (or its exception). Nothing is
+    kept after the call finishes, so this is coalescing, not caching.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    def run(self, key: str, fn: Callable, *args, on_partial: Optional[Callable[[str], None]] = None,
+            **kwargs) -> Tuple[object, bool]:
+        """Like do(), returning (result, shared); shared is True when another caller's run answered.
+
+        With on_partial, fn is called with an on_partial of its own whose
+        updates reach every caller's on_partial, each in the caller's own
+        thread. Streaming and non-streaming calls should use different keys.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.stats["executed"] += 1
+                else:
+                    self.stats["coalesced"] += 1
+
+            if leader:
+                return self._lead(key, call, fn, args, kwargs, on_partial), False
+            call.follow(on_partial)
+            # An interrupted leader leaves nothing to share; run again, maybe as the new leader
+            if call.abandoned:
+                continue
+            if call.error is not None:
+                raise call.error
+            # Each caller gets its own copy, so one session cannot mutate another's result
+            return copy.deepcopy(call.result), True
+
+    def do(self, key: str, fn: Callable, *args, **kwargs):
+        return self.run(key, fn, *args, **kwargs)[0]
+
+    def _lead(self, key, call, fn, args, kwargs, on_partial):
+        if on_partial is not None:
+            def publish(partial):
+                on_partial(partial)
+                call.publish(partial)
+            kwargs = {**kwargs, "on_partial": publish}
+        try:
+            result = fn(*args, **kwargs)
+            # Followers copy from a snapshot the leader's caller never sees
+            call.result = copy.deepcopy(result)
+            return result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.finish()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._calls)}